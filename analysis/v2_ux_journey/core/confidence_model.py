@@ -0,0 +1,265 @@
+"""
+Confidence Model Module
+
+This module derives per-customer confidence features for all customers
+at once with grouped aggregations, reproduces the rule-based confidence
+score on them without per-customer loops, and fits a light
+scikit-learn model predicting whether a customer will reach confident
+sizing. Fitted models are pickled next to a data snapshot.
+"""
+
+import pickle
+from pathlib import Path
+from typing import Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = 'confidence_model.pkl'
+
+FEATURES = [
+    'order_count', 'completed_count', 'return_rate', 'size_consistency',
+    'mean_gap_days', 'max_gap_days', 'tenure_days', 'style_diversity',
+]
+
+def customer_features(orders: pd.DataFrame, as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Confidence features of every customer in one grouped pass.
+
+    Args:
+        orders: Prepared orders with customer_id, created_at, returned,
+            band_size, cup_size and style (size_swap is optional)
+        as_of: Only use orders created before this time
+
+    Returns:
+        DataFrame indexed by customer_id with the FEATURES columns
+    """
+    if as_of is not None:
+        orders = orders[orders['created_at'] < as_of]
+    columns = ['customer_id', 'created_at', 'returned', 'band_size', 'cup_size', 'style']
+    if 'size_swap' in orders.columns:
+        columns.append('size_swap')
+    data = orders[columns].copy()
+    data['returned'] = data['returned'].fillna(False).astype(bool)
+    data = data.sort_values(['customer_id', 'created_at'], kind='stable')
+
+    grouped = data.groupby('customer_id', sort=True, observed=True)
+    features = pd.DataFrame({
+        'order_count': grouped.size(),
+        'return_rate': grouped['returned'].mean(),
+        'first_order': grouped['created_at'].min(),
+        'last_order': grouped['created_at'].max(),
+    })
+
+    completed = data[~data['returned']].groupby('customer_id', sort=True, observed=True)
+    features['completed_count'] = completed.size().reindex(features.index, fill_value=0)
+    consistent = (completed['band_size'].nunique() == 1) & (completed['cup_size'].nunique() == 1)
+    features['size_consistency'] = consistent.reindex(features.index, fill_value=False)
+    if 'size_swap' in data.columns:
+        swapped = grouped['size_swap'].any()
+        features['size_consistency'] &= ~swapped.fillna(False).astype(bool)
+    features['size_consistency'] = features['size_consistency'].astype(float)
+
+    gaps = grouped['created_at'].diff().dt.total_seconds() / 86400
+    gap_groups = gaps.groupby(data['customer_id'], sort=True, observed=True)
+    features['mean_gap_days'] = gap_groups.mean().reindex(features.index).fillna(0.0)
+    features['max_gap_days'] = gap_groups.max().reindex(features.index).fillna(0.0)
+    features['tenure_days'] = (features['last_order'] - features['first_order']).dt.total_seconds() / 86400
+    features['style_diversity'] = grouped['style'].nunique() / features['order_count']
+
+    return features[FEATURES].astype(float)
+
+def rule_confidence(features: pd.DataFrame) -> pd.Series:
+    """
+    JourneyMapper._calculate_confidence_score computed from features.
+
+    Args:
+        features: Output of customer_features
+
+    Returns:
+        Confidence score between 0 and 1 per customer
+    """
+    date_range = np.floor(features['tenure_days'])  # whole days, as Timedelta.days
+    frequency = np.minimum(1.0, features['completed_count'] / (date_range / 30 + 1))
+    score = (
+        features['size_consistency'] * 0.4 +
+        (1 - features['return_rate']) * 0.3 +
+        frequency * 0.3
+    ).clip(0.0, 1.0)
+    return score.where(features['completed_count'] > 0, 0.0)
+
+def running_confidence(orders: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rule confidence after every order of every customer.
+
+    Reproduces JourneyMapper.map_confidence_progression with cumulative
+    per-customer counts instead of re-scoring each order prefix: distinct
+    completed band and cup sizes are counted as running sums of first
+    occurrences.
+
+    Args:
+        orders: Prepared orders with customer_id, created_at, returned,
+            band_size and cup_size (size_swap is optional)
+
+    Returns:
+        DataFrame with customer_id, order_index (1-based) and confidence,
+        grouped by customer in chronological order
+    """
+    data = orders.sort_values(['customer_id', 'created_at'], kind='stable')
+    customers = data['customer_id']
+    returned = data['returned'].fillna(False).astype(bool)
+    by_customer = returned.groupby(customers, sort=False)
+    order_index = by_customer.cumcount() + 1
+    returns = by_customer.cumsum()
+    completed = order_index - returns
+
+    consistent = pd.Series(True, index=data.index)
+    for col in ['band_size', 'cup_size']:
+        counted = ~returned & data[col].notna()
+        first_seen = counted & ~data[['customer_id', col]].where(counted).duplicated()
+        distinct = first_seen.groupby(customers, sort=False).cumsum()
+        consistent &= distinct == 1
+    if 'size_swap' in data.columns:
+        swapped = data['size_swap'].fillna(False).astype(bool).groupby(customers, sort=False).cummax()
+        consistent &= ~swapped
+
+    first_order = data['created_at'].groupby(customers, sort=False).transform('min')
+    date_range = (data['created_at'] - first_order).dt.days
+    frequency = np.minimum(1.0, completed / (date_range / 30 + 1))
+    score = (consistent * 0.4 + (1 - returns / order_index) * 0.3 + frequency * 0.3).clip(0.0, 1.0)
+
+    return pd.DataFrame({
+        'customer_id': customers.to_numpy(),
+        'order_index': order_index.to_numpy(),
+        'confidence': score.where(completed > 0, 0.0).to_numpy(),
+    })
+
+class ConfidenceModel:
+    """Predicts whether customers will reach confident sizing."""
+
+    def __init__(self, kind: str = 'logistic', threshold: float = 0.7):
+        """
+        Initialize an unfitted model.
+
+        Args:
+            kind: 'logistic' (scaled logistic regression) or 'gbm'
+                (histogram gradient boosting)
+            threshold: Rule confidence counting as confident in the labels
+
+        Raises:
+            ValueError: If kind is unknown
+        """
+        if kind not in ('logistic', 'gbm'):
+            raise ValueError(f"Unknown model kind: {kind}")
+        self.kind = kind
+        self.threshold = threshold
+        self.estimator = None
+
+    def _make_estimator(self):
+        """Build the scikit-learn estimator."""
+        try:
+            from sklearn.ensemble import HistGradientBoostingClassifier
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.pipeline import make_pipeline
+            from sklearn.preprocessing import StandardScaler
+        except ImportError as e:
+            raise ImportError("The confidence model requires the 'scikit-learn' package") from e
+        if self.kind == 'gbm':
+            return HistGradientBoostingClassifier(max_iter=200)
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+
+    def training_set(self, orders: pd.DataFrame, cutoff: pd.Timestamp):
+        """
+        Features before a cutoff labelled with the confidence reached after it.
+
+        Only customers with orders on both sides of the cutoff are used.
+
+        Args:
+            orders: Prepared orders
+            cutoff: Split between feature history and outcome
+
+        Returns:
+            Tuple of (features, labels)
+        """
+        before = customer_features(orders, as_of=cutoff)
+        outcome = rule_confidence(customer_features(orders)) > self.threshold
+        later = orders.loc[orders['created_at'] >= cutoff, 'customer_id'].unique()
+        customers = before.index.intersection(pd.Index(later))
+        return before.loc[customers], outcome.loc[customers].astype(int)
+
+    def fit(self, orders: pd.DataFrame, cutoff: Optional[pd.Timestamp] = None) -> 'ConfidenceModel':
+        """
+        Fit the model offline on historical orders.
+
+        Args:
+            orders: Prepared orders
+            cutoff: Split date; defaults to the 80th percentile of order dates
+
+        Returns:
+            self
+
+        Raises:
+            ValueError: If the training labels contain a single class
+        """
+        if cutoff is None:
+            cutoff = orders['created_at'].quantile(0.8)
+        features, labels = self.training_set(orders, cutoff)
+        if labels.nunique() < 2:
+            raise ValueError("Training labels contain a single class; choose another cutoff")
+
+        self.estimator = self._make_estimator()
+        self.estimator.fit(features[FEATURES].to_numpy(), labels.to_numpy())
+        logger.debug(f"Fitted {self.kind} confidence model on {len(labels)} customers")
+        return self
+
+    def predict(self, features: pd.DataFrame) -> pd.Series:
+        """
+        Probability of reaching confident sizing, for every row at once.
+
+        Args:
+            features: Output of customer_features
+
+        Returns:
+            Series of probabilities indexed like features
+
+        Raises:
+            ValueError: If the model has not been fitted
+        """
+        if self.estimator is None:
+            raise ValueError("Confidence model has not been fitted")
+        if features.empty:
+            return pd.Series(dtype=float, index=features.index)
+        probabilities = self.estimator.predict_proba(features[FEATURES].to_numpy())[:, 1]
+        return pd.Series(probabilities, index=features.index)
+
+    def save(self, path: str) -> None:
+        """
+        Pickle the model into a snapshot directory.
+
+        Args:
+            path: Snapshot directory
+        """
+        root = Path(path)
+        root.mkdir(parents=True, exist_ok=True)
+        with open(root / MODEL_FILE, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path: str) -> Optional['ConfidenceModel']:
+        """
+        Load the model stored in a snapshot directory.
+
+        Args:
+            path: Snapshot directory
+
+        Returns:
+            ConfidenceModel, or None if the snapshot has no model
+        """
+        model_path = Path(path) / MODEL_FILE
+        if not model_path.exists():
+            return None
+        with open(model_path, 'rb') as f:
+            return pickle.load(f)
@@ -0,0 +1,455 @@
+"""
+DuckDB Journey Backend
+
+This module expresses the JourneyMapper metrics as SQL window queries
+and runs them in embedded DuckDB directly over the CSV/Parquet exports,
+so histories larger than memory can be analyzed out of core and on all
+cores.
+"""
+
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from .journey_mapping import SURVIVAL_GROUPS, JourneyMapper, JourneyStage
+from .survival import (
+    kaplan_meier, return_durations, second_purchase_durations, stage_dwell_durations
+)
+
+logger = logging.getLogger(__name__)
+
+# Export file stems, matching utils.data_loader.load_pepper_data
+ORDERS_STEM = 'simulated_orders_'
+ORDER_ITEMS_STEM = 'transformed_order_items_'
+PRODUCTS_STEM = 'transformed_bra_products_'
+
+# Stage rules applied to running (prefix) aggregates; mirrors
+# JourneyMapper.determine_journey_stage
+STAGE_CASE = """
+    CASE
+        WHEN completed_count = 0 THEN 'SIZE_EXPLORATION'
+        WHEN completed_count = 1 AND returned_count = 0 THEN 'FIRST_PURCHASE'
+        WHEN completed_count >= 2 AND completed_styles >= {style} THEN 'STYLE_EXPLORATION'
+        WHEN returned_count > 0 THEN 'SIZE_EXPLORATION'
+        WHEN completed_count >= {loyalty} AND confidence > {confidence} THEN 'BRAND_LOYAL'
+        WHEN confidence > {confidence} THEN 'CONFIDENCE_BUILDING'
+        ELSE 'SIZE_EXPLORATION'
+    END
+"""
+
+def _latest_export(data_dir: str, stem: str) -> Path:
+    """
+    Find the most recent CSV or Parquet export for a file stem.
+
+    Args:
+        data_dir: Directory containing the exports
+        stem: File name prefix, e.g. 'simulated_orders_'
+
+    Returns:
+        Path of the latest export
+
+    Raises:
+        FileNotFoundError: If no export matches
+    """
+    candidates = sorted(
+        list(Path(data_dir).glob(f"{stem}*.csv")) +
+        list(Path(data_dir).glob(f"{stem}*.parquet")),
+        key=lambda p: p.stem
+    )
+    if not candidates:
+        raise FileNotFoundError(
+            f"No data files found in {data_dir} matching '{stem}*.csv' or '{stem}*.parquet'"
+        )
+    return candidates[-1]
+
+def _scan(path: Path) -> str:
+    """Return the DuckDB table function that scans an export."""
+    if path.suffix == '.parquet':
+        return f"read_parquet('{path.as_posix()}')"
+    return f"read_csv_auto('{path.as_posix()}', header=true)"
+
+class DuckDBJourneyMapper:
+    """Runs JourneyMapper metrics as SQL in embedded DuckDB."""
+
+    def __init__(
+        self,
+        data_dir: str,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+        database: str = ':memory:'
+    ):
+        """
+        Register views over the latest exports in data_dir.
+
+        Args:
+            data_dir: Directory containing the Pepper exports
+            threads: DuckDB worker threads (defaults to all cores)
+            memory_limit: DuckDB memory limit, e.g. '4GB'; larger work spills to disk
+            database: DuckDB database path; ':memory:' keeps only views
+
+        Raises:
+            ImportError: If duckdb is not installed
+            FileNotFoundError: If an export is missing
+        """
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError(
+                "The duckdb backend requires the 'duckdb' package"
+            ) from e
+
+        self.data_dir = data_dir
+        self.con = duckdb.connect(database)
+        if threads is not None:
+            self.con.execute(f"SET threads = {int(threads)}")
+        if memory_limit is not None:
+            self.con.execute(f"SET memory_limit = '{memory_limit}'")
+
+        self.STYLE_THRESHOLD = JourneyMapper.STYLE_THRESHOLD
+        self.CONFIDENCE_THRESHOLD = JourneyMapper.CONFIDENCE_THRESHOLD
+        self.LOYALTY_THRESHOLD = JourneyMapper.LOYALTY_THRESHOLD
+
+        self._register_views()
+
+    def _columns(self, relation: str) -> List[str]:
+        """List the columns of a registered view."""
+        return [row[0] for row in self.con.execute(f"DESCRIBE {relation}").fetchall()]
+
+    def _register_views(self) -> None:
+        """Create raw, prepared and per-order metric views."""
+        for name, stem in [
+            ('raw_orders', ORDERS_STEM),
+            ('raw_order_items', ORDER_ITEMS_STEM),
+            ('raw_products', PRODUCTS_STEM),
+        ]:
+            path = _latest_export(self.data_dir, stem)
+            # row_number() OVER () streams in file order, giving the row
+            # order pandas sees when it reads and merges the same files
+            self.con.execute(
+                f"CREATE OR REPLACE VIEW {name} AS SELECT *, row_number() OVER () AS source_row FROM {_scan(path)}"
+            )
+            logger.debug(f"Registered {name} over {path}")
+
+        order_cols = self._columns('raw_orders')
+        customer_col = 'customer_id' if 'customer_id' in order_cols else 'user_id'
+        created_col = 'created_at' if 'created_at' in order_cols else 'order_date'
+        product_cols = self._columns('raw_products')
+        product_key = 'product_id' if 'product_id' in product_cols else 'id'
+        item_cols = self._columns('raw_order_items')
+        fulfilment = ''.join(
+            f"CAST(i.{col} AS TIMESTAMP) AS {col}, " for col in ['shipped_at', 'delivered_at'] if col in item_cols
+        )
+
+        # Product-level dimension; size attributes only when unambiguous
+        self.con.execute(f"""
+            CREATE OR REPLACE VIEW product_dim AS
+            WITH sized AS (
+                SELECT
+                    CAST({product_key} AS VARCHAR) AS product_id,
+                    name,
+                    category,
+                    CASE WHEN length(sku) > 7 THEN substr(sku, 6, 2) END AS band_size,
+                    CASE WHEN length(sku) > 9 THEN substr(sku, 8, 2) END AS cup_size,
+                    regexp_extract(name, '(.*?)(?:\\s*-\\s*[A-Za-z]+)?$', 1) AS style
+                FROM raw_products
+            )
+            SELECT
+                product_id,
+                any_value(name) AS name,
+                any_value(category) AS category,
+                any_value(style) AS style,
+                CASE WHEN count(DISTINCT band_size) <= 1 THEN any_value(band_size) END AS band_size,
+                CASE WHEN count(DISTINCT cup_size) <= 1 THEN any_value(cup_size) END AS cup_size
+            FROM sized
+            GROUP BY product_id
+        """)
+
+        self.con.execute(f"""
+            CREATE OR REPLACE VIEW journey_orders AS
+            SELECT
+                o.id AS order_id,
+                CAST(o.{customer_col} AS VARCHAR) AS customer_id,
+                lower(o.status) AS status,
+                CAST(o.{created_col} AS TIMESTAMP) AS created_at,
+                CAST(i.product_id AS VARCHAR) AS product_id,
+                coalesce(i.returned_at IS NOT NULL, false) AS returned,
+                {fulfilment}CAST(i.returned_at AS TIMESTAMP) AS returned_at,
+                p.name, p.category, p.style, p.band_size, p.cup_size,
+                o.source_row AS order_row,
+                i.source_row AS item_row
+            FROM raw_orders o
+            LEFT JOIN raw_order_items i ON i.order_id = o.id
+            LEFT JOIN product_dim p ON p.product_id = CAST(i.product_id AS VARCHAR)
+        """)
+
+        # Running aggregates over each customer's history, one row per order.
+        # Items of one order share created_at, so ties fall back to the
+        # source row order, matching pandas' stable sort.
+        stage_sql = STAGE_CASE.format(
+            style=int(self.STYLE_THRESHOLD),
+            loyalty=int(self.LOYALTY_THRESHOLD),
+            confidence=float(self.CONFIDENCE_THRESHOLD)
+        )
+        self.con.execute(f"""
+            CREATE OR REPLACE VIEW order_metrics AS
+            WITH running AS (
+                SELECT
+                    *,
+                    row_number() OVER w AS order_index,
+                    count(*) OVER w AS order_count,
+                    sum(CASE WHEN NOT returned THEN 1 ELSE 0 END) OVER w AS completed_count,
+                    sum(CASE WHEN returned THEN 1 ELSE 0 END) OVER w AS returned_count,
+                    count(DISTINCT CASE WHEN NOT returned THEN band_size END) OVER w AS bands,
+                    count(DISTINCT CASE WHEN NOT returned THEN cup_size END) OVER w AS cups,
+                    count(DISTINCT CASE WHEN NOT returned THEN style END) OVER w AS completed_styles,
+                    floor((epoch(max(created_at) OVER w) - epoch(min(created_at) OVER w)) / 86400)
+                        AS date_range
+                FROM journey_orders
+                WINDOW w AS (
+                    PARTITION BY customer_id ORDER BY created_at, order_row, item_row
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                )
+            ),
+            scored AS (
+                SELECT
+                    *,
+                    CASE WHEN completed_count = 0 THEN 0.0 ELSE greatest(0.0, least(1.0,
+                        0.4 * CASE WHEN bands = 1 AND cups = 1 THEN 1 ELSE 0 END
+                        + 0.3 * (1 - returned_count / order_count)
+                        + 0.3 * least(1.0, completed_count / (date_range / 30 + 1))
+                    )) END AS confidence
+                FROM running
+            )
+            SELECT *, {stage_sql} AS journey_stage
+            FROM scored
+        """)
+
+    def query(self, sql: str, params: Optional[list] = None) -> pd.DataFrame:
+        """
+        Run an ad-hoc query against the registered views.
+
+        Args:
+            sql: SQL text referencing journey_orders, order_metrics, etc.
+            params: Optional positional parameters
+
+        Returns:
+            Result as a DataFrame
+        """
+        return self.con.execute(sql, params or []).df()
+
+    def determine_journey_stage(self, customer_id: str) -> Tuple[JourneyStage, float]:
+        """
+        Determine customer's current journey stage.
+
+        Args:
+            customer_id: Unique customer identifier
+
+        Returns:
+            Tuple of (JourneyStage, confidence_score)
+
+        Raises:
+            ValueError: If customer_id is not a string
+        """
+        if not isinstance(customer_id, str):
+            raise ValueError("Customer ID must be a string")
+
+        row = self.con.execute("""
+            SELECT journey_stage, confidence
+            FROM order_metrics
+            WHERE customer_id = ?
+            ORDER BY order_index DESC
+            LIMIT 1
+        """, [customer_id]).fetchone()
+
+        if row is None:
+            return JourneyStage.FIRST_PURCHASE, 0.0
+        stage, confidence = row
+        return JourneyStage[stage], float(confidence)
+
+    def map_confidence_progression(self) -> Dict[str, List[float]]:
+        """
+        Maps confidence development over time.
+
+        Returns:
+            Dict[customer_id, confidence_scores]
+        """
+        result = self.con.execute("""
+            SELECT customer_id, list(confidence ORDER BY order_index) AS scores
+            FROM order_metrics
+            GROUP BY customer_id
+        """).fetchall()
+        return {customer_id: [float(s) for s in scores] for customer_id, scores in result}
+
+    def identify_entry_points(self) -> Dict[str, float]:
+        """
+        Returns distribution of entry points.
+
+        Returns:
+            Dict[style_name, frequency_ratio]
+        """
+        result = self.con.execute("""
+            WITH firsts AS (
+                SELECT customer_id, first(name ORDER BY created_at, order_row, item_row) AS name
+                FROM journey_orders
+                WHERE NOT returned
+                GROUP BY customer_id
+            )
+            SELECT name, count(*) / (SELECT count(*) FROM firsts) AS share
+            FROM firsts
+            WHERE name IS NOT NULL
+            GROUP BY name
+            ORDER BY share DESC
+        """).fetchall()
+        return {name: float(share) for name, share in result}
+
+    def _transitions(self, column: str) -> List[Tuple[str, str, float]]:
+        """Consecutive (from, to, probability) transitions of a column."""
+        return self.con.execute(f"""
+            WITH pairs AS (
+                SELECT
+                    {column} AS from_value,
+                    lead({column}) OVER (PARTITION BY customer_id ORDER BY order_index) AS to_value,
+                    order_index < max(order_index) OVER (PARTITION BY customer_id) AS has_next
+                FROM order_metrics
+            ),
+            counts AS (
+                SELECT from_value, to_value, count(*) AS n
+                FROM pairs
+                WHERE has_next
+                GROUP BY from_value, to_value
+            )
+            SELECT from_value, to_value, n / sum(n) OVER (PARTITION BY from_value) AS p
+            FROM counts
+            ORDER BY from_value, p DESC
+        """).fetchall()
+
+    def analyze_category_flow(self) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Analyzes category transition patterns.
+
+        Returns:
+            Dict[from_category, List[(to_category, probability)]]
+        """
+        flow_patterns: Dict[str, List[Tuple[str, float]]] = {}
+        for from_cat, to_cat, p in self._transitions('category'):
+            if p >= 0.1:  # Filter transitions occurring >10% of time
+                flow_patterns.setdefault(from_cat, []).append((to_cat, float(p)))
+        return flow_patterns
+
+    def analyze_journey_patterns(self) -> Dict[str, Dict[str, float]]:
+        """
+        Analyze transitions between running journey stages.
+
+        Returns:
+            Dict[from_stage, Dict[to_stage, probability]]
+        """
+        patterns: Dict[str, Dict[str, float]] = {}
+        for from_stage, to_stage, p in self._transitions('journey_stage'):
+            patterns.setdefault(from_stage, {})[to_stage] = float(p)
+        return patterns
+
+    def analyze_cross_sell_patterns(self) -> Dict[str, Dict[str, float]]:
+        """
+        Analyze cross-sell patterns between product categories.
+
+        Returns:
+            Dict[from_category, Dict[to_category, probability]]
+        """
+        patterns: Dict[str, Dict[str, float]] = {}
+        for from_cat, to_cat, p in self._transitions('category'):
+            patterns.setdefault(from_cat, {})[to_cat] = float(p)
+        return patterns
+
+    def analyze_cohort_journeys(self) -> Dict[str, Dict[str, float]]:
+        """
+        Analyze running journey stages by order-count cohort.
+
+        Returns:
+            Dict[cohort, Dict[stage, probability]]
+        """
+        result = self.con.execute("""
+            WITH cohorts AS (
+                SELECT
+                    journey_stage,
+                    CASE
+                        WHEN max(order_index) OVER (PARTITION BY customer_id) = 1 THEN 'first_time'
+                        WHEN max(order_index) OVER (PARTITION BY customer_id) < 5 THEN 'occasional'
+                        ELSE 'loyal'
+                    END AS cohort
+                FROM order_metrics
+            ),
+            counts AS (
+                SELECT cohort, journey_stage, count(*) AS n
+                FROM cohorts
+                GROUP BY cohort, journey_stage
+            )
+            SELECT cohort, journey_stage, n / sum(n) OVER (PARTITION BY cohort) AS p
+            FROM counts
+        """).fetchall()
+
+        cohorts: Dict[str, Dict[str, float]] = {}
+        for cohort, stage, p in result:
+            cohorts.setdefault(cohort, {})[stage] = float(p)
+        return cohorts
+
+    def survival_curves(
+        self,
+        event: str = 'second_purchase',
+        by: Optional[str] = None,
+        as_of: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """
+        Kaplan-Meier curves of time to a journey event.
+
+        Only the date, grouping and stage columns are fetched from
+        order_metrics, in per-customer order, and passed to the same
+        duration and Kaplan-Meier helpers as JourneyMapper.survival_curves.
+
+        Args:
+            event: 'second_purchase', 'return' or 'stage_dwell'
+            by: Grouping from SURVIVAL_GROUPS[event]; None for one curve
+                (stage dwell is always grouped by stage)
+            as_of: End of follow-up; defaults to the latest date in orders
+
+        Returns:
+            DataFrame with group, time (days), at_risk, events, censored
+            and survival
+
+        Raises:
+            ValueError: If the event or grouping is unknown, or the exports
+                lack delivered_at for return curves
+        """
+        if event not in SURVIVAL_GROUPS:
+            raise ValueError(f"Unknown survival event: {event}")
+        if by is not None and by not in SURVIVAL_GROUPS[event]:
+            raise ValueError(f"Unknown grouping for {event}: {by}")
+
+        available = set(self._columns('order_metrics'))
+        columns = [
+            col for col in [
+                'customer_id', 'order_id', 'created_at', 'shipped_at', 'delivered_at',
+                'returned_at', 'style', 'category', 'journey_stage'
+            ] if col in available
+        ]
+        orders = self.query(
+            f"SELECT {', '.join(columns)} FROM order_metrics ORDER BY customer_id, order_index"
+        )
+
+        if event == 'second_purchase':
+            durations = second_purchase_durations(orders, as_of)
+        elif event == 'return':
+            durations = return_durations(orders, as_of)
+        else:
+            stages = orders['journey_stage'].map(lambda name: JourneyStage[name].value)
+            durations = stage_dwell_durations(orders, stages, as_of)
+            by = 'stage'
+
+        groups = durations[by] if by is not None else None
+        curves = kaplan_meier(durations['duration_days'], durations['observed'], groups)
+        logger.debug(f"Kaplan-Meier {event} curves over {len(durations)} subjects")
+        return curves
+
+    def close(self) -> None:
+        """Close the DuckDB connection."""
+        self.con.close()
@@ -7,11 +7,34 @@ post-purchase behavior and confidence development.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Sequence, Tuple, Optional
 from enum import Enum
 import logging
 import re
 
+from ..utils.data_loader import attach_returns, load_pepper_data
+from .result_cache import ResultCache, cached_analysis
+from .confidence_model import ConfidenceModel, customer_features, rule_confidence
+from .path_mining import PathTrie, encode_sequences, stage_sequences
+from .sales_cube import SalesCube
+from .similarity import SimilarityIndex
+from .size_fit import SizeFitMatrix
+from .sketches import JourneySketch
+from .snapshot import customer_offsets, load_frames, save_frames
+from .survival import (
+    kaplan_meier, return_durations, second_purchase_durations, stage_dwell_durations
+)
+
+# Order attributes entry points can be broken down by
+ENTRY_ATTRIBUTES = ('name', 'style', 'category', 'size')
+
+# Groupings available per survival event
+SURVIVAL_GROUPS = {
+    'second_purchase': ('cohort', 'entry_style'),
+    'return': ('style', 'category'),
+    'stage_dwell': ('stage',),
+}
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -24,6 +47,22 @@ class JourneyStage(Enum):
     CONFIDENCE_BUILDING = "Confidence Building"
     BRAND_LOYAL = "Brand Loyal"
 
+def join_fanout_factor(left_keys: pd.Series, right_keys: pd.Series) -> float:
+    """
+    Row multiplication factor of a left join, computed without joining.
+    
+    Args:
+        left_keys: Join keys of the left frame
+        right_keys: Join keys of the right frame
+    
+    Returns:
+        Rows a left join would produce divided by len(left_keys)
+    """
+    if len(left_keys) == 0:
+        return 1.0
+    matches = left_keys.map(right_keys.value_counts()).fillna(1)
+    return float(matches.sum() / len(left_keys))
+
 class JourneyMapper:
     """Maps customer journey patterns and confidence development."""
     
@@ -32,13 +71,27 @@ class JourneyMapper:
     CONFIDENCE_THRESHOLD = 0.7  # Confidence score to reach confidence building
     LOYALTY_THRESHOLD = 5  # Number of successful purchases for loyalty
     
-    def __init__(self, orders: pd.DataFrame, products: pd.DataFrame):
+    # Product attributes joined onto orders; variant attributes differ per size
+    PRODUCT_ATTRIBUTES = ['name', 'size', 'band_size', 'cup_size', 'category', 'style']
+    VARIANT_ATTRIBUTES = ['size', 'band_size', 'cup_size']
+    
+    def __init__(
+        self,
+        orders: pd.DataFrame,
+        products: pd.DataFrame,
+        cache: Optional[ResultCache] = None,
+        prepared: bool = False
+    ):
         """
         Initialize with order and product data.
         
         Args:
             orders: DataFrame with order history
             products: DataFrame with product details
+            cache: Optional ResultCache memoizing the analysis methods
+            prepared: Orders and products already carry the columns
+                _prepare_data derives (e.g. from the polars backend), so
+                it is skipped
         
         Raises:
             ValueError: If orders or products are not DataFrames
@@ -50,8 +103,145 @@ class JourneyMapper:
         self.products = products.copy()
         self.journeys = {}
         self.patterns = {}
-        self._prepare_data()
+        self.cache = cache
+        self.confidence_model: Optional[ConfidenceModel] = None
+        # Row offsets of each customer, set when orders are grouped by customer
+        self.customer_index: Optional[pd.Index] = None
+        self.customer_offsets: Optional[np.ndarray] = None
+        if not prepared:
+            self._prepare_data()
+        
+    @classmethod
+    def from_data_dir(cls, data_dir: str, backend: str = "pandas", **backend_options):
+        """
+        Build a mapper over the latest exports in a data directory.
+        
+        Args:
+            data_dir: Directory containing the Pepper exports
+            backend: "pandas" for an in-memory JourneyMapper, "polars" for
+                the same mapper loaded and prepared in lazy Polars plans, or
+                "duckdb" for a DuckDBJourneyMapper running the same metrics
+                in SQL
+            **backend_options: For pandas and polars, returns_db is passed
+                to load_pepper_data and cache to the JourneyMapper; for duckdb,
+                all options go to the DuckDBJourneyMapper constructor
+        
+        Returns:
+            JourneyMapper or DuckDBJourneyMapper
+        
+        Raises:
+            ValueError: If the backend or an option is unknown
+        """
+        if backend in ("pandas", "polars"):
+            unknown = set(backend_options) - {'returns_db', 'cache'}
+            if unknown:
+                raise ValueError(f"Unknown options for the {backend} backend: {sorted(unknown)}")
+            returns_db = backend_options.get('returns_db')
+            if backend == "polars":
+                from ..utils.polars_loader import load_journey_frames_polars
+                orders, products = load_journey_frames_polars(
+                    data_dir, returns_db, cls.PRODUCT_ATTRIBUTES, cls.VARIANT_ATTRIBUTES
+                )
+            else:
+                orders, products = load_pepper_data(data_dir, returns_db=returns_db)
+            if 'returned' not in orders.columns:
+                orders['returned'] = orders['is_return'].fillna(False).astype(bool)
+            return cls(orders, products, cache=backend_options.get('cache'), prepared=backend == "polars")
+        if backend == "duckdb":
+            from .duckdb_backend import DuckDBJourneyMapper
+            return DuckDBJourneyMapper(data_dir, **backend_options)
+        raise ValueError(f"Unknown backend: {backend}")
+    
+    def save_snapshot(self, path: str) -> None:
+        """
+        Persist the prepared state as a memory-mappable snapshot.
+        
+        Orders are stored grouped by customer in chronological order,
+        together with each customer's row offsets, so a loaded mapper can
+        slice a customer's history without scanning all orders. A fitted
+        confidence model is stored alongside.
+        
+        Args:
+            path: Snapshot directory
+        """
+        orders = self.orders.sort_values(['customer_id', 'created_at'], kind='stable')
+        customers, offsets = customer_offsets(orders['customer_id'])
+        save_frames(
+            path,
+            {'orders': orders.reset_index(drop=True), 'products': self.products.reset_index(drop=True)},
+            arrays={'customer_index': customers.to_numpy(), 'customer_offsets': offsets},
+            metadata={
+                'thresholds': {
+                    'STYLE_THRESHOLD': self.STYLE_THRESHOLD,
+                    'CONFIDENCE_THRESHOLD': self.CONFIDENCE_THRESHOLD,
+                    'LOYALTY_THRESHOLD': self.LOYALTY_THRESHOLD,
+                },
+            }
+        )
+        if self.confidence_model is not None:
+            self.confidence_model.save(path)
+        logger.debug(f"Saved snapshot of {len(orders)} orders to {path}")
+    
+    @classmethod
+    def load_snapshot(
+        cls,
+        path: str,
+        mmap: bool = True,
+        as_categorical: bool = True,
+        cache: Optional[ResultCache] = None
+    ) -> 'JourneyMapper':
+        """
+        Build a mapper from a snapshot without re-running data preparation.
+        
+        Args:
+            path: Snapshot directory written by save_snapshot
+            mmap: Map column arrays read-only so processes share pages
+            as_categorical: Keep text columns as Categoricals over the mapped
+                codes, shared between processes; False decodes them into
+                private per-process arrays
+            cache: Optional ResultCache for the analysis methods
+        
+        Returns:
+            JourneyMapper with prepared orders and products
+        """
+        frames, arrays, metadata = load_frames(path, mmap=mmap, as_categorical=as_categorical)
+        
+        mapper = cls.__new__(cls)
+        mapper.orders = frames['orders']
+        mapper.products = frames['products']
+        mapper.journeys = {}
+        mapper.patterns = {}
+        mapper.cache = cache
+        mapper.confidence_model = ConfidenceModel.load(path)
+        for name, value in metadata.get('thresholds', {}).items():
+            setattr(mapper, name, value)
+        mapper.customer_index = pd.Index(arrays['customer_index'])
+        mapper.customer_offsets = arrays['customer_offsets']
+        
+        logger.debug(f"Loaded snapshot of {len(mapper.orders)} orders from {path}")
+        return mapper
+    
+    def _customer_orders(self, customer_id) -> pd.DataFrame:
+        """
+        One customer's orders.
+        
+        Slices the customer's block through customer_offsets when orders
+        are grouped by customer (as in a loaded snapshot), otherwise scans
+        the customer_id column.
         
+        Args:
+            customer_id: Customer identifier
+        
+        Returns:
+            The customer's order rows, possibly empty
+        """
+        if self.customer_offsets is None:
+            return self.orders[self.orders['customer_id'] == customer_id]
+        position = self.customer_index.get_indexer([customer_id])[0]
+        if position < 0:
+            return self.orders.iloc[:0]
+        return self.orders.iloc[self.customer_offsets[position]:self.customer_offsets[position + 1]]
+    
     def _prepare_data(self):
         """
         Prepare data for analysis.
@@ -92,14 +282,8 @@ class JourneyMapper:
         # Add style column (use product name without color)
         self.products['style'] = self.products['name'].str.extract(r'(.*?)(?:\s*-\s*[A-Za-z]+)?$')[0]
         
-        # Merge orders with products
-        self.orders = pd.merge(
-            self.orders,
-            self.products[['product_id', 'name', 'size', 'band_size', 'cup_size', 'category', 'style']],
-            on='product_id',
-            how='left',
-            suffixes=('', '_product')
-        )
+        # Merge orders with products at variant grain where possible
+        self.orders = self._join_products(self.orders)
         
         # Convert dates
         self.orders['created_at'] = pd.to_datetime(self.orders['created_at'])
@@ -108,6 +292,164 @@ class JourneyMapper:
         logger.debug(f"Orders columns: {self.orders.columns}")
         logger.debug(f"Products columns: {self.products.columns}")
     
+    def _join_products(self, orders: pd.DataFrame) -> pd.DataFrame:
+        """
+        Join product attributes onto orders without row fan-out.
+        
+        Orders carrying an inventory_item_id that matches a product variant
+        get that variant's attributes. All other orders fall back to a
+        deduplicated product-level dimension, where variant attributes are
+        kept only if every variant of the product agrees on them. A warning
+        is logged when products has several rows for a product_id those
+        orders reference, since a plain product_id join would fan out.
+        
+        Args:
+            orders: Orders to enrich
+        
+        Returns:
+            Orders with product attributes, one row per input row
+        
+        Raises:
+            ValueError: If a dimension key matches more than one row, so the
+                join would change the number of order rows
+        """
+        attributes = [c for c in self.PRODUCT_ATTRIBUTES if c in self.products.columns]
+        variant_cols = [c for c in self.VARIANT_ATTRIBUTES if c in attributes]
+        keys = orders[[c for c in ('product_id', 'inventory_item_id') if c in orders.columns]]
+        
+        # Variant-level dimension, preferred when orders name a variant
+        resolved = np.zeros(len(orders), dtype=bool)
+        variant_part = None
+        if 'inventory_item_id' in keys.columns and 'inventory_item_id' in self.products.columns:
+            variants = self.products.dropna(subset=['inventory_item_id'])
+            variant_dim = variants.drop_duplicates('inventory_item_id')
+            if len(variant_dim) < len(variants):
+                logger.warning(
+                    f"{len(variants) - len(variant_dim)} duplicate inventory_item_id rows "
+                    "in products; keeping the first of each"
+                )
+            variant_part = pd.merge(
+                keys[['inventory_item_id']],
+                variant_dim[['inventory_item_id'] + attributes],
+                on='inventory_item_id',
+                how='left',
+                validate='many_to_one',
+                indicator=True
+            )
+            resolved = variant_part.pop('_merge').eq('both').to_numpy()
+            logger.debug(f"Resolved {int(resolved.sum())} of {len(orders)} orders to variants")
+        
+        # Product-level dimension for the rest, one row per product_id
+        fanout = join_fanout_factor(keys.loc[~resolved, 'product_id'], self.products['product_id'])
+        if fanout > 1:
+            logger.warning(
+                f"products has several rows per product_id (join fan-out factor {fanout:.2f} "
+                "for orders without a variant); joining on a deduplicated product dimension"
+            )
+        product_dim = self.products.drop_duplicates('product_id')[['product_id'] + attributes]
+        if variant_cols and len(product_dim) < len(self.products):
+            ambiguous = (
+                self.products.groupby('product_id')[variant_cols].nunique() > 1
+            ).reindex(product_dim['product_id']).to_numpy()
+            product_dim = product_dim.copy()
+            product_dim[variant_cols] = product_dim[variant_cols].mask(ambiguous)
+        product_part = pd.merge(
+            keys[['product_id']],
+            product_dim,
+            on='product_id',
+            how='left',
+            validate='many_to_one'
+        )
+        
+        dimension = product_part[attributes]
+        if variant_part is not None:
+            dimension = dimension.mask(
+                np.broadcast_to(resolved[:, None], dimension.shape), variant_part[attributes]
+            )
+        
+        # Attributes the orders already carry keep their name; product values get a suffix
+        orders = orders.reset_index(drop=True)
+        dimension = dimension.set_axis(
+            [f"{c}_product" if c in orders.columns else c for c in attributes], axis=1
+        )
+        return pd.concat([orders, dimension], axis=1)
+    
+    def attach_return_records(self, returns: pd.DataFrame) -> None:
+        """
+        Enrich orders with ReturnTracker records.
+        
+        Orders with a return record are marked as returned, and the
+        reason, sizes and size_swap flag become available to the stage
+        and confidence logic.
+        
+        Args:
+            returns: Output of utils.data_loader.load_return_records
+        """
+        self.orders = attach_returns(self.orders, returns)
+        
+        flagged = self.orders['has_return_record']
+        for col in ['returned', 'is_return']:
+            if col in self.orders.columns:
+                self.orders[col] = self.orders[col].fillna(False).astype(bool) | flagged
+        if 'returned' not in self.orders.columns:
+            self.orders['returned'] = flagged
+        
+        logger.debug(f"Attached {int(flagged.sum())} return records")
+    
+    def size_fit(self) -> SizeFitMatrix:
+        """
+        Build size-fit tables and the size recommendation lookup.
+        
+        Returns:
+            SizeFitMatrix over the prepared orders
+        """
+        return SizeFitMatrix(self.orders)
+
+    def sales_cube(self) -> SalesCube:
+        """
+        Pre-aggregate orders into a sales cube for slice/dice queries.
+        
+        Returns:
+            SalesCube by day, category, style, band and cup
+        """
+        return SalesCube.from_orders(self.orders)
+
+    def similarity_index(self, block_by: Optional[str] = 'band_size') -> SimilarityIndex:
+        """
+        Build the lookalike index over customer size and style profiles.
+        
+        Args:
+            block_by: Attribute whose usual value per customer blocks the
+                search; None compares all customers
+        
+        Returns:
+            SimilarityIndex over the prepared orders
+        """
+        return SimilarityIndex.from_orders(self.orders, block_by)
+
+    def size_swap_summary(self) -> pd.DataFrame:
+        """
+        Summarize size-swap events per customer in one grouped pass.
+        
+        Returns:
+            DataFrame indexed by customer_id with size_swaps (count),
+            returns_with_reason (count) and last_requested_size
+        
+        Raises:
+            ValueError: If return records have not been attached
+        """
+        if 'size_swap' not in self.orders.columns:
+            raise ValueError("Return records must be attached first")
+        
+        ordered = self.orders.sort_values('created_at')
+        swaps = ordered[ordered['size_swap']]
+        summary = pd.DataFrame({
+            'size_swaps': ordered.groupby('customer_id')['size_swap'].sum().astype(int),
+            'returns_with_reason': ordered.groupby('customer_id')['return_reason'].count(),
+        })
+        summary['last_requested_size'] = swaps.groupby('customer_id')['new_size_requested'].last()
+        return summary
+    
     def determine_journey_stage(self, customer_id: str) -> Tuple[JourneyStage, float]:
         """
         Determine customer's current journey stage.
@@ -127,10 +469,20 @@ class JourneyMapper:
         logger.debug(f"Determining journey stage for customer {customer_id}")
         
         # Get customer's purchase history
-        customer_orders = self.orders[
-            self.orders['customer_id'] == customer_id
-        ].sort_values('created_at')
+        customer_orders = self._customer_orders(customer_id).sort_values('created_at')
         
+        return self._stage_for_orders(customer_orders)
+    
+    def _stage_for_orders(self, customer_orders: pd.DataFrame) -> Tuple[JourneyStage, float]:
+        """
+        Determine the journey stage from one customer's chronological orders.
+        
+        Args:
+            customer_orders: The customer's orders sorted by created_at
+        
+        Returns:
+            Tuple of (JourneyStage, confidence_score)
+        """
         if len(customer_orders) == 0:
             logger.debug("No orders found")
             return JourneyStage.FIRST_PURCHASE, 0.0
@@ -208,6 +560,10 @@ class JourneyMapper:
         cup_consistency = completed_orders['cup_size'].nunique() == 1
         size_consistency = (band_consistency and cup_consistency)
         
+        # An exchange into another size means the size is still unsettled
+        if 'size_swap' in customer_orders.columns and customer_orders['size_swap'].any():
+            size_consistency = False
+        
         # Calculate return rate (30%)
         return_rate = customer_orders['returned'].mean()
         
@@ -231,6 +587,7 @@ class JourneyMapper:
         
         return min(max(score, 0.0), 1.0)
 
+    @cached_analysis
     def map_confidence_progression(self) -> Dict[str, List[float]]:
         """
         Maps confidence development over time.
@@ -255,9 +612,7 @@ class JourneyMapper:
         try:
             for customer_id in self.orders['customer_id'].unique():
                 # Get customer's purchase history
-                customer_orders = self.orders[
-                    self.orders['customer_id'] == customer_id
-                ].sort_values('created_at')
+                customer_orders = self._customer_orders(customer_id).sort_values('created_at')
                 
                 # Calculate running confidence scores
                 scores = []
@@ -274,6 +629,7 @@ class JourneyMapper:
         
         return confidence_scores
 
+    @cached_analysis
     def identify_entry_points(self) -> Dict[str, float]:
         """
         Returns distribution of entry points.
@@ -290,31 +646,86 @@ class JourneyMapper:
         Raises:
             Exception: If an error occurs during entry point identification
         """
+        return self._entry_points(['name'])['name']
+
+    def _first_purchase_rows(self) -> np.ndarray:
+        """
+        Row positions of each customer's earliest non-returned order.
+        
+        A grouped idxmin over int64 timestamps finds them in one linear
+        pass, without sorting orders. Ties go to the earliest row; orders
+        without a date only count when a customer has no dated ones.
+        
+        Returns:
+            Positional indices into self.orders, one per customer
+        """
+        kept = ~self.orders['returned'].fillna(False).astype(bool).to_numpy()
+        positions = np.flatnonzero(kept)
+        if len(positions) == 0:
+            return positions
+        
+        created_at = self.orders['created_at'].to_numpy()[positions]
+        ticks = created_at.view('int64').copy()
+        ticks[np.isnat(created_at)] = np.iinfo(np.int64).max
+        customers = self.orders['customer_id'].to_numpy()[positions]
+        
+        firsts = pd.Series(ticks, index=positions).groupby(customers, sort=False).idxmin()
+        return firsts.to_numpy()
+
+    def _entry_attribute(self, rows: np.ndarray, attribute: str) -> pd.Series:
+        """Values of an entry attribute at the given order rows."""
+        if attribute == 'size' and 'size' not in self.orders.columns:
+            band = self.orders['band_size'].iloc[rows].reset_index(drop=True)
+            cup = self.orders['cup_size'].iloc[rows].reset_index(drop=True)
+            return band + cup  # missing when either part is missing
+        return self.orders[attribute].iloc[rows].reset_index(drop=True)
+
+    @cached_analysis
+    def entry_points_by(
+        self,
+        attributes: Sequence[str] = ENTRY_ATTRIBUTES
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Entry point distributions over several attributes in one pass.
+        
+        Each customer's first non-returned order is located once; only
+        the requested attribute columns of those rows are then read.
+        
+        Args:
+            attributes: Order attributes, any of name, style, category and
+                size (band plus cup)
+        
+        Returns:
+            Dict[attribute, Dict[value, frequency_ratio]], where ratios are
+            shares of all customers with a kept order
+        
+        Raises:
+            ValueError: If an attribute is not available
+        """
+        return self._entry_points(attributes)
+
+    def _entry_points(self, attributes: Sequence[str]) -> Dict[str, Dict[str, float]]:
+        """Uncached implementation of entry_points_by."""
         logger.debug("Starting entry point identification")
         
+        unknown = [
+            a for a in attributes
+            if a not in self.orders.columns and not (a == 'size' and 'band_size' in self.orders.columns)
+        ]
+        if unknown:
+            raise ValueError(f"Unknown entry point attributes: {unknown}")
+        
         try:
-            # Get first purchase for each customer (exclude returns)
-            first_purchases = (
-                self.orders[~self.orders['returned']]
-                .sort_values('created_at')
-                .groupby('customer_id')
-                .first()
-                .reset_index()
-            )
+            rows = self._first_purchase_rows()
+            total_customers = len(rows)
+            logger.debug(f"Found {total_customers} first purchases")
             
-            logger.debug(f"Found {len(first_purchases)} first purchases")
-            logger.debug(f"First purchases columns: {first_purchases.columns}")
-            logger.debug(f"First purchases data:\n{first_purchases[['customer_id', 'name', 'product_id']]}")
-            
-            # Calculate frequency distribution of product names
-            name_counts = first_purchases['name'].value_counts()
-            total_customers = len(first_purchases)
-            
-            # Convert to frequency ratios
-            entry_points = {
-                name: count / total_customers
-                for name, count in name_counts.items()
-            }
+            entry_points = {}
+            for attribute in attributes:
+                counts = self._entry_attribute(rows, attribute).value_counts()
+                entry_points[attribute] = {
+                    value: count / total_customers for value, count in counts.items()
+                }
             
             logger.debug(f"Entry points identified: {entry_points}")
         except Exception as e:
@@ -323,6 +734,25 @@ class JourneyMapper:
         
         return entry_points
 
+    def build_sketch(self, **sketch_options) -> JourneySketch:
+        """
+        Summarize orders into a mergeable approximate JourneySketch.
+        
+        The sketch answers entry point, transition and distinct-count
+        queries in bounded memory and can keep absorbing new order
+        batches via update(), or be merged with sketches of other shards.
+        
+        Args:
+            **sketch_options: Error bounds passed to JourneySketch
+        
+        Returns:
+            JourneySketch over the current orders
+        """
+        sketch = JourneySketch(**sketch_options)
+        sketch.update(self.orders)
+        return sketch
+
+    @cached_analysis
     def analyze_category_flow(self) -> Dict[str, List[Tuple[str, float]]]:
         """
         Analyzes category transition patterns.
@@ -349,9 +779,7 @@ class JourneyMapper:
             
             # Analyze transitions for each customer
             for customer_id in self.orders['customer_id'].unique():
-                customer_orders = self.orders[
-                    self.orders['customer_id'] == customer_id
-                ].sort_values('created_at')
+                customer_orders = self._customer_orders(customer_id).sort_values('created_at')
                 
                 # Map to categories
                 categories = [product_categories[pid] 
@@ -394,6 +822,7 @@ class JourneyMapper:
         
         return flow_patterns
 
+    @cached_analysis
     def analyze_journey_patterns(self) -> Dict[str, Dict[str, float]]:
         """Analyze customer journeys to identify common paths and transitions.
         
@@ -405,7 +834,7 @@ class JourneyMapper:
         transition_counts = {}
         
         for customer_id in self.orders['customer_id'].unique():
-            customer_orders = self.orders[self.orders['customer_id'] == customer_id]
+            customer_orders = self._customer_orders(customer_id)
             stages = customer_orders['journey_stage'].tolist()
             
             for i in range(len(stages) - 1):
@@ -431,6 +860,88 @@ class JourneyMapper:
         logger.debug(f"Transition probabilities: {transition_probabilities}")
         return transition_probabilities
 
+    def mine_paths(
+        self,
+        attribute: str = 'style',
+        min_support: float = 0.01,
+        max_depth: int = 4,
+        anchored: bool = False,
+        collapse_repeats: bool = True
+    ) -> PathTrie:
+        """
+        Mine frequent multi-step journeys.
+        
+        Args:
+            attribute: Order attribute forming the steps (style, category,
+                name...) or 'stage' for journey stage progressions
+            min_support: Minimum share of customers following a path
+            max_depth: Longest path mined
+            anchored: Only count journeys from each customer's first step
+            collapse_repeats: Treat repeated consecutive steps as one
+        
+        Returns:
+            PathTrie answering top_paths, support_of and next_steps queries
+        
+        Raises:
+            ValueError: If the attribute is not available
+        """
+        if attribute == 'stage':
+            steps = stage_sequences(self)
+            customers, tokens = steps['customer_id'], steps['stage']
+        elif attribute in self.orders.columns:
+            orders = self.orders.sort_values(['customer_id', 'created_at'], kind='stable')
+            customers, tokens = orders['customer_id'], orders[attribute]
+        else:
+            raise ValueError(f"Unknown path attribute: {attribute}")
+        
+        codes, offsets, vocabulary = encode_sequences(customers, tokens, collapse_repeats)
+        trie = PathTrie(codes, offsets, vocabulary, min_support, max_depth, anchored)
+        logger.debug(f"Mined {len(trie)} frequent {attribute} paths")
+        return trie
+
+    def survival_curves(
+        self,
+        event: str = 'second_purchase',
+        by: Optional[str] = None,
+        as_of: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """
+        Kaplan-Meier curves of time to a journey event.
+        
+        Args:
+            event: 'second_purchase' (days from first to second purchase),
+                'return' (days from delivery to return) or 'stage_dwell'
+                (days spent in a journey stage)
+            by: Grouping from SURVIVAL_GROUPS[event]; None for one curve
+                (stage dwell is always grouped by stage)
+            as_of: End of follow-up; defaults to the latest date in orders
+        
+        Returns:
+            DataFrame with group, time (days), at_risk, events, censored
+            and survival
+        
+        Raises:
+            ValueError: If the event or grouping is unknown
+        """
+        if event not in SURVIVAL_GROUPS:
+            raise ValueError(f"Unknown survival event: {event}")
+        if by is not None and by not in SURVIVAL_GROUPS[event]:
+            raise ValueError(f"Unknown grouping for {event}: {by}")
+        
+        if event == 'second_purchase':
+            durations = second_purchase_durations(self.orders, as_of)
+        elif event == 'return':
+            durations = return_durations(self.orders, as_of)
+        else:
+            orders = self.orders.sort_values(['customer_id', 'created_at'], kind='stable')
+            durations = stage_dwell_durations(orders, stage_sequences(self)['stage'], as_of)
+            by = 'stage'
+        
+        groups = durations[by] if by is not None else None
+        curves = kaplan_meier(durations['duration_days'], durations['observed'], groups)
+        logger.debug(f"Kaplan-Meier {event} curves over {len(durations)} subjects")
+        return curves
+
     def predict_confidence(self, customer_orders: pd.DataFrame) -> float:
         """Predict future confidence score based on historical purchase data.
         
@@ -444,16 +955,64 @@ class JourneyMapper:
         if len(customer_orders) == 0:
             return 0.0
         
-        # Calculate average confidence score from past orders
-        scores = []
-        for index, order in customer_orders.iterrows():
-            score = self._calculate_confidence_score(customer_orders.iloc[:index + 1])
-            scores.append(score)
+        # Calculate average confidence score over each order prefix
+        scores = [
+            self._calculate_confidence_score(customer_orders.iloc[:position + 1])
+            for position in range(len(customer_orders))
+        ]
         
         predicted_score = sum(scores) / len(scores)
         logger.debug(f"Predicted confidence score: {predicted_score}")
         return min(max(predicted_score, 0.0), 1.0)
 
+    def fit_confidence_model(
+        self,
+        kind: str = 'logistic',
+        cutoff: Optional[pd.Timestamp] = None
+    ) -> ConfidenceModel:
+        """
+        Fit the batch confidence model on this mapper's orders.
+        
+        Args:
+            kind: 'logistic' or 'gbm'
+            cutoff: Split between feature history and outcome
+        
+        Returns:
+            The fitted model, also kept as self.confidence_model
+        """
+        self.confidence_model = ConfidenceModel(kind, self.CONFIDENCE_THRESHOLD).fit(self.orders, cutoff)
+        return self.confidence_model
+
+    def predict_confidence_batch(self, customer_ids: Optional[List[str]] = None) -> pd.Series:
+        """
+        Score many customers in one vectorized call.
+        
+        Features are aggregated for all requested customers at once. With
+        a fitted confidence model the score is its probability of reaching
+        confident sizing; otherwise it is the current rule-based
+        confidence score.
+        
+        Args:
+            customer_ids: Customers to score; all customers when None
+        
+        Returns:
+            Series of scores between 0 and 1 indexed by customer_id;
+            customers without orders score 0
+        """
+        orders = self.orders
+        if customer_ids is not None:
+            orders = orders[orders['customer_id'].isin(customer_ids)]
+        features = customer_features(orders)
+        
+        if self.confidence_model is not None:
+            scores = self.confidence_model.predict(features)
+        else:
+            scores = rule_confidence(features)
+        
+        if customer_ids is not None:
+            scores = scores.reindex(pd.Index(customer_ids, name='customer_id'), fill_value=0.0)
+        return scores.astype(float)
+
     def generate_recommendations(self, customer_id: str) -> List[str]:
         """Generate personalized recommendations for a customer based on their journey stage.
         
@@ -466,7 +1025,7 @@ class JourneyMapper:
         logger.debug(f"Generating recommendations for customer {customer_id}")
         
         # Get customer's purchase history
-        customer_orders = self.orders[self.orders['customer_id'] == customer_id]
+        customer_orders = self._customer_orders(customer_id)
         
         if customer_orders.empty:
             logger.debug("No orders found for customer.")
@@ -475,6 +1034,14 @@ class JourneyMapper:
         # Determine the customer's journey stage
         journey_stage, _ = self.determine_journey_stage(customer_id)
         
+        recommendations = self._recommendations_for_stage(journey_stage)
+        
+        logger.debug(f"Recommendations for customer {customer_id}: {recommendations}")
+        return recommendations
+
+    @staticmethod
+    def _recommendations_for_stage(journey_stage: JourneyStage) -> List[str]:
+        """Recommendations shown to a customer with orders at a given stage."""
         recommendations = []
         
         if journey_stage == JourneyStage.FIRST_PURCHASE:
@@ -488,9 +1055,9 @@ class JourneyMapper:
         elif journey_stage == JourneyStage.BRAND_LOYAL:
             recommendations.append("Thank you for being a loyal customer! Enjoy exclusive discounts.")
         
-        logger.debug(f"Recommendations for customer {customer_id}: {recommendations}")
         return recommendations
 
+    @cached_analysis
     def analyze_cohort_journeys(self) -> Dict[str, Dict[str, float]]:
         """Analyze customer journeys based on cohorts.
         
@@ -502,7 +1069,7 @@ class JourneyMapper:
         cohort_counts = {}
         
         for customer_id in self.orders['customer_id'].unique():
-            customer_orders = self.orders[self.orders['customer_id'] == customer_id]
+            customer_orders = self._customer_orders(customer_id)
             stages = customer_orders['journey_stage'].tolist()
             cohort_name = self._determine_cohort(customer_orders)
             
@@ -525,6 +1092,7 @@ class JourneyMapper:
         logger.debug(f"Cohort probabilities: {cohort_probabilities}")
         return cohort_probabilities
 
+    @cached_analysis
     def analyze_cross_sell_patterns(self) -> Dict[str, Dict[str, float]]:
         """Analyze cross-sell patterns between product categories.
         
@@ -536,7 +1104,7 @@ class JourneyMapper:
         cross_sell_counts = {}
         
         for customer_id in self.orders['customer_id'].unique():
-            customer_orders = self.orders[self.orders['customer_id'] == customer_id]
+            customer_orders = self._customer_orders(customer_id)
             categories = customer_orders['category'].tolist()
             
             for i in range(len(categories) - 1):
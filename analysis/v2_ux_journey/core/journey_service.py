@@ -0,0 +1,433 @@
+"""
+Journey Service Module
+
+This module serves journey analytics over HTTP with asyncio and no
+third-party web framework. A prepared JourneyMapper is loaded once;
+stages and recommendations come from an immutable JourneyView, the
+aggregate reports are computed and JSON-encoded at startup, and point
+lookups arriving within a short window are resolved together in one
+batch. Everything derived from one mapper lives in a single immutable
+serving state that a reload replaces in one assignment. Per-route latency histograms are exposed at /metrics.
+
+Routes (GET):
+    /stage?customer_id=...            determine_journey_stage
+    /recommendations?customer_id=...  generate_recommendations
+    /confidence?customer_id=...       predict_confidence
+    /reports/<name>                   precomputed aggregate report
+    /metrics                          latency histograms
+"""
+
+import asyncio
+import bisect
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .journey_mapping import JourneyMapper
+from .journey_view import JourneyView
+from .result_cache import ResultCache
+from .snapshot import customer_offsets
+
+logger = logging.getLogger(__name__)
+
+# Aggregate reports served under /reports/<name>
+REPORTS = {
+    'entry_points': 'identify_entry_points',
+    'category_flow': 'analyze_category_flow',
+    'journey_patterns': 'analyze_journey_patterns',
+    'cohort_journeys': 'analyze_cohort_journeys',
+    'cross_sell_patterns': 'analyze_cross_sell_patterns',
+}
+
+# Upper bucket edges in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+_STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record one observation given in seconds."""
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bucket edge containing the q-th quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Latency bound in milliseconds (inf for the open bucket), or
+            None when nothing was recorded
+        """
+        if self.total == 0:
+            return None
+        rank = q * self.total
+        seen = 0
+        for edge, count in zip(self.buckets_ms + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return edge
+        return float('inf')
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts and quantile bounds for reporting."""
+        return {
+            'count': self.total,
+            'mean_ms': self.sum_ms / self.total if self.total else None,
+            'p50_ms': self.quantile(0.5),
+            'p90_ms': self.quantile(0.9),
+            'p99_ms': self.quantile(0.99),
+            'buckets': {
+                f"le_{edge}": count for edge, count in zip(self.buckets_ms + ('inf',), self.counts)
+            },
+        }
+
+class MicroBatcher:
+    """Collects point lookups for a short window and resolves them together."""
+
+    def __init__(
+        self,
+        resolve: Callable[[List[Any]], List[Any]],
+        window: float = 0.001,
+        max_batch: int = 256,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            resolve: Maps a list of keys to a list of results in order
+            window: Seconds to wait for more keys after the first one
+            max_batch: Batch size that triggers an immediate flush
+            executor: Run resolve off the event loop when given
+        """
+        self.resolve = resolve
+        self.window = window
+        self.max_batch = max_batch
+        self.executor = executor
+        self.batches = 0
+        self.batched_keys = 0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, key: Any) -> Any:
+        """Queue a key and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Resolve every pending key in one call."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.batched_keys += len(batch)
+        keys = [key for key, _ in batch]
+
+        if self.executor is None:
+            try:
+                self._deliver(batch, self.resolve(keys), None)
+            except Exception as e:
+                self._deliver(batch, None, e)
+            return
+
+        task = asyncio.get_running_loop().run_in_executor(self.executor, self.resolve, keys)
+        task.add_done_callback(
+            lambda done: self._deliver(batch, None, done.exception()) if done.exception()
+            else self._deliver(batch, done.result(), None)
+        )
+
+    @staticmethod
+    def _deliver(batch, results, error) -> None:
+        """Complete the waiting futures of a batch."""
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+@dataclass(frozen=True)
+class _ServingState:
+    """Everything served from one data version, swapped as a unit."""
+    mapper: JourneyMapper
+    view: JourneyView
+    orders: pd.DataFrame
+    customers: pd.Index
+    offsets: np.ndarray
+    reports: Dict[str, bytes]
+    predictions: ResultCache  # bounded LRU of known customers only
+
+class JourneyService:
+    """Asyncio HTTP service over a prepared JourneyMapper."""
+
+    def __init__(
+        self,
+        mapper: JourneyMapper,
+        batch_window: float = 0.001,
+        max_batch: int = 256,
+        workers: int = 2,
+        max_predictions: int = 100_000
+    ):
+        """
+        Initialize the service and precompute everything it serves.
+
+        Args:
+            mapper: Prepared JourneyMapper
+            batch_window: Seconds point lookups wait to join a batch
+            max_batch: Lookups that trigger an immediate batch
+            workers: Threads resolving confidence predictions
+            max_predictions: Confidence predictions memoized per data
+                version, least recently used evicted first
+        """
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='journey-service')
+        self.max_predictions = max_predictions
+        self._state: Optional[_ServingState] = None
+        self.load(mapper)
+
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self._batchers = {
+            'stage': MicroBatcher(self._resolve_stages, batch_window, max_batch),
+            'recommendations': MicroBatcher(self._resolve_recommendations, batch_window, max_batch),
+            'confidence': MicroBatcher(self._resolve_confidence, batch_window, max_batch, self.executor),
+        }
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def load(self, mapper: JourneyMapper, version: Optional[str] = None) -> None:
+        """
+        Precompute views and reports for a mapper and publish them.
+
+        Safe to call from a background thread while serving; requests
+        keep using the previous data until the swap.
+
+        Args:
+            mapper: Prepared JourneyMapper
+            version: Optional label of the data
+        """
+        started = time.perf_counter()
+        view = JourneyView.from_mapper(mapper, version)
+        if mapper.customer_offsets is not None:
+            # Snapshot orders are already grouped by customer in date order
+            orders, customers, offsets = mapper.orders, mapper.customer_index, mapper.customer_offsets
+        else:
+            orders = mapper.orders.sort_values(['customer_id', 'created_at'], kind='stable').reset_index(drop=True)
+            customers, offsets = customer_offsets(orders['customer_id'])
+        reports = {}
+        for name, method in REPORTS.items():
+            try:
+                reports[name] = json.dumps(getattr(mapper, method)(), default=str).encode()
+            except KeyError as e:
+                # e.g. journey_stage-based reports on data without that column
+                logger.warning(f"Report {name} unavailable, missing column {e}")
+
+        self._state = _ServingState(
+            mapper, view, orders, customers, offsets, reports, ResultCache(max_items=self.max_predictions)
+        )
+        logger.debug(f"Service loaded {len(view)} customers in {time.perf_counter() - started:.2f}s")
+
+    @property
+    def view(self) -> JourneyView:
+        """View of the currently served data."""
+        return self._state.view
+
+    # Batch resolvers: each batch reads one state, so a refresh never
+    # mixes data versions inside a batch.
+
+    def _resolve_stages(self, customer_ids: List[str]) -> List[Dict[str, Any]]:
+        view = self._state.view
+        results = []
+        for customer_id in customer_ids:
+            stage, confidence = view.stage(customer_id)
+            results.append({'customer_id': customer_id, 'stage': stage.value, 'confidence': confidence})
+        return results
+
+    def _resolve_recommendations(self, customer_ids: List[str]) -> List[Dict[str, Any]]:
+        view = self._state.view
+        return [
+            {'customer_id': customer_id, 'recommendations': list(view.recommendations(customer_id))}
+            for customer_id in customer_ids
+        ]
+
+    def _resolve_confidence(self, customer_ids: List[str]) -> List[Dict[str, Any]]:
+        state = self._state
+        predictions = state.predictions
+        positions = state.customers.get_indexer(customer_ids)
+        results = []
+        for customer_id, position in zip(customer_ids, positions):
+            if position < 0:
+                # Unknown ids are not memoized, so arbitrary lookups cannot grow the cache
+                confidence = 0.0
+            else:
+                confidence = predictions.get(customer_id)
+                if confidence is None:
+                    start, end = state.offsets[position], state.offsets[position + 1]
+                    customer_orders = state.orders.iloc[start:end].reset_index(drop=True)
+                    confidence = state.mapper.predict_confidence(customer_orders)
+                    predictions.put(customer_id, confidence)
+            results.append({'customer_id': customer_id, 'predicted_confidence': confidence})
+        return results
+
+    async def handle(self, method: str, target: str) -> Tuple[int, bytes]:
+        """
+        Route one request.
+
+        Args:
+            method: HTTP method
+            target: Request target (path and query string)
+
+        Returns:
+            Tuple of (status code, JSON body)
+        """
+        if method != 'GET':
+            return 405, _error("Only GET is supported")
+
+        url = urlsplit(target)
+        route = url.path.strip('/')
+
+        if route in self._batchers:
+            customer_id = parse_qs(url.query).get('customer_id', [None])[0]
+            if not customer_id:
+                return 400, _error("customer_id is required")
+            result = await self._batchers[route].submit(customer_id)
+            return 200, json.dumps(result).encode()
+
+        if route.startswith('reports/'):
+            body = self._state.reports.get(route[len('reports/'):])
+            if body is None:
+                return 404, _error(f"Unknown report: {route}")
+            return 200, body
+
+        if route == 'metrics':
+            return 200, json.dumps(self.metrics()).encode()
+
+        return 404, _error(f"Unknown route: /{route}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Latency and batch size summaries per route."""
+        return {
+            'latency': {route: hist.summary() for route, hist in self.latency.items()},
+            'batches': {
+                route: {
+                    'count': batcher.batches,
+                    'mean_size': batcher.batched_keys / batcher.batches if batcher.batches else None,
+                }
+                for route, batcher in self._batchers.items()
+            },
+        }
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                started = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, _error("Malformed request line"), False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip().lower()
+                if headers.get('content-length'):
+                    await reader.readexactly(int(headers['content-length']))
+
+                keep_alive = (
+                    headers.get('connection') != 'close' and version.upper() != 'HTTP/1.0'
+                ) or headers.get('connection') == 'keep-alive'
+                try:
+                    status, body = await self.handle(method, target)
+                except Exception as e:
+                    logger.error(f"Error serving {target}: {str(e)}")
+                    status, body = 500, _error("Internal error")
+
+                await self._respond(writer, status, body, keep_alive)
+                route = urlsplit(target).path.strip('/').split('/')[0] or '/'
+                self.latency.setdefault(route, LatencyHistogram()).record(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool) -> None:
+        """Write one JSON response."""
+        head = (
+            f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080) -> asyncio.AbstractServer:
+        """
+        Start listening.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind; 0 picks a free port
+
+        Returns:
+            The asyncio server
+        """
+        self._server = await asyncio.start_server(self._serve_connection, host, port, backlog=1024)
+        logger.info(f"Journey service listening on {self._server.sockets[0].getsockname()}")
+        return self._server
+
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 8080) -> None:
+        """Start the server and serve until cancelled."""
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening and release worker threads."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.executor.shutdown(wait=False)
+
+def _error(message: str) -> bytes:
+    """JSON error body."""
+    return json.dumps({'error': message}).encode()
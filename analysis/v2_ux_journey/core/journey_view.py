@@ -0,0 +1,257 @@
+"""
+Journey View Module
+
+This module provides a read-optimized, immutable view of a prepared
+JourneyMapper for concurrent serving. Every customer's stage, confidence
+and recommendations are computed once when the view is built, so request
+threads only perform dictionary lookups and never touch the mapper's
+mutable frames. A JourneyViewHolder rebuilds views in the background and
+swaps them in with a single reference assignment.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional, Tuple
+import logging
+
+from .journey_mapping import JourneyMapper, JourneyStage
+
+logger = logging.getLogger(__name__)
+
+NEW_CUSTOMER_RECOMMENDATIONS = ("Explore our new arrivals!",)
+
+@dataclass(frozen=True)
+class CustomerJourney:
+    """Precomputed journey state of one customer."""
+    stage: JourneyStage
+    confidence: float
+    recommendations: Tuple[str, ...]
+    order_count: int
+
+class JourneyView:
+    """Immutable, lock-free lookup table over a mapper's journeys."""
+
+    def __init__(
+        self,
+        customers: Mapping[str, CustomerJourney],
+        entry_points: Mapping[str, float],
+        version: Optional[str] = None
+    ):
+        """
+        Initialize the view.
+
+        Args:
+            customers: Journey state by customer_id
+            entry_points: Entry point distribution
+            version: Optional label of the data the view was built from
+        """
+        self._customers = MappingProxyType(dict(customers))
+        self._entry_points = MappingProxyType(dict(entry_points))
+        self._stage_distribution = MappingProxyType(self._count_stages(self._customers))
+        self.version = version
+        self.built_at = time.time()
+
+    def __setattr__(self, name, value):
+        if hasattr(self, 'built_at'):
+            raise AttributeError("JourneyView is immutable")
+        super().__setattr__(name, value)
+
+    @staticmethod
+    def _count_stages(customers: Mapping[str, CustomerJourney]) -> Dict[str, float]:
+        """Share of customers in each journey stage."""
+        counts = {stage.value: 0 for stage in JourneyStage}
+        for journey in customers.values():
+            counts[journey.stage.value] += 1
+        total = len(customers)
+        return {stage: count / total for stage, count in counts.items()} if total else counts
+
+    @classmethod
+    def from_mapper(cls, mapper: JourneyMapper, version: Optional[str] = None) -> 'JourneyView':
+        """
+        Build a view by evaluating every customer of a prepared mapper.
+
+        Orders are sorted once (or used as-is when the mapper carries
+        customer offsets from a snapshot) and split by customer, instead
+        of filtering the full frame per customer.
+
+        Args:
+            mapper: Prepared JourneyMapper
+            version: Optional label of the data the view was built from
+
+        Returns:
+            JourneyView
+        """
+        orders = mapper.orders
+        if mapper.customer_offsets is None:
+            orders = orders.sort_values(['customer_id', 'created_at'], kind='stable')
+        customers = {}
+        for customer_id, customer_orders in orders.groupby('customer_id', sort=False, observed=True):
+            stage, confidence = mapper._stage_for_orders(customer_orders)
+            customers[customer_id] = CustomerJourney(
+                stage=stage,
+                confidence=float(confidence),
+                recommendations=tuple(mapper._recommendations_for_stage(stage)),
+                order_count=len(customer_orders),
+            )
+
+        view = cls(customers, mapper.identify_entry_points(), version)
+        logger.debug(f"Built journey view {version} for {len(customers)} customers")
+        return view
+
+    def __len__(self) -> int:
+        return len(self._customers)
+
+    def __contains__(self, customer_id: str) -> bool:
+        return customer_id in self._customers
+
+    def journey(self, customer_id: str) -> Optional[CustomerJourney]:
+        """
+        Look up a customer's precomputed journey.
+
+        Args:
+            customer_id: Unique customer identifier
+
+        Returns:
+            CustomerJourney, or None for customers without orders
+        """
+        return self._customers.get(customer_id)
+
+    def stage(self, customer_id: str) -> Tuple[JourneyStage, float]:
+        """
+        Journey stage and confidence, as JourneyMapper.determine_journey_stage.
+
+        Args:
+            customer_id: Unique customer identifier
+
+        Returns:
+            Tuple of (JourneyStage, confidence_score)
+
+        Raises:
+            ValueError: If customer_id is not a string
+        """
+        if not isinstance(customer_id, str):
+            raise ValueError("Customer ID must be a string")
+        journey = self._customers.get(customer_id)
+        if journey is None:
+            return JourneyStage.FIRST_PURCHASE, 0.0
+        return journey.stage, journey.confidence
+
+    def recommendations(self, customer_id: str) -> Tuple[str, ...]:
+        """
+        Recommendations, as JourneyMapper.generate_recommendations.
+
+        Args:
+            customer_id: Unique customer identifier
+
+        Returns:
+            Tuple of recommended products or actions
+        """
+        journey = self._customers.get(customer_id)
+        if journey is None:
+            return NEW_CUSTOMER_RECOMMENDATIONS
+        return journey.recommendations
+
+    @property
+    def entry_points(self) -> Mapping[str, float]:
+        """Read-only entry point distribution."""
+        return self._entry_points
+
+    @property
+    def stage_distribution(self) -> Mapping[str, float]:
+        """Read-only share of customers per journey stage."""
+        return self._stage_distribution
+
+class JourneyViewHolder:
+    """
+    Publishes the current JourneyView to reader threads.
+
+    Readers take ``holder.view`` once per request and use that object
+    throughout, so they always see one complete view. Rebinding the
+    attribute is atomic, so readers never lock; the lock only serializes
+    writers.
+    """
+
+    def __init__(self, view: Optional[JourneyView] = None):
+        """
+        Initialize the holder.
+
+        Args:
+            view: Initial view, if one is already built
+        """
+        self.view = view
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def swap(self, view: JourneyView) -> Optional[JourneyView]:
+        """
+        Publish a new view.
+
+        Args:
+            view: Fully built view
+
+        Returns:
+            The previously published view
+        """
+        with self._lock:
+            previous, self.view = self.view, view
+        return previous
+
+    def refresh(self, build: Callable[[], JourneyView]) -> bool:
+        """
+        Build a view and publish it; on failure keep serving the old one.
+
+        Args:
+            build: Callable returning a new JourneyView
+
+        Returns:
+            True if a new view was published
+        """
+        started = time.perf_counter()
+        try:
+            view = build()
+        except Exception as e:
+            logger.error(f"Journey view refresh failed, keeping previous view: {str(e)}")
+            return False
+        self.swap(view)
+        logger.debug(f"Published journey view {view.version} in {time.perf_counter() - started:.2f}s")
+        return True
+
+    def start(self, build: Callable[[], JourneyView], interval: float = 300.0) -> None:
+        """
+        Refresh in a background daemon thread every ``interval`` seconds.
+
+        Args:
+            build: Callable returning a new JourneyView
+            interval: Seconds between refreshes
+
+        Raises:
+            ValueError: If a refresh thread is already running
+        """
+        if self._thread is not None and self._thread.is_alive():
+            raise ValueError("Refresh thread is already running")
+        if self.view is None:
+            self.refresh(build)
+
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.refresh(build)
+
+        self._thread = threading.Thread(target=loop, name='journey-view-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background refresh thread.
+
+        Args:
+            timeout: Seconds to wait for an in-flight refresh to finish
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
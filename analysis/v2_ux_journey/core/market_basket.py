@@ -0,0 +1,350 @@
+"""
+Market Basket Module
+
+This module analyzes which products are bought together in the same
+order, using a sparse order x product matrix for pair statistics and
+FP-growth for larger itemsets.
+"""
+
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from itertools import combinations
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _FPNode:
+    """Node of an FP-tree."""
+
+    __slots__ = ('item', 'count', 'parent', 'children', 'link')
+
+    def __init__(self, item: Optional[int], parent: Optional['_FPNode']):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children: Dict[int, '_FPNode'] = {}
+        self.link: Optional['_FPNode'] = None
+
+def _build_fp_tree(
+    transactions: List[Tuple[List[int], int]],
+    min_count: int
+) -> Tuple[_FPNode, Dict[int, List]]:
+    """
+    Build an FP-tree from weighted transactions.
+
+    Args:
+        transactions: List of (items, weight) pairs
+        min_count: Minimum item count kept in the tree
+
+    Returns:
+        Tuple of (root, header) where header maps item -> [count, first_node]
+    """
+    counts: Dict[int, int] = {}
+    for items, weight in transactions:
+        for item in items:
+            counts[item] = counts.get(item, 0) + weight
+
+    header = {item: [count, None] for item, count in counts.items() if count >= min_count}
+    root = _FPNode(None, None)
+
+    for items, weight in transactions:
+        # Most frequent items first so shared prefixes compress
+        kept = sorted(
+            (item for item in items if item in header),
+            key=lambda item: (-header[item][0], item)
+        )
+        node = root
+        for item in kept:
+            child = node.children.get(item)
+            if child is None:
+                child = _FPNode(item, node)
+                node.children[item] = child
+                child.link = header[item][1]
+                header[item][1] = child
+            child.count += weight
+            node = child
+
+    return root, header
+
+def _mine_fp_tree(
+    header: Dict[int, List],
+    min_count: int,
+    suffix: Tuple[int, ...],
+    max_length: Optional[int],
+    results: Dict[FrozenSet[int], int]
+) -> None:
+    """Recursively mine frequent itemsets from an FP-tree header table."""
+    for item, (count, node) in sorted(header.items(), key=lambda kv: kv[1][0]):
+        itemset = suffix + (item,)
+        results[frozenset(itemset)] = count
+
+        if max_length is not None and len(itemset) >= max_length:
+            continue
+
+        # Conditional pattern base: prefix paths leading to this item
+        conditional = []
+        while node is not None:
+            path = []
+            parent = node.parent
+            while parent is not None and parent.item is not None:
+                path.append(parent.item)
+                parent = parent.parent
+            if path:
+                conditional.append((path, node.count))
+            node = node.link
+
+        if conditional:
+            _, conditional_header = _build_fp_tree(conditional, min_count)
+            if conditional_header:
+                _mine_fp_tree(conditional_header, min_count, itemset, max_length, results)
+
+class MarketBasketAnalyzer:
+    """Analyzes co-purchase patterns across multi-item orders."""
+
+    def __init__(
+        self,
+        order_items: pd.DataFrame,
+        basket_col: str = 'order_id',
+        item_col: str = 'product_id'
+    ):
+        """
+        Initialize with order item data.
+
+        Args:
+            order_items: DataFrame with one row per purchased item
+            basket_col: Column identifying the basket (order)
+            item_col: Column identifying the item
+
+        Raises:
+            ValueError: If order_items is not a DataFrame or columns are missing
+        """
+        if not isinstance(order_items, pd.DataFrame):
+            raise ValueError("Order items must be a DataFrame")
+        missing = {basket_col, item_col} - set(order_items.columns)
+        if missing:
+            raise ValueError(f"Missing required columns in order items data: {missing}")
+
+        items = order_items[[basket_col, item_col]].dropna()
+        basket_codes, self.basket_labels = pd.factorize(items[basket_col])
+        item_codes, self.item_labels = pd.factorize(items[item_col])
+
+        # Binary order x product matrix; duplicates within an order collapse
+        matrix = sparse.csr_matrix(
+            (np.ones(len(items), dtype=np.int32), (basket_codes, item_codes)),
+            shape=(len(self.basket_labels), len(self.item_labels))
+        )
+        matrix.data[:] = 1
+        self.baskets = matrix
+        self.n_baskets = matrix.shape[0]
+        self.item_counts = np.asarray(matrix.sum(axis=0)).ravel()
+
+        logger.debug(
+            f"Basket matrix: {self.n_baskets} orders x {len(self.item_labels)} items, "
+            f"{matrix.nnz} non-zeros"
+        )
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: str,
+        basket_col: str = 'order_id',
+        item_col: str = 'product_id'
+    ) -> 'MarketBasketAnalyzer':
+        """
+        Build an analyzer reading only the basket and item columns.
+
+        Args:
+            path: CSV of order items (e.g. transformed_order_items_*.csv)
+            basket_col: Column identifying the basket (order)
+            item_col: Column identifying the item
+
+        Returns:
+            MarketBasketAnalyzer
+        """
+        items = pd.read_csv(
+            path,
+            usecols=[basket_col, item_col],
+            dtype={basket_col: 'category', item_col: 'category'}
+        )
+        return cls(items, basket_col, item_col)
+
+    def pair_metrics(self, min_support: float = 0.0, block_size: int = 500_000) -> pd.DataFrame:
+        """
+        Compute support, confidence and lift for every co-purchased pair.
+
+        Co-occurrence counts come from X.T @ X over row blocks of the
+        basket matrix, so peak memory is bounded by the block size and
+        the (sparse) item x item result.
+
+        Args:
+            min_support: Minimum pair support to keep
+            block_size: Orders per sparse product block
+
+        Returns:
+            DataFrame with item_a, item_b, count, support, confidence_ab,
+            confidence_ba and lift, sorted by lift
+        """
+        n_items = len(self.item_labels)
+        co_counts = sparse.csr_matrix((n_items, n_items), dtype=np.int64)
+        for start in range(0, self.n_baskets, block_size):
+            block = self.baskets[start:start + block_size]
+            co_counts = co_counts + (block.T @ block).astype(np.int64)
+
+        pairs = sparse.triu(co_counts, k=1).tocoo()
+        counts = pairs.data.astype(float)
+        keep = counts / max(self.n_baskets, 1) >= min_support
+        rows, cols, counts = pairs.row[keep], pairs.col[keep], counts[keep]
+
+        count_a = self.item_counts[rows]
+        count_b = self.item_counts[cols]
+        metrics = pd.DataFrame({
+            'item_a': self.item_labels[rows],
+            'item_b': self.item_labels[cols],
+            'count': counts.astype(int),
+            'support': counts / self.n_baskets,
+            'confidence_ab': counts / count_a,
+            'confidence_ba': counts / count_b,
+            'lift': counts * self.n_baskets / (count_a * count_b),
+        })
+        return metrics.sort_values(['lift', 'count'], ascending=False).reset_index(drop=True)
+
+    def _weighted_baskets(self, min_count: int) -> List[Tuple[List[int], int]]:
+        """
+        Collapse identical baskets, restricted to frequent items.
+
+        Baskets are grouped by length, and each group is a dense
+        (baskets x length) array whose distinct rows np.unique counts, so
+        memory stays proportional to the non-zeros and only distinct
+        baskets reach Python.
+
+        Args:
+            min_count: Minimum item count kept
+
+        Returns:
+            List of (items, weight) pairs, one per distinct basket
+        """
+        frequent_items = np.flatnonzero(self.item_counts >= min_count)
+        pruned = self.baskets[:, frequent_items].tocsr()
+        pruned.sort_indices()
+        lengths = np.diff(pruned.indptr)
+        items = frequent_items[pruned.indices]
+        starts = pruned.indptr[:-1]
+
+        transactions = []
+        for length in np.unique(lengths[lengths > 0]):
+            rows = np.flatnonzero(lengths == length)
+            block = items[starts[rows][:, None] + np.arange(length)]
+            distinct, weights = np.unique(block, axis=0, return_counts=True)
+            transactions += list(zip(distinct.tolist(), weights.tolist()))
+        return transactions
+
+    def _mine(self, min_support: float, max_length: Optional[int]) -> Dict[FrozenSet[int], int]:
+        """Counts of the frequent itemsets, keyed by frozensets of item codes."""
+        min_count = max(1, int(np.ceil(min_support * self.n_baskets)))
+        _, header = _build_fp_tree(self._weighted_baskets(min_count), min_count)
+
+        results: Dict[FrozenSet[int], int] = {}
+        _mine_fp_tree(header, min_count, (), max_length, results)
+        return results
+
+    def frequent_itemsets(
+        self,
+        min_support: float = 0.01,
+        max_length: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Mine frequent itemsets with FP-growth.
+
+        Items below min_support are pruned before the tree is built, and
+        identical baskets are collapsed into weighted transactions.
+
+        Args:
+            min_support: Minimum fraction of orders containing the itemset
+            max_length: Optional maximum itemset size
+
+        Returns:
+            DataFrame with itemset (tuple of items), length, count and
+            support, sorted by support
+        """
+        results = self._mine(min_support, max_length)
+        itemsets = pd.DataFrame({
+            'itemset': [tuple(self.item_labels[sorted(codes)]) for codes in results],
+            'length': [len(codes) for codes in results],
+            'count': list(results.values()),
+        })
+        itemsets['support'] = itemsets['count'] / max(self.n_baskets, 1)
+        return itemsets.sort_values(['support', 'length'], ascending=[False, True]).reset_index(drop=True)
+
+    def association_rules(
+        self,
+        min_support: float = 0.01,
+        min_confidence: float = 0.1,
+        min_lift: float = 1.0,
+        max_length: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Derive ranked association rules from frequent itemsets.
+
+        Args:
+            min_support: Minimum itemset support
+            min_confidence: Minimum rule confidence
+            min_lift: Minimum rule lift
+            max_length: Optional maximum itemset size
+
+        Returns:
+            DataFrame with antecedent, consequent (tuples of items),
+            support, confidence and lift, ranked by lift then confidence
+        """
+        counts = self._mine(min_support, max_length)
+
+        rules = []
+        for itemset, count in counts.items():
+            if len(itemset) < 2:
+                continue
+            for size in range(1, len(itemset)):
+                for antecedent in combinations(sorted(itemset), size):
+                    antecedent = frozenset(antecedent)
+                    consequent = itemset - antecedent
+                    confidence = count / counts[antecedent]
+                    lift = confidence * self.n_baskets / counts[consequent]
+                    if confidence >= min_confidence and lift >= min_lift:
+                        rules.append((
+                            tuple(self.item_labels[sorted(antecedent)]),
+                            tuple(self.item_labels[sorted(consequent)]),
+                            count / self.n_baskets,
+                            confidence,
+                            lift
+                        ))
+
+        table = pd.DataFrame(
+            rules, columns=['antecedent', 'consequent', 'support', 'confidence', 'lift']
+        )
+        return table.sort_values(['lift', 'confidence'], ascending=False).reset_index(drop=True)
+
+    @staticmethod
+    def query_rules(
+        rules: pd.DataFrame,
+        antecedent: Optional[object] = None,
+        consequent: Optional[object] = None,
+        top_n: int = 10
+    ) -> pd.DataFrame:
+        """
+        Filter a rules table to rules involving the given items.
+
+        Args:
+            rules: Output of association_rules
+            antecedent: Item that must appear in the antecedent
+            consequent: Item that must appear in the consequent
+            top_n: Number of rules to return
+
+        Returns:
+            Top matching rules in ranked order
+        """
+        mask = pd.Series(True, index=rules.index)
+        if antecedent is not None:
+            mask &= rules['antecedent'].map(lambda items: antecedent in items)
+        if consequent is not None:
+            mask &= rules['consequent'].map(lambda items: consequent in items)
+        return rules[mask].head(top_n)
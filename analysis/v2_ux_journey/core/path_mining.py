@@ -0,0 +1,298 @@
+"""
+Path Mining Module
+
+This module mines frequent multi-step journeys (e.g. Lace -> Wireless ->
+Strapless) from per-customer sequences of styles, categories or journey
+stages. Paths are stored in an array-backed prefix trie that is grown one
+depth level at a time over all customers at once; a path is only extended
+while it meets the minimum support, so memory is bounded by the number of
+frequent paths rather than by the number of customers.
+"""
+
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .confidence_model import running_confidence
+
+logger = logging.getLogger(__name__)
+
+def encode_sequences(
+    customers: pd.Series,
+    tokens: pd.Series,
+    collapse_repeats: bool = True
+) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """
+    Encode per-customer token sequences as flat codes plus offsets.
+
+    Args:
+        customers: Customer of each row, rows grouped by customer in
+            chronological order
+        tokens: Token (style, category, stage...) of each row
+        collapse_repeats: Merge consecutive identical tokens of a customer
+            into one step
+
+    Returns:
+        Tuple of (codes, offsets, vocabulary) where customer i's sequence
+        is codes[offsets[i]:offsets[i + 1]]
+    """
+    valid = tokens.notna().to_numpy()
+    customer_codes = pd.factorize(customers.to_numpy()[valid])[0]
+    codes, vocabulary = pd.factorize(tokens.to_numpy()[valid])
+
+    new_customer = np.ones(len(codes), dtype=bool)
+    new_customer[1:] = customer_codes[1:] != customer_codes[:-1]
+    if collapse_repeats:
+        keep = new_customer.copy()
+        keep[1:] |= codes[1:] != codes[:-1]
+        codes, new_customer = codes[keep], new_customer[keep]
+
+    offsets = np.append(np.flatnonzero(new_customer), len(codes)).astype(np.int64)
+    return codes.astype(np.int64), offsets, pd.Index(vocabulary)
+
+class PathTrie:
+    """Frequent paths with their customer support."""
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        offsets: np.ndarray,
+        vocabulary: pd.Index,
+        min_support: float = 0.01,
+        max_depth: int = 4,
+        anchored: bool = False
+    ):
+        """
+        Mine frequent paths from encoded sequences.
+
+        Support is the number of customers whose sequence contains the
+        path as consecutive steps (or starts with it when anchored), so a
+        customer repeating a path is counted once.
+
+        Args:
+            codes: Flat token codes from encode_sequences
+            offsets: Customer offsets from encode_sequences
+            vocabulary: Token values by code
+            min_support: Minimum share of customers supporting a path
+            max_depth: Longest path mined
+            anchored: Only count paths starting at a customer's first step
+
+        Raises:
+            ValueError: If max_depth is below 1 or min_support is not in [0, 1]
+        """
+        if max_depth < 1:
+            raise ValueError("max_depth must be at least 1")
+        if not 0 <= min_support <= 1:
+            raise ValueError("min_support must be between 0 and 1")
+
+        self.vocabulary = vocabulary
+        self.n_customers = len(offsets) - 1
+        self.min_count = max(1, int(np.ceil(min_support * self.n_customers)))
+        self.max_depth = max_depth
+        self.anchored = anchored
+
+        # Node arrays; node 0 is the root (empty path)
+        parents = [np.array([-1])]
+        tokens = [np.array([-1])]
+        supports = [np.array([self.n_customers])]
+        depths = [np.array([0])]
+
+        lengths = np.diff(offsets)
+        owner = np.repeat(np.arange(self.n_customers), lengths)
+        ends = np.repeat(offsets[1:], lengths)
+        starts = offsets[:-1][lengths > 0] if anchored else np.arange(len(codes))
+        window_owner = owner[starts]
+        window_end = ends[starts]
+        window_node = np.zeros(len(starts), dtype=np.int64)
+        n_nodes = 1
+        vocab_size = max(len(vocabulary), 1)
+
+        for depth in range(1, max_depth + 1):
+            position = starts + depth - 1
+            alive = position < window_end
+            starts, window_owner, window_end, window_node, position = (
+                starts[alive], window_owner[alive], window_end[alive], window_node[alive], position[alive]
+            )
+            if len(starts) == 0:
+                break
+
+            keys = window_node * vocab_size + codes[position]
+            # One vote per customer per path, then count customers per path
+            voted = pd.DataFrame({'key': keys, 'owner': window_owner}).drop_duplicates()['key']
+            unique_keys, counts = np.unique(voted.to_numpy(), return_counts=True)
+            frequent = counts >= self.min_count
+            unique_keys, counts = unique_keys[frequent], counts[frequent]
+            if len(unique_keys) == 0:
+                break
+
+            parents.append(unique_keys // vocab_size)
+            tokens.append(unique_keys % vocab_size)
+            supports.append(counts)
+            depths.append(np.full(len(unique_keys), depth))
+
+            # Windows on frequent paths move to their new node; others stop
+            slot = np.searchsorted(unique_keys, keys)
+            slot = np.minimum(slot, len(unique_keys) - 1)
+            extend = unique_keys[slot] == keys
+            starts, window_owner, window_end = starts[extend], window_owner[extend], window_end[extend]
+            window_node = n_nodes + slot[extend]
+            n_nodes += len(unique_keys)
+            logger.debug(f"Depth {depth}: {len(unique_keys)} frequent paths, {len(starts)} windows extend")
+
+        self.parent = np.concatenate(parents)
+        self.token = np.concatenate(tokens)
+        self.support = np.concatenate(supports)
+        self.depth = np.concatenate(depths)
+        self._paths = self._materialize_paths()
+        self._ranking = np.lexsort((self.depth, -self.support))
+
+    def _materialize_paths(self) -> np.ndarray:
+        """Token codes of every node's path, padded with -1."""
+        paths = np.full((len(self.parent), self.max_depth), -1, dtype=np.int64)
+        for depth in range(1, self.depth.max() + 1):
+            nodes = np.flatnonzero(self.depth == depth)
+            paths[nodes] = paths[self.parent[nodes]]
+            paths[nodes, depth - 1] = self.token[nodes]
+        return paths
+
+    def __len__(self) -> int:
+        """Number of frequent paths."""
+        return len(self.parent) - 1
+
+    def _encode_prefix(self, prefix: Sequence[Hashable]) -> Optional[np.ndarray]:
+        """Codes of a prefix, or None if a step is unknown."""
+        codes = self.vocabulary.get_indexer(list(prefix))
+        return None if (codes < 0).any() else codes
+
+    def support_of(self, path: Sequence[Hashable]) -> int:
+        """
+        Number of customers supporting a path (0 if not frequent).
+
+        Args:
+            path: Sequence of steps
+        """
+        codes = self._encode_prefix(path)
+        if codes is None or not 0 < len(codes) <= self.max_depth:
+            return 0 if len(path) else self.n_customers
+        match = (self.depth == len(codes)) & (self._paths[:, :len(codes)] == codes).all(axis=1)
+        nodes = np.flatnonzero(match)
+        return int(self.support[nodes[0]]) if len(nodes) else 0
+
+    def top_paths(
+        self,
+        k: int = 10,
+        min_length: int = 2,
+        max_length: Optional[int] = None,
+        prefix: Sequence[Hashable] = ()
+    ) -> pd.DataFrame:
+        """
+        Most supported paths.
+
+        Args:
+            k: Number of paths returned
+            min_length: Shortest path length reported
+            max_length: Longest path length reported
+            prefix: Only paths starting with these steps
+
+        Returns:
+            DataFrame with path (tuple of steps), length, support (customers)
+            and share (of all customers), by descending support
+        """
+        max_length = max_length or self.max_depth
+        order = self._ranking
+        mask = (self.depth[order] >= max(min_length, 1)) & (self.depth[order] <= max_length)
+        if len(prefix):
+            codes = self._encode_prefix(prefix)
+            if codes is None or len(codes) > self.max_depth:
+                mask[:] = False
+            else:
+                mask &= (self._paths[order, :len(codes)] == codes).all(axis=1)
+        nodes = order[mask][:k]
+
+        return pd.DataFrame({
+            'path': [tuple(self.vocabulary[self._paths[n, :self.depth[n]]]) for n in nodes],
+            'length': self.depth[nodes],
+            'support': self.support[nodes],
+            'share': self.support[nodes] / max(self.n_customers, 1),
+        })
+
+    def next_steps(self, prefix: Sequence[Hashable]) -> Dict[Hashable, float]:
+        """
+        Probability of each frequent next step after a path.
+
+        Args:
+            prefix: Path already taken
+
+        Returns:
+            Dict[next step, share of the prefix's customers continuing with it]
+        """
+        parent_support = self.support_of(prefix)
+        if parent_support == 0 or len(prefix) >= self.max_depth:
+            return {}
+        children = self.top_paths(
+            k=len(self), min_length=len(prefix) + 1, max_length=len(prefix) + 1, prefix=prefix
+        )
+        return {path[-1]: support / parent_support for path, support in zip(children['path'], children['support'])}
+
+def stage_sequences(mapper, max_steps: Optional[int] = None) -> pd.DataFrame:
+    """
+    Journey stage after each order, per customer.
+
+    Uses a precomputed journey_stage column when the orders carry one;
+    otherwise applies the mapper's stage rules to cumulative per-customer
+    counts (completed and returned orders, distinct completed styles)
+    and running_confidence, instead of re-evaluating every order prefix.
+
+    Args:
+        mapper: Prepared JourneyMapper
+        max_steps: Only evaluate each customer's first orders
+
+    Returns:
+        DataFrame with customer_id and stage, grouped by customer in
+        chronological order
+    """
+    from .journey_mapping import JourneyStage
+
+    orders = mapper.orders.sort_values(['customer_id', 'created_at'], kind='stable')
+    if 'journey_stage' in orders.columns:
+        return orders[['customer_id', 'journey_stage']].rename(columns={'journey_stage': 'stage'})
+
+    customers = orders['customer_id']
+    returned = orders['returned'].fillna(False).astype(bool)
+    by_customer = returned.groupby(customers, sort=False)
+    order_index = (by_customer.cumcount() + 1).to_numpy()
+    returns = by_customer.cumsum().to_numpy()
+    completed = order_index - returns
+    counted = ~returned & orders['style'].notna()
+    first_style = counted & ~orders[['customer_id', 'style']].where(counted).duplicated()
+    styles = first_style.groupby(customers, sort=False).cumsum().to_numpy()
+    confidence = running_confidence(orders)['confidence'].to_numpy()
+
+    # Same precedence as JourneyMapper._stage_for_orders
+    confident = confidence > mapper.CONFIDENCE_THRESHOLD
+    stages = np.select(
+        [
+            completed == 0,
+            (completed == 1) & (returns == 0),
+            (completed >= 2) & (styles >= mapper.STYLE_THRESHOLD),
+            returns > 0,
+            (completed >= mapper.LOYALTY_THRESHOLD) & confident,
+            confident,
+        ],
+        [
+            JourneyStage.SIZE_EXPLORATION.value,
+            JourneyStage.FIRST_PURCHASE.value,
+            JourneyStage.STYLE_EXPLORATION.value,
+            JourneyStage.SIZE_EXPLORATION.value,
+            JourneyStage.BRAND_LOYAL.value,
+            JourneyStage.CONFIDENCE_BUILDING.value,
+        ],
+        default=JourneyStage.SIZE_EXPLORATION.value
+    )
+
+    sequences = pd.DataFrame({'customer_id': customers.to_numpy(), 'stage': stages})
+    if max_steps is not None:
+        sequences = sequences[order_index <= max_steps].reset_index(drop=True)
+    return sequences
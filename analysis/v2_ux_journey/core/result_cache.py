@@ -0,0 +1,234 @@
+"""
+Result Cache Module
+
+This module memoizes analysis results keyed by a content fingerprint of
+the input frames plus the method parameters, with an in-memory LRU tier
+and an optional size-bounded on-disk tier. Keys also cover CACHE_VERSION, so
+bumping it retires every entry written by older analysis logic.
+"""
+
+import copy
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Bump whenever cached analysis logic changes, so stale disk entries miss
+CACHE_VERSION = 1
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Compute a content fingerprint of a DataFrame.
+
+    Values are hashed column by column with pandas' vectorized row
+    hashing; columns holding unhashable objects fall back to their
+    string form. Column names, dtypes and the index are included.
+
+    Args:
+        df: DataFrame to fingerprint
+
+    Returns:
+        Hex digest that changes whenever the frame's content changes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(df.columns), [str(t) for t in df.dtypes], df.shape)).encode())
+    digest.update(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+    for col in df.columns:
+        series = df[col]
+        try:
+            hashed = pd.util.hash_pandas_object(series, index=False)
+        except TypeError:
+            hashed = pd.util.hash_pandas_object(series.astype(str), index=False)
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()
+
+def make_key(name: str, fingerprints: Iterable[str], params: Any, version: Any = CACHE_VERSION) -> str:
+    """
+    Build a cache key from a method name, input fingerprints and parameters.
+
+    Args:
+        name: Method or analysis name
+        fingerprints: Fingerprints of the input frames
+        params: Any repr-stable parameters (thresholds, arguments)
+        version: Logic version or salt; a different value gives a
+            different key for the same inputs
+
+    Returns:
+        Hex digest key
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{version}:".encode())
+    digest.update(name.encode())
+    for fingerprint in fingerprints:
+        digest.update(fingerprint.encode())
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+class ResultCache:
+    """Two-tier (memory LRU + disk) cache for analysis results, safe to share across threads."""
+
+    def __init__(
+        self,
+        max_items: int = 128,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_items: Entries kept in the in-memory LRU tier
+            cache_dir: Directory for the on-disk tier; None disables it
+            max_disk_bytes: Size budget of the on-disk tier; least recently
+                used files are evicted beyond it
+        """
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        """Path of the on-disk entry for a key."""
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a key in memory, then on disk.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            A copy of the cached value, or default
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                value = self._memory[key]
+            elif self.cache_dir is not None:
+                value = self._read(key)
+            else:
+                value = _MISSING
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def _read(self, key: str) -> Any:
+        """Load an on-disk entry into the memory tier; _MISSING if absent."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return _MISSING
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers.
+
+        Args:
+            key: Cache key
+            value: Picklable result
+        """
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, value)
+            if self.cache_dir is not None:
+                path = self._path(key)
+                tmp = path.with_suffix('.tmp')
+                with open(tmp, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+                self._evict_disk()
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Insert into the memory tier, evicting the least recently used."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until under the size budget."""
+        entries = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.cache_dir.glob('*.pkl')]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted cache entry {path.name}")
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Drop one entry, or every entry when key is None.
+
+        Args:
+            key: Cache key to drop; None clears both tiers
+        """
+        with self._lock:
+            if key is None:
+                self._memory.clear()
+                if self.cache_dir is not None:
+                    for path in self.cache_dir.glob('*.pkl'):
+                        path.unlink(missing_ok=True)
+                return
+
+            self._memory.pop(key, None)
+            if self.cache_dir is not None:
+                self._path(key).unlink(missing_ok=True)
+
+def cached_analysis(method: Callable) -> Callable:
+    """
+    Memoize a JourneyMapper analysis method through its ``cache``.
+
+    The key covers CACHE_VERSION, the method name, fingerprints of
+    ``orders`` and ``products``, the stage thresholds and the call
+    arguments, so any change to the data, thresholds or logic version
+    misses. Without a cache the method
+    runs unchanged.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, 'cache', None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+
+        params = (
+            self.STYLE_THRESHOLD, self.CONFIDENCE_THRESHOLD, self.LOYALTY_THRESHOLD,
+            args, sorted(kwargs.items())
+        )
+        key = make_key(
+            method.__qualname__,
+            [frame_fingerprint(self.orders), frame_fingerprint(self.products)],
+            params
+        )
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = method(self, *args, **kwargs)
+            cache.put(key, result)
+        return result
+
+    return wrapper
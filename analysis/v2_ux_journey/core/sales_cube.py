@@ -0,0 +1,276 @@
+"""
+Sales Cube Module
+
+This module pre-aggregates order items into an OLAP-style cube of order
+counts, item counts, revenue and returns by day, category, style, band
+and cup. Every combination of the non-time dimensions is stored as its
+own daily rollup with distinct orders counted per cell, so a query is
+answered by filtering and re-grouping the rollup with exactly its
+dimensions instead of scanning orders. The cube is persisted as Parquet
+files and new days of orders can be appended incrementally.
+"""
+
+import json
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ['category', 'style', 'band_size', 'cup_size']
+MEASURES = ['orders', 'items', 'revenue', 'returns']
+# Order identifier columns, in order of preference; item rows of one order share it
+ORDER_KEYS = ['id', 'order_id']
+GRAINS = {'day': None, 'week': 'W', 'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+MANIFEST_FILE = 'cube.json'
+
+def _level_name(dims: Tuple[str, ...]) -> str:
+    """File stem of a rollup level."""
+    return '__'.join(dims) if dims else 'total'
+
+class SalesCube:
+    """Daily sales rollups over every combination of dimensions."""
+
+    def __init__(self, levels: Dict[Tuple[str, ...], pd.DataFrame]):
+        """
+        Initialize from precomputed levels.
+
+        Args:
+            levels: Rollup frames keyed by their dimension tuple; each has
+                a day column, its dimensions and the MEASURES columns
+        """
+        self.levels = levels
+
+    @staticmethod
+    def _facts(orders: pd.DataFrame) -> pd.DataFrame:
+        """
+        One fact row per order item.
+
+        Revenue is the item's sale_price. Without it, the order-level
+        total_amount is split evenly over the order's item rows so it is
+        not counted once per item. Rows without an order key count as
+        orders of their own.
+        """
+        missing = {'created_at', *DIMENSIONS} - set(orders.columns)
+        if missing:
+            raise ValueError(f"Missing required columns in orders data: {missing}")
+
+        key = next((col for col in ORDER_KEYS if col in orders.columns), None)
+        if key is None:
+            order = np.arange(len(orders))
+        else:
+            codes, uniques = pd.factorize(orders[key])
+            order = np.where(codes >= 0, codes, len(uniques) + np.arange(len(orders)))
+
+        returned = 'returned' if 'returned' in orders.columns else 'is_return'
+        if 'sale_price' in orders.columns:
+            revenue = pd.to_numeric(orders['sale_price'], errors='coerce')
+        elif 'total_amount' in orders.columns:
+            items_per_order = np.bincount(order)[order]
+            revenue = pd.to_numeric(orders['total_amount'], errors='coerce') / items_per_order
+        else:
+            revenue = pd.Series(0.0, index=orders.index)
+
+        return pd.DataFrame({
+            'day': pd.to_datetime(orders['created_at']).dt.floor('D'),
+            **{dim: orders[dim] for dim in DIMENSIONS},
+            'order': order,
+            'items': 1,
+            'revenue': revenue.fillna(0.0),
+            'returns': orders[returned].fillna(False).astype(bool).astype(int)
+            if returned in orders.columns else 0,
+        })
+
+    @staticmethod
+    def _rollup(frame: pd.DataFrame, dims: Tuple[str, ...]) -> pd.DataFrame:
+        """
+        Aggregate by day and the given dimensions.
+
+        Fact frames (with an order column) count distinct orders per cell;
+        already rolled-up frames of the same level are summed.
+        """
+        keys = ['day', *dims]
+        grouped = frame.groupby(keys, dropna=False, observed=True, sort=True)
+        if 'order' in frame.columns:
+            rolled = grouped[['items', 'revenue', 'returns']].sum()
+            rolled.insert(0, 'orders', grouped['order'].nunique())
+            rolled = rolled.reset_index()
+        else:
+            rolled = grouped[MEASURES].sum().reset_index()
+        for dim in dims:
+            rolled[dim] = rolled[dim].astype('category')
+        return rolled
+
+    @classmethod
+    def from_orders(cls, orders: pd.DataFrame) -> 'SalesCube':
+        """
+        Build the cube from prepared orders.
+
+        Args:
+            orders: Order items with created_at, category, style,
+                band_size, cup_size, returned (or is_return), sale_price or
+                total_amount, and an order key (id or order_id) shared by
+                the items of one order, e.g. JourneyMapper.orders
+
+        Returns:
+            SalesCube with every rollup level
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        facts = cls._facts(orders)
+        levels = {
+            dims: cls._rollup(facts, dims)
+            for size in range(len(DIMENSIONS) + 1)
+            for dims in combinations(DIMENSIONS, size)
+        }
+        logger.debug(f"Built sales cube with {len(levels)} levels from {len(facts)} order items")
+        return cls(levels)
+
+    def append(self, orders: pd.DataFrame) -> None:
+        """
+        Add newly landed orders.
+
+        Only rows of the days present in the new orders are re-aggregated;
+        all other rows of every level are kept as they are. All items of
+        an order must arrive in the same call, or the order is counted
+        once per call.
+
+        Args:
+            orders: New prepared orders (may overlap already loaded days)
+        """
+        delta_facts = self._facts(orders)
+        days = delta_facts['day'].unique()
+        for dims, level in self.levels.items():
+            delta = self._rollup(delta_facts, dims)
+            touched = level['day'].isin(days)
+            merged = self._rollup(pd.concat([level[touched], delta], ignore_index=True), dims)
+            combined = pd.concat([level[~touched], merged], ignore_index=True)
+            self.levels[dims] = combined.sort_values('day', kind='stable').reset_index(drop=True)
+            for dim in dims:
+                self.levels[dims][dim] = self.levels[dims][dim].astype('category')
+        logger.debug(f"Appended {len(orders)} orders over {len(days)} days")
+
+    def _covering_level(self, dims: Iterable[str]) -> Tuple[str, ...]:
+        """
+        Level with exactly the requested dimensions.
+
+        Distinct order counts only add up across days, not across other
+        dimensions, so the exact level is used; the smallest level
+        containing the dimensions is a fallback for partial cubes.
+        """
+        needed = set(dims)
+        unknown = needed - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions: {unknown}")
+        exact = tuple(dim for dim in DIMENSIONS if dim in needed)
+        if exact in self.levels:
+            return exact
+        candidates = [level for level in self.levels if needed <= set(level)]
+        return min(candidates, key=lambda level: len(self.levels[level]))
+
+    def query(
+        self,
+        by: Sequence[str] = (),
+        grain: Optional[str] = 'day',
+        filters: Optional[Dict[str, object]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Slice and dice the cube.
+
+        Args:
+            by: Dimensions to group by
+            grain: Time grain (day, week, month, quarter, year), or None to
+                aggregate over time
+            filters: Dimension -> value or list of values to keep
+            start: First day included
+            end: Last day included
+
+        Orders are distinct within each result row, except that an order
+        matching several values of a list filter is counted once per
+        value.
+
+        Returns:
+            DataFrame with the period (unless grain is None), the group-by
+            dimensions, orders (distinct), items, revenue, returns
+            (returned items) and return_rate (returned share of items)
+
+        Raises:
+            ValueError: If a dimension or grain is unknown
+        """
+        if grain is not None and grain not in GRAINS:
+            raise ValueError(f"Unknown grain: {grain}")
+        filters = filters or {}
+        level = self._covering_level([*by, *filters])
+        data = self.levels[level]
+
+        mask = pd.Series(True, index=data.index)
+        for dim, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= data[dim].isin(values)
+        if start is not None:
+            mask &= data['day'] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= data['day'] <= pd.Timestamp(end)
+        data = data[mask]
+
+        keys: List = list(by)
+        if grain is not None:
+            period = data['day'] if GRAINS[grain] is None else data['day'].dt.to_period(GRAINS[grain]).dt.start_time
+            data = data.assign(period=period)
+            keys = ['period', *keys]
+
+        if keys:
+            result = data.groupby(keys, dropna=False, observed=True, sort=True)[MEASURES].sum().reset_index()
+        else:
+            result = data[MEASURES].sum().to_frame().T
+        result['return_rate'] = result['returns'] / result['items'].where(result['items'] > 0)
+        return result
+
+    def save(self, path: str) -> None:
+        """
+        Write every level as a Parquet file plus a manifest.
+
+        Args:
+            path: Cube directory (created if missing)
+        """
+        root = Path(path)
+        root.mkdir(parents=True, exist_ok=True)
+        manifest = {'dimensions': DIMENSIONS, 'measures': MEASURES, 'levels': []}
+        for dims, level in self.levels.items():
+            file_name = f"{_level_name(dims)}.parquet"
+            tmp = root / f"{file_name}.tmp"
+            level.to_parquet(tmp, index=False)
+            tmp.replace(root / file_name)
+            manifest['levels'].append({'dims': list(dims), 'file': file_name, 'rows': len(level)})
+        with open(root / MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'SalesCube':
+        """
+        Read a cube written by save.
+
+        Args:
+            path: Cube directory
+
+        Returns:
+            SalesCube
+
+        Raises:
+            FileNotFoundError: If the manifest is missing
+        """
+        root = Path(path)
+        with open(root / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        levels = {
+            tuple(spec['dims']): pd.read_parquet(root / spec['file'])
+            for spec in manifest['levels']
+        }
+        return cls(levels)
@@ -0,0 +1,284 @@
+"""
+Similarity Module
+
+This module finds lookalike customers from their size and style
+profiles. Each customer becomes a sparse TF-IDF weighted vector over
+band, cup, style and category tokens plus kept/returned counts, with
+rows L2-normalized so dot products are cosine similarities. Customers
+are blocked by their usual band size and stored contiguously per block,
+so a search only multiplies against the rows of one block.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Hashable, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .snapshot import _label_array
+
+logger = logging.getLogger(__name__)
+
+PROFILE_COLUMNS = ['band_size', 'cup_size', 'style', 'category']
+MATRIX_FILE = 'similarity.npz'
+MANIFEST_FILE = 'similarity.json'
+CUSTOMERS_FILE = 'similarity.customers.npy'
+UNKNOWN_BLOCK = '<unknown>'
+
+def _profile_tokens(orders: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Customer ids and feature tokens, one pair per order attribute."""
+    customers, tokens = [], []
+    for col in PROFILE_COLUMNS:
+        if col not in orders.columns:
+            continue
+        values = orders[['customer_id', col]].dropna()
+        customers.append(values['customer_id'].to_numpy())
+        tokens.append((col + '=' + values[col].astype(str)).to_numpy())
+    if 'returned' in orders.columns:
+        returned = orders['returned'].fillna(False).astype(bool).to_numpy()
+        customers.append(orders['customer_id'].to_numpy())
+        tokens.append(np.where(returned, 'order=returned', 'order=kept'))
+    if not customers:
+        raise ValueError(f"Orders have none of the profile columns: {PROFILE_COLUMNS}")
+    return np.concatenate(customers), np.concatenate(tokens)
+
+def _usual_value(customer_ids: pd.Series, values: pd.Series) -> pd.Series:
+    """Each customer's most frequent value (ties go to the smallest)."""
+    counts = pd.DataFrame({'customer_id': customer_ids, 'value': values}).dropna()
+    counts = counts.value_counts().reset_index(name='count')
+    counts = counts.sort_values(['count', 'value'], ascending=[False, True], kind='stable')
+    return counts.drop_duplicates('customer_id').set_index('customer_id')['value']
+
+class SimilarityIndex:
+    """Exact top-k cosine search over blocked customer profile vectors."""
+
+    def __init__(
+        self,
+        matrix: sparse.csr_matrix,
+        customers: pd.Index,
+        features: pd.Index,
+        blocks: pd.Index,
+        block_offsets: np.ndarray
+    ):
+        """
+        Initialize from precomputed vectors.
+
+        Args:
+            matrix: L2-normalized customer x feature CSR matrix, rows
+                grouped by block
+            customers: Customer id of each row
+            features: Token of each column
+            blocks: Block label of each block
+            block_offsets: Block b occupies rows
+                block_offsets[b]:block_offsets[b + 1]
+        """
+        self.matrix = matrix
+        self.customers = customers
+        self.features = features
+        self.blocks = blocks
+        self.block_offsets = block_offsets
+        self._row_block = np.repeat(np.arange(len(blocks)), np.diff(block_offsets))
+        self._block_matrices = [
+            self._rows_view(start, end) for start, end in zip(block_offsets[:-1], block_offsets[1:])
+        ]
+
+    def _rows_view(self, start: int, end: int) -> sparse.csr_matrix:
+        """Rows start:end of the matrix sharing its buffers (no copy)."""
+        indptr = self.matrix.indptr
+        first, last = indptr[start], indptr[end]
+        return sparse.csr_matrix(
+            (self.matrix.data[first:last], self.matrix.indices[first:last], indptr[start:end + 1] - first),
+            shape=(end - start, self.matrix.shape[1]), copy=False
+        )
+
+    @classmethod
+    def from_orders(cls, orders: pd.DataFrame, block_by: Optional[str] = 'band_size') -> 'SimilarityIndex':
+        """
+        Build the index from prepared orders.
+
+        Args:
+            orders: Orders with customer_id and any of band_size, cup_size,
+                style, category and returned
+            block_by: Order attribute whose most frequent value per
+                customer defines the block; None compares all customers
+
+        Returns:
+            SimilarityIndex
+
+        Raises:
+            ValueError: If no profile column is available
+        """
+        token_customers, tokens = _profile_tokens(orders)
+        customer_codes, customers = pd.factorize(token_customers)
+        feature_codes, features = pd.factorize(tokens, sort=True)
+
+        counts = sparse.csr_matrix(
+            (np.ones(len(tokens)), (customer_codes, feature_codes)),
+            shape=(len(customers), len(features))
+        )
+        counts.sum_duplicates()
+
+        # Smoothed inverse document frequency, as in scikit-learn's TfidfTransformer
+        document_frequency = np.bincount(counts.indices, minlength=len(features))
+        idf = np.log((1 + len(customers)) / (1 + document_frequency)) + 1
+        weighted = counts @ sparse.diags(idf)
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        weighted = (sparse.diags(1 / np.maximum(norms, 1e-12)) @ weighted).astype(np.float32)
+
+        if block_by is None:
+            block = pd.Series('all', index=customers)
+        else:
+            usual = _usual_value(orders['customer_id'], orders[block_by])
+            block = usual.reindex(customers).astype(object).fillna(UNKNOWN_BLOCK).astype(str)
+        block_codes, blocks = pd.factorize(block, sort=True)
+        order = np.argsort(block_codes, kind='stable')
+        offsets = np.r_[0, np.cumsum(np.bincount(block_codes, minlength=len(blocks)))]
+
+        index = cls(
+            weighted.tocsr()[order], pd.Index(customers[order], name='customer_id'),
+            pd.Index(features), pd.Index(blocks), offsets
+        )
+        logger.debug(
+            f"Similarity index: {len(customers)} customers, {len(features)} features, "
+            f"{len(blocks)} blocks"
+        )
+        return index
+
+    def _top_k(self, rows: slice, block: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k neighbour rows and similarities for a contiguous row range."""
+        start, end = self.block_offsets[block], self.block_offsets[block + 1]
+        query = self._rows_view(rows.start, rows.stop).toarray()
+        similarities = np.asarray(self._block_matrices[block] @ query.T).T  # rows x block size
+        own = np.arange(rows.start, rows.stop) - start
+        similarities[np.arange(len(own)), own] = -np.inf
+
+        k = min(k, end - start - 1)
+        if k <= 0:
+            empty = np.empty((len(own), 0))
+            return empty.astype(np.int64), empty
+        top = np.argpartition(similarities, -k, axis=1)[:, -k:]
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        ranking = np.argsort(-top_similarities, axis=1, kind='stable')
+        top = np.take_along_axis(top, ranking, axis=1)
+        return top + start, np.take_along_axis(top_similarities, ranking, axis=1)
+
+    def similar(self, customer_id: Hashable, k: int = 10) -> pd.DataFrame:
+        """
+        Most similar customers within the customer's block.
+
+        Args:
+            customer_id: Customer to find lookalikes for
+            k: Number of neighbours
+
+        Returns:
+            DataFrame with customer_id and similarity, most similar first
+
+        Raises:
+            ValueError: If the customer is not in the index
+        """
+        row = self.customers.get_indexer([customer_id])[0]
+        if row < 0:
+            raise ValueError(f"Unknown customer: {customer_id}")
+        neighbours, similarities = self._top_k(slice(row, row + 1), self._row_block[row], k)
+        return pd.DataFrame({
+            'customer_id': self.customers[neighbours[0]],
+            'similarity': similarities[0],
+        })
+
+    def top_k_all(self, k: int = 10, max_cells: int = 2**24, workers: Optional[int] = None) -> pd.DataFrame:
+        """
+        Top-k lookalikes of every customer.
+
+        Each block is split into row chunks whose dense similarity slab
+        has at most max_cells entries; chunks run on a thread pool.
+
+        Args:
+            k: Neighbours per customer
+            max_cells: Largest chunk x block similarity slab computed at once
+            workers: Thread pool size (None lets the executor choose)
+
+        Returns:
+            DataFrame with customer_id, neighbor_id, rank (1 = most
+            similar) and similarity
+        """
+        chunks = []
+        for block in range(len(self.blocks)):
+            start, end = self.block_offsets[block], self.block_offsets[block + 1]
+            step = max(1, max_cells // max(end - start, 1))
+            chunks += [(slice(row, min(row + step, end)), block) for row in range(start, end, step)]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='similarity') as executor:
+            results = list(executor.map(lambda chunk: (chunk[0], self._top_k(*chunk, k)), chunks))
+
+        frames = []
+        for rows, (neighbours, similarities) in results:
+            width = neighbours.shape[1]
+            frames.append(pd.DataFrame({
+                'customer_id': np.repeat(self.customers[rows], width),
+                'neighbor_id': self.customers[neighbours.ravel()],
+                'rank': np.tile(np.arange(1, width + 1), rows.stop - rows.start),
+                'similarity': similarities.ravel(),
+            }))
+        if not frames:
+            return pd.DataFrame(columns=['customer_id', 'neighbor_id', 'rank', 'similarity'])
+        return pd.concat(frames, ignore_index=True)
+
+    def save(self, path: str) -> None:
+        """
+        Write the vectors, customer ids and a manifest to a directory.
+
+        Customer ids go in a typed .npy array rather than the JSON
+        manifest, so integer and datetime ids load back with their type.
+
+        Args:
+            path: Index directory (created if missing)
+
+        Raises:
+            ValueError: If the customer ids are mixed Python objects
+                rather than numbers, booleans, dates or strings
+        """
+        root = Path(path)
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = root / f"{MATRIX_FILE}.tmp.npz"
+        sparse.save_npz(tmp, self.matrix)
+        tmp.replace(root / MATRIX_FILE)
+        tmp = root / f"{CUSTOMERS_FILE}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, _label_array(self.customers), allow_pickle=False)
+        tmp.replace(root / CUSTOMERS_FILE)
+        manifest = {
+            'features': self.features.tolist(),
+            'blocks': self.blocks.tolist(),
+            'block_offsets': self.block_offsets.tolist(),
+        }
+        with open(root / MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f, default=str)
+
+    @classmethod
+    def load(cls, path: str) -> 'SimilarityIndex':
+        """
+        Read an index written by save.
+
+        Args:
+            path: Index directory
+
+        Returns:
+            SimilarityIndex
+
+        Raises:
+            FileNotFoundError: If the index files are missing
+        """
+        root = Path(path)
+        with open(root / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        return cls(
+            sparse.load_npz(root / MATRIX_FILE).tocsr(),
+            pd.Index(np.load(root / CUSTOMERS_FILE, allow_pickle=False), name='customer_id'),
+            pd.Index(manifest['features']),
+            pd.Index(manifest['blocks']),
+            np.asarray(manifest['block_offsets'], dtype=np.int64),
+        )
@@ -0,0 +1,215 @@
+"""
+Size Fit Module
+
+This module turns SKU band and cup sizes into size-fit tables: a dense
+band x cup x style tensor of purchases, returns and keeps, sparse
+(style, from size, to size) counts of size changes after a return, and
+per-customer size history. All tables are built once over encoded
+sizes, so size recommendations are array and index lookups. Orders
+without a complete size and style are skipped.
+"""
+
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class SizeRecommendation:
+    """Recommended size with the evidence behind it."""
+    band_size: Optional[str]
+    cup_size: Optional[str]
+    probability: float
+    reason: str
+
+class SizeFitMatrix:
+    """Precomputed size-fit tables and size recommendations."""
+
+    def __init__(self, orders: pd.DataFrame):
+        """
+        Build every table in one pass over prepared orders.
+
+        Args:
+            orders: Orders with customer_id, created_at, returned,
+                band_size, cup_size and style
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        required = {'customer_id', 'created_at', 'returned', 'band_size', 'cup_size', 'style'}
+        missing = required - set(orders.columns)
+        if missing:
+            raise ValueError(f"Missing required columns in orders data: {missing}")
+
+        data = orders[sorted(required)].dropna(subset=['band_size', 'cup_size', 'style'])
+        if len(data) < len(orders):
+            level = logging.WARNING if data.empty else logging.DEBUG
+            logger.log(
+                level,
+                f"Skipped {len(orders) - len(data)} of {len(orders)} orders without a complete size and style"
+            )
+        data = data.sort_values(['customer_id', 'created_at'], kind='stable')
+        returned = data['returned'].fillna(False).astype(bool).to_numpy()
+
+        band, self.bands = pd.factorize(data['band_size'], sort=True)
+        cup, self.cups = pd.factorize(data['cup_size'], sort=True)
+        style, self.styles = pd.factorize(data['style'], sort=True)
+        n_band, n_cup, n_style = len(self.bands), len(self.cups), len(self.styles)
+        self.n_sizes = n_band * n_cup
+        size = band * n_cup + cup
+
+        # band x cup x style counts
+        cell = size * n_style + style
+        shape = (n_band, n_cup, n_style)
+        self.purchases = np.bincount(cell, minlength=self.n_sizes * n_style).reshape(shape)
+        self.returns = np.bincount(cell, weights=returned, minlength=self.n_sizes * n_style).astype(np.int64).reshape(shape)
+        self.keeps = self.purchases - self.returns
+
+        # Size shifts: a returned order followed by the customer's next
+        # kept order in the same style
+        customers = pd.factorize(data['customer_id'])[0]
+        nxt = np.arange(1, len(data))
+        prev = nxt - 1
+        shift = (
+            (customers[nxt] == customers[prev]) & (style[nxt] == style[prev]) &
+            returned[prev] & ~returned[nxt]
+        )
+        # Sparse (COO) counts: only observed (style, from, to) triples are stored
+        self.shifts = pd.DataFrame({
+            'style': style[prev][shift], 'from_size': size[prev][shift], 'to_size': size[nxt][shift],
+        }).value_counts().rename('count').reset_index().sort_values(
+            ['style', 'from_size', 'to_size'], ignore_index=True
+        )
+        overall = self.shifts.groupby(['from_size', 'to_size'], as_index=False)['count'].sum()
+
+        # Lookup tables for recommendations
+        self._best_shift = _best_shifts(self.shifts, ['style', 'from_size'])
+        self._best_overall_shift = _best_shifts(overall, ['from_size'])
+        style_keeps = self.keeps.reshape(self.n_sizes, n_style)
+        if self.n_sizes:
+            self._style_top_size = style_keeps.argmax(axis=0)
+            self._style_top_share = style_keeps.max(axis=0) / np.maximum(style_keeps.sum(axis=0), 1)
+        else:
+            self._style_top_size = np.zeros(n_style, dtype=np.int64)
+            self._style_top_share = np.zeros(n_style)
+        self._keep_rate = self.keeps.reshape(self.n_sizes, n_style) / np.maximum(
+            self.purchases.reshape(self.n_sizes, n_style), 1
+        )
+
+        # Per-customer size history: last kept size and last order
+        self.customer_index = pd.Index(pd.unique(data['customer_id']))
+        n_customers = len(self.customer_index)
+        last_row = np.full(n_customers, -1)
+        last_row[customers] = np.arange(len(data))  # later rows overwrite earlier
+        kept_rows = np.flatnonzero(~returned)
+        last_kept_row = np.full(n_customers, -1)
+        last_kept_row[customers[kept_rows]] = kept_rows
+        self._last_size = size[last_row]
+        self._last_returned = returned[last_row]
+        self._last_kept_size = np.where(last_kept_row >= 0, size[last_kept_row], -1)
+
+        logger.debug(
+            f"Size fit tables: {n_band} bands x {n_cup} cups x {n_style} styles, "
+            f"{int(shift.sum())} size shifts"
+        )
+
+    def _size(self, code: int) -> Tuple[str, str]:
+        """Band and cup of a size code."""
+        band, cup = divmod(int(code), len(self.cups))
+        return self.bands[band], self.cups[cup]
+
+    def _size_code(self, band_size: str, cup_size: str) -> int:
+        """Size code of a band and cup, or -1 if unseen."""
+        band = self.bands.get_indexer([band_size])[0]
+        cup = self.cups.get_indexer([cup_size])[0]
+        return -1 if band < 0 or cup < 0 else band * len(self.cups) + cup
+
+    def keep_rate(self, band_size: str, cup_size: str, style: str) -> float:
+        """
+        Share of purchases of a size in a style that were kept.
+
+        Returns:
+            Keep rate, or NaN if the size or style was never bought
+        """
+        size = self._size_code(band_size, cup_size)
+        style_code = self.styles.get_indexer([style])[0]
+        if size < 0 or style_code < 0 or self.purchases.reshape(self.n_sizes, -1)[size, style_code] == 0:
+            return float('nan')
+        return float(self._keep_rate[size, style_code])
+
+    def shift_table(self, style: Optional[str] = None) -> pd.DataFrame:
+        """
+        Size-shift probabilities after a return.
+
+        Args:
+            style: Style to report; all styles combined when None
+
+        Returns:
+            DataFrame of P(kept size | returned size), returned sizes as
+            rows and kept sizes as columns, labelled like '34B'
+
+        Raises:
+            ValueError: If the style is unknown
+        """
+        shifts = self.shifts
+        if style is not None:
+            style_code = self.styles.get_indexer([style])[0]
+            if style_code < 0:
+                raise ValueError(f"Unknown style: {style}")
+            shifts = shifts[shifts['style'] == style_code]
+        counts = np.zeros((self.n_sizes, self.n_sizes))
+        np.add.at(counts, (shifts['from_size'].to_numpy(), shifts['to_size'].to_numpy()), shifts['count'].to_numpy())
+        probabilities = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)
+        labels = [''.join(self._size(code)) for code in range(self.n_sizes)]
+        return pd.DataFrame(probabilities, index=labels, columns=labels)
+
+    def recommend_size(self, customer_id: Hashable, style: str) -> SizeRecommendation:
+        """
+        Recommend a size for a customer buying a style.
+
+        1. If the customer's last order was returned, the most likely
+           kept size after returning that size in this style (or across
+           styles when the style has no shifts from it)
+        2. Otherwise the customer's last kept size
+        3. For new customers, the style's most kept size
+
+        Args:
+            customer_id: Customer identifier
+            style: Style about to be bought
+
+        Returns:
+            SizeRecommendation; sizes are None when nothing is known
+        """
+        style_code = self.styles.get_indexer([style])[0]
+        position = self.customer_index.get_indexer([customer_id])[0]
+
+        if position >= 0:
+            if self._last_returned[position]:
+                returned_size = int(self._last_size[position])
+                if (style_code, returned_size) in self._best_shift.index:
+                    code, probability = self._best_shift.loc[(style_code, returned_size)]
+                    return SizeRecommendation(*self._size(code), float(probability), 'style_shift')
+                if returned_size in self._best_overall_shift.index:
+                    code, probability = self._best_overall_shift.loc[returned_size]
+                    return SizeRecommendation(*self._size(code), float(probability), 'shift')
+            kept = self._last_kept_size[position]
+            if kept >= 0:
+                rate = self._keep_rate[kept, style_code] if style_code >= 0 else float('nan')
+                return SizeRecommendation(*self._size(kept), float(rate), 'last_kept')
+
+        if style_code >= 0 and self._style_top_share[style_code] > 0:
+            code = self._style_top_size[style_code]
+            return SizeRecommendation(*self._size(code), float(self._style_top_share[style_code]), 'style_top')
+        return SizeRecommendation(None, None, 0.0, 'unknown')
+
+def _best_shifts(counts: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Most likely to_size and its probability per key; ties go to the smallest size."""
+    probability = counts['count'] / counts.groupby(keys)['count'].transform('sum')
+    ranked = counts.assign(probability=probability).sort_values(
+        keys + ['probability', 'to_size'], ascending=[True] * len(keys) + [False, True], kind='stable'
+    )
+    return ranked.drop_duplicates(keys).set_index(keys)[['to_size', 'probability']]
@@ -0,0 +1,505 @@
+"""
+Sketches Module
+
+This module provides mergeable streaming sketches for monitoring journey
+metrics over unbounded order streams in bounded memory: Count-Min for
+point frequencies, Space-Saving for top-k heavy hitters, HyperLogLog for
+distinct counts and a Bloom filter for membership. Sketches built with
+the same parameters on different shards or time windows can be merged.
+"""
+
+import math
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+def hash_values(values: Iterable[Hashable]) -> np.ndarray:
+    """
+    Hash values to uint64 with pandas' vectorized, seed-stable hashing.
+
+    Args:
+        values: Iterable of hashable values; tuples (e.g. transition
+            pairs) are hashed element-wise and combined
+
+    Returns:
+        uint64 array of hashes
+    """
+    if not isinstance(values, (np.ndarray, pd.Series, pd.Index)):
+        values = list(values)
+        if values and isinstance(values[0], tuple):
+            return pd.util.hash_pandas_object(pd.MultiIndex.from_tuples(values), index=False).to_numpy()
+    array = np.asarray(values)
+    if array.dtype.kind not in 'biuf':
+        array = array.astype(object)
+    return pd.util.hash_array(array)
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length for uint64 arrays."""
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= np.uint64(1 << shift)
+        length[high] += shift
+        x[high] >>= np.uint64(shift)
+    return length + (x > 0)
+
+class CountMinSketch:
+    """Count-Min sketch; estimates never undercount."""
+
+    def __init__(self, epsilon: float = 1e-3, delta: float = 1e-3):
+        """
+        Initialize the sketch.
+
+        Estimates exceed the true count by at most epsilon * total with
+        probability at least 1 - delta.
+
+        Args:
+            epsilon: Relative error bound
+            delta: Failure probability
+
+        Raises:
+            ValueError: If epsilon or delta is not in (0, 1)
+        """
+        if not (0 < epsilon < 1 and 0 < delta < 1):
+            raise ValueError("epsilon and delta must be between 0 and 1")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        """Column of each hash in every row (double hashing)."""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def update(self, items: Iterable[Hashable], counts: Optional[np.ndarray] = None) -> None:
+        """
+        Add items, each with weight 1 or the matching entry of counts.
+
+        Args:
+            items: Items to add
+            counts: Optional integer weights
+        """
+        hashes = hash_values(items)
+        weights = np.ones(len(hashes), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        columns = self._columns(hashes)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], weights)
+        self.total += int(weights.sum())
+
+    def estimate(self, items: Iterable[Hashable]) -> np.ndarray:
+        """
+        Estimated counts of items.
+
+        Args:
+            items: Items to query
+
+        Returns:
+            int64 array of upper-bound estimates
+        """
+        columns = self._columns(hash_values(items))
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        """
+        Combine two sketches with the same parameters.
+
+        Raises:
+            ValueError: If the sketch dimensions differ
+        """
+        if self.table.shape != other.table.shape:
+            raise ValueError("Cannot merge Count-Min sketches with different dimensions")
+        merged = CountMinSketch(self.epsilon, self.delta)
+        merged.table = self.table + other.table
+        merged.total = self.total + other.total
+        return merged
+
+class SpaceSaving:
+    """Space-Saving top-k summary."""
+
+    def __init__(self, capacity: int = 100):
+        """
+        Initialize the summary.
+
+        Any item with true count above total / capacity is guaranteed to
+        be tracked, and each tracked count overestimates by at most its
+        recorded error.
+
+        Args:
+            capacity: Number of counters kept
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self.total = 0
+
+    def update(self, items: Iterable[Hashable], counts: Optional[Iterable[int]] = None) -> None:
+        """
+        Add items; repeated items in a batch are pre-aggregated.
+
+        Args:
+            items: Items to add
+            counts: Optional integer weights
+        """
+        index = pd.Index(list(items), tupleize_cols=False)
+        batch = pd.Series(1 if counts is None else list(counts), index=index, dtype='int64')
+        if batch.empty:
+            return
+        for item, count in batch.groupby(level=0, sort=False).sum().sort_values(ascending=False).items():
+            self.total += int(count)
+            if item in self.counts:
+                self.counts[item] += int(count)
+            elif len(self.counts) < self.capacity:
+                self.counts[item] = int(count)
+                self.errors[item] = 0
+            else:
+                # Replace the smallest counter and inherit its count as error
+                victim = min(self.counts, key=self.counts.get)
+                floor = self.counts.pop(victim)
+                self.errors.pop(victim)
+                self.counts[item] = floor + int(count)
+                self.errors[item] = floor
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[Hashable, int, int]]:
+        """
+        Tracked items by estimated count.
+
+        Args:
+            k: Number of items; all tracked items when None
+
+        Returns:
+            List of (item, estimated count, maximum overestimate)
+        """
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """
+        Combine two summaries (mergeable Space-Saving).
+
+        Items missing from one side are charged that side's smallest
+        counter, then the largest capacity counters are kept.
+        """
+        capacity = max(self.capacity, other.capacity)
+        floor_a = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+        floor_b = min(other.counts.values()) if len(other.counts) >= other.capacity else 0
+
+        combined = {}
+        for item in set(self.counts) | set(other.counts):
+            count = self.counts.get(item, floor_a) + other.counts.get(item, floor_b)
+            error = (
+                self.errors.get(item, floor_a) + other.errors.get(item, floor_b)
+            )
+            combined[item] = (count, error)
+
+        merged = SpaceSaving(capacity)
+        for item, (count, error) in sorted(combined.items(), key=lambda kv: kv[1][0], reverse=True)[:capacity]:
+            merged.counts[item] = count
+            merged.errors[item] = error
+        merged.total = self.total + other.total
+        return merged
+
+class HyperLogLog:
+    """HyperLogLog distinct counter."""
+
+    def __init__(self, precision: int = 14):
+        """
+        Initialize the counter.
+
+        The relative standard error is about 1.04 / sqrt(2 ** precision).
+
+        Args:
+            precision: Number of index bits, between 4 and 18
+
+        Raises:
+            ValueError: If precision is out of range
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of the estimate relative to the true count."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, items: Iterable[Hashable]) -> None:
+        """
+        Add items.
+
+        Args:
+            items: Items to add
+        """
+        hashes = hash_values(items)
+        if len(hashes) == 0:
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def count(self) -> float:
+        """Estimated number of distinct items."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return float(estimate)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """
+        Combine two counters with the same precision.
+
+        Raises:
+            ValueError: If precisions differ
+        """
+        if self.precision != other.precision:
+            raise ValueError("Cannot merge HyperLogLog counters with different precision")
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+class BloomFilter:
+    """Bloom filter over a packed bit array."""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Initialize the filter.
+
+        Args:
+            capacity: Expected number of items
+            error_rate: False positive rate at capacity
+
+        Raises:
+            ValueError: If capacity or error_rate is out of range
+        """
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rounds = np.arange(self.hashes, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rounds * h2[None, :]) % np.uint64(self.size)).astype(np.int64)
+
+    def add(self, items: Iterable[Hashable]) -> None:
+        """Add items."""
+        positions = self._positions(hash_values(items)).ravel()
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def contains(self, items: Iterable[Hashable]) -> np.ndarray:
+        """
+        Membership test; false positives possible, false negatives not.
+
+        Returns:
+            Boolean array, True where an item may have been added
+        """
+        positions = self._positions(hash_values(items))
+        hit = (self.bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1
+        return hit.all(axis=0).astype(bool)
+
+    def merge(self, other: 'BloomFilter') -> 'BloomFilter':
+        """
+        Union of two filters with the same parameters.
+
+        Raises:
+            ValueError: If the filter parameters differ
+        """
+        if (self.size, self.hashes) != (other.size, other.hashes):
+            raise ValueError("Cannot merge Bloom filters with different parameters")
+        merged = BloomFilter(self.capacity, self.error_rate)
+        merged.bits = self.bits | other.bits
+        return merged
+
+class JourneySketch:
+    """
+    Approximate, mergeable entry-point and transition monitor.
+
+    The approximate counterpart of identify_entry_points and the
+    category transition counts: order batches stream through update()
+    and the counters stay bounded by the sketch parameters. Linking
+    transitions across batches is exact, not approximate: last_category
+    keeps every customer's latest (category, created_at), so it grows
+    as O(customers) and is the sketch's dominant memory cost on large
+    streams. Shard the stream by customer so entry orders are not
+    counted on two shards.
+    """
+
+    def __init__(
+        self,
+        epsilon: float = 1e-3,
+        delta: float = 1e-3,
+        top_k: int = 100,
+        hll_precision: int = 14,
+        customer_capacity: int = 1_000_000,
+        customer_error_rate: float = 0.001
+    ):
+        """
+        Initialize the sketch.
+
+        Args:
+            epsilon: Count-Min relative error bound
+            delta: Count-Min failure probability
+            top_k: Space-Saving counters for entry products and transitions
+            hll_precision: HyperLogLog precision for distinct counts
+            customer_capacity: Expected customers in the seen-customer filter
+            customer_error_rate: False positive rate of that filter; a false
+                positive drops a new customer's entry order
+        """
+        self.params = (epsilon, delta, top_k, hll_precision, customer_capacity, customer_error_rate)
+        self.entry_counts = CountMinSketch(epsilon, delta)
+        self.entry_top = SpaceSaving(top_k)
+        self.transition_counts = CountMinSketch(epsilon, delta)
+        self.transition_top = SpaceSaving(top_k)
+        self.customers = HyperLogLog(hll_precision)
+        self.styles = HyperLogLog(hll_precision)
+        self.seen = BloomFilter(customer_capacity, customer_error_rate)
+        # Exact, O(customers): customer -> (latest category, its created_at)
+        self.last_category: Dict[Hashable, Tuple[Hashable, pd.Timestamp]] = {}
+
+    def update(self, orders: pd.DataFrame) -> None:
+        """
+        Add a batch of prepared orders.
+
+        Args:
+            orders: Orders with customer_id, created_at, name, category and
+                returned (or is_return); style is optional
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        returned = 'returned' if 'returned' in orders.columns else 'is_return'
+        missing = {'customer_id', 'created_at', 'name', 'category', returned} - set(orders.columns)
+        if missing:
+            raise ValueError(f"Missing required columns in orders data: {missing}")
+        if orders.empty:
+            return
+
+        batch = orders.sort_values(['customer_id', 'created_at'], kind='stable')
+        self.customers.update(batch['customer_id'])
+        if 'style' in batch.columns:
+            self.styles.update(batch['style'].dropna())
+
+        # Entry points: first kept order of customers not seen before
+        kept = batch[~batch[returned].fillna(False).astype(bool)]
+        firsts = kept.drop_duplicates('customer_id')
+        new = firsts[~self.seen.contains(firsts['customer_id'])]
+        self.seen.add(firsts['customer_id'])
+        names = new['name'].dropna()
+        self.entry_counts.update(names)
+        self.entry_top.update(names)
+
+        # Transitions between consecutive categories, linked across batches
+        customers = batch['customer_id'].to_numpy()
+        categories = batch['category'].to_numpy()
+        times = pd.to_datetime(batch['created_at']).to_numpy()
+        same = customers[1:] == customers[:-1]
+        sources = list(categories[:-1][same])
+        targets = list(categories[1:][same])
+        starts = np.concatenate([[True], ~same])
+        for customer_id, category in zip(customers[starts], categories[starts]):
+            if customer_id in self.last_category:
+                sources.append(self.last_category[customer_id][0])
+                targets.append(category)
+        ends = np.concatenate([~same, [True]])
+        for customer_id, category, created_at in zip(customers[ends], categories[ends], times[ends]):
+            self._remember(customer_id, category, pd.Timestamp(created_at))
+
+        pairs = [(a, b) for a, b in zip(sources, targets) if not (pd.isna(a) or pd.isna(b))]
+        if pairs:
+            self.transition_counts.update(pairs)
+            self.transition_top.update(pairs)
+
+    def _remember(self, customer_id: Hashable, category: Hashable, created_at: pd.Timestamp) -> None:
+        """Record a customer's last category unless a newer one is known."""
+        previous = self.last_category.get(customer_id)
+        if previous is None or pd.isna(previous[1]) or created_at >= previous[1]:
+            self.last_category[customer_id] = (category, created_at)
+
+    def merge(self, other: 'JourneySketch') -> 'JourneySketch':
+        """
+        Combine sketches from different shards or time windows.
+
+        Raises:
+            ValueError: If the sketches were built with different parameters
+        """
+        if self.params != other.params:
+            raise ValueError("Cannot merge journey sketches with different parameters")
+        merged = JourneySketch(*self.params)
+        merged.entry_counts = self.entry_counts.merge(other.entry_counts)
+        merged.entry_top = self.entry_top.merge(other.entry_top)
+        merged.transition_counts = self.transition_counts.merge(other.transition_counts)
+        merged.transition_top = self.transition_top.merge(other.transition_top)
+        merged.customers = self.customers.merge(other.customers)
+        merged.styles = self.styles.merge(other.styles)
+        merged.seen = self.seen.merge(other.seen)
+        merged.last_category = dict(self.last_category)
+        for customer_id, (category, created_at) in other.last_category.items():
+            merged._remember(customer_id, category, created_at)
+        return merged
+
+    @staticmethod
+    def _shares(top: SpaceSaving, counts: CountMinSketch, top_n: int) -> Dict[Hashable, float]:
+        """Top items with the tighter of both estimates, as shares."""
+        ranked = top.top(top_n)
+        if not ranked or counts.total == 0:
+            return {}
+        estimates = counts.estimate([item for item, _, _ in ranked])
+        return {
+            item: min(count, int(estimate)) / counts.total
+            for (item, count, _), estimate in zip(ranked, estimates)
+        }
+
+    def entry_points(self, top_n: int = 10) -> Dict[str, float]:
+        """
+        Approximate identify_entry_points for the most common entry products.
+
+        Args:
+            top_n: Number of products returned
+
+        Returns:
+            Dict[name, frequency_ratio]
+        """
+        return self._shares(self.entry_top, self.entry_counts, top_n)
+
+    def top_transitions(self, top_n: int = 10) -> Dict[Tuple[str, str], float]:
+        """
+        Most frequent category transitions.
+
+        Args:
+            top_n: Number of transitions returned
+
+        Returns:
+            Dict[(from_category, to_category), share of all transitions]
+        """
+        return self._shares(self.transition_top, self.transition_counts, top_n)
+
+    def distinct_customers(self) -> float:
+        """Estimated number of distinct customers."""
+        return self.customers.count()
+
+    def distinct_styles(self) -> float:
+        """Estimated number of distinct styles."""
+        return self.styles.count()
@@ -0,0 +1,203 @@
+"""
+Snapshot Module
+
+This module persists prepared DataFrames as a directory of .npy arrays
+plus a small JSON metadata file. Text columns are stored as integer
+codes with their dictionary in a separate .npy file, and are loaded as
+Categoricals over the memory-mapped codes, so worker processes that
+load the same snapshot share the page cache instead of each parsing
+CSVs and holding private copies.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+SNAPSHOT_VERSION = 2
+METADATA_FILE = 'snapshot.json'
+
+# Object labels that can be stored as a typed array, by inferred type
+_LABEL_DTYPES = {'string': str, 'boolean': bool, 'integer': np.int64, 'floating': np.float64}
+
+def _label_array(values) -> np.ndarray:
+    """
+    Labels (dictionary entries, customer ids...) as an array that can be
+    saved without pickling.
+
+    Raises:
+        ValueError: If the labels are neither numeric, boolean nor all strings
+    """
+    values = np.asarray(values)
+    if values.dtype != object:
+        return values
+    inferred = pd.api.types.infer_dtype(values, skipna=False)
+    if inferred not in _LABEL_DTYPES and len(values):
+        raise ValueError(f"Cannot store {inferred} labels in a snapshot")
+    return values.astype(_LABEL_DTYPES.get(inferred, str))
+
+def _encode_column(series: pd.Series) -> Tuple[np.ndarray, Optional[np.ndarray], Dict[str, Any]]:
+    """
+    Encode a column as a plain numpy array plus metadata.
+
+    Numeric and boolean columns are stored as-is, datetimes as int64
+    ticks, and everything else as codes into a dictionary array. Codes
+    use the narrowest integer type pandas itself would pick, so loading
+    them as a Categorical does not copy.
+
+    Returns:
+        Tuple of (values, dictionary or None, metadata)
+    """
+    dtype = series.dtype
+    meta: Dict[str, Any] = {'dtype': str(dtype)}
+
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        meta['kind'] = 'raw'
+        return series.to_numpy(), None, meta
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        tz = getattr(dtype, 'tz', None)
+        values = series.dt.tz_convert(None) if tz is not None else series
+        meta.update(kind='datetime', unit=np.datetime_data(values.dtype)[0], tz=str(tz) if tz else None)
+        return values.to_numpy().view('int64'), None, meta
+
+    codes, categories = pd.factorize(series, use_na_sentinel=True)
+    meta['kind'] = 'codes'
+    code_dtype = pd.Categorical.from_codes([], categories=range(len(categories))).codes.dtype
+    return codes.astype(code_dtype), _label_array(categories), meta
+
+def _decode_column(values: np.ndarray, categories: Optional[np.ndarray], meta: Dict[str, Any], as_categorical: bool):
+    """Rebuild a column from its stored array, dictionary and metadata."""
+    values = np.asarray(values)  # plain ndarray view; still backed by the map
+    if meta['kind'] == 'raw':
+        return values
+
+    if meta['kind'] == 'datetime':
+        decoded = pd.Series(values.view(f"M8[{meta['unit']}]"), copy=False)
+        return decoded.dt.tz_localize('UTC').dt.tz_convert(meta['tz']) if meta['tz'] else decoded
+
+    if as_categorical or meta['dtype'] == 'category':
+        return pd.Categorical.from_codes(values, categories=pd.Index(categories))
+
+    lookup = np.empty(len(categories) + 1, dtype=object)
+    lookup[:-1] = categories
+    lookup[-1] = np.nan
+    decoded = pd.Series(lookup[values], copy=False)  # code -1 selects the NaN slot
+    if meta['dtype'] != 'object':
+        try:
+            decoded = decoded.astype(meta['dtype'])
+        except (TypeError, ValueError):
+            pass
+    return decoded
+
+def customer_offsets(customer_ids: pd.Series) -> Tuple[pd.Index, np.ndarray]:
+    """
+    Offsets of each customer's contiguous block of rows.
+
+    Args:
+        customer_ids: Customer column of a frame sorted by customer
+
+    Returns:
+        Tuple of (customer index, offsets) where customer i occupies
+        rows offsets[i]:offsets[i + 1]
+    """
+    codes, uniques = pd.factorize(customer_ids, sort=False)
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    offsets = np.concatenate([[0], boundaries, [len(codes)]]).astype(np.int64)
+    if len(codes) == 0:
+        offsets = np.zeros(1, dtype=np.int64)
+    return pd.Index(uniques), offsets
+
+def save_frames(
+    path: str,
+    frames: Dict[str, pd.DataFrame],
+    arrays: Optional[Dict[str, np.ndarray]] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Write DataFrames and extra arrays as a memory-mappable snapshot.
+
+    Args:
+        path: Snapshot directory (created if missing)
+        frames: Named DataFrames; the index is not stored
+        arrays: Extra named arrays (e.g. offsets, customer ids); object
+            arrays must hold strings, booleans or numbers
+        metadata: Extra JSON-serializable metadata, kept small
+
+    Raises:
+        ValueError: If a text column or array holds labels that cannot
+            be stored without pickling
+    """
+    root = Path(path)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest: Dict[str, Any] = {
+        'version': SNAPSHOT_VERSION,
+        'frames': {},
+        'arrays': [],
+        'metadata': metadata or {},
+    }
+
+    for name, df in frames.items():
+        columns = []
+        for i, col in enumerate(df.columns):
+            values, categories, meta = _encode_column(df[col])
+            file_name = f"{name}.{i}.npy"
+            np.save(root / file_name, np.ascontiguousarray(values), allow_pickle=False)
+            meta.update(name=col, file=file_name)
+            if categories is not None:
+                meta['categories'] = f"{name}.{i}.categories.npy"
+                np.save(root / meta['categories'], categories, allow_pickle=False)
+            columns.append(meta)
+        manifest['frames'][name] = {'rows': len(df), 'columns': columns}
+
+    for name, values in (arrays or {}).items():
+        np.save(root / f"{name}.npy", np.ascontiguousarray(_label_array(values)), allow_pickle=False)
+        manifest['arrays'].append(name)
+
+    with open(root / METADATA_FILE, 'w') as f:
+        json.dump(manifest, f)
+
+def load_frames(
+    path: str,
+    mmap: bool = True,
+    as_categorical: bool = True
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Open a snapshot written by save_frames.
+
+    Args:
+        path: Snapshot directory
+        mmap: Map arrays read-only instead of reading them into memory
+        as_categorical: Keep encoded text columns as Categoricals over the
+            mapped codes (zero-copy); False decodes them into private
+            arrays of their original dtype
+
+    Returns:
+        Tuple of (frames, arrays, metadata)
+
+    Raises:
+        FileNotFoundError: If the snapshot metadata is missing
+        ValueError: If the snapshot version is not supported
+    """
+    root = Path(path)
+    with open(root / METADATA_FILE) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+
+    mmap_mode = 'r' if mmap else None
+    frames = {}
+    for name, spec in manifest['frames'].items():
+        data = {}
+        for meta in spec['columns']:
+            values = np.load(root / meta['file'], mmap_mode=mmap_mode, allow_pickle=False)
+            categories = np.load(root / meta['categories'], allow_pickle=False) if 'categories' in meta else None
+            data[meta['name']] = _decode_column(values, categories, meta, as_categorical)
+        frames[name] = pd.DataFrame(data, index=pd.RangeIndex(spec['rows']), copy=False)
+
+    arrays = {
+        name: np.load(root / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+        for name in manifest['arrays']
+    }
+    return frames, arrays, manifest['metadata']
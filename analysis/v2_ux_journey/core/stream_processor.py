@@ -0,0 +1,427 @@
+"""
+Stream Processor Module
+
+This module maintains rolling order and return metrics from append-only
+order item files without re-running batch jobs. New rows are read in
+micro-batches, counted into daily ring buffers of numpy arrays, and once
+the watermark (latest event time minus the allowed lateness) passes a
+day, the sliding and tumbling windows ending on that day are emitted:
+return rate per style, entry-product share and journey stage mix. The
+stage of each order comes from a StreamingConfidence state per customer,
+updated with order and return events in time order, unless the rows
+already carry a journey_stage column.
+Micro-batches are processed one event day at a time, so a batch of any
+span gives the same windows as feeding its days one by one.
+"""
+
+import io
+import time
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Sequence
+import logging
+
+import numpy as np
+import pandas as pd
+
+from ..utils.data_loader import DATE_COLUMNS, parse_dates
+from .sketches import BloomFilter
+from .streaming_confidence import StreamingConfidence
+
+logger = logging.getLogger(__name__)
+
+NANOS_PER_DAY = 86_400 * 10**9
+
+def _nanos(values: pd.Series) -> np.ndarray:
+    """Epoch nanoseconds of a datetime column, whatever its resolution."""
+    return values.to_numpy().astype('datetime64[ns]').view('int64')
+
+class CSVTailSource:
+    """Reads rows appended to a CSV file since the previous poll."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the source at the start of the file.
+
+        Args:
+            path: CSV file that is only ever appended to
+        """
+        self.path = Path(path)
+        self.offset = 0
+        self.header: Optional[bytes] = None
+
+    def poll(self) -> pd.DataFrame:
+        """
+        Read complete rows appended since the last poll.
+
+        Returns:
+            DataFrame of new rows (empty if nothing new); a trailing
+            partial line is left for the next poll
+        """
+        if not self.path.exists():
+            return pd.DataFrame()
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return pd.DataFrame()
+        chunk = chunk[:end]
+        self.offset += end
+
+        if self.header is None:
+            header_end = chunk.find(b'\n') + 1
+            self.header, chunk = chunk[:header_end], chunk[header_end:]
+        if not chunk:
+            return pd.DataFrame()
+        return pd.read_csv(io.BytesIO(self.header + chunk))
+
+class _DailyRing:
+    """Per-day counts by key in a ring buffer of numpy arrays."""
+
+    def __init__(self, days: int, keys: int = 16):
+        self.days = days
+        self.counts = np.zeros((days, keys), dtype=np.float64)
+        self.slot_day = np.full(days, -1, dtype=np.int64)
+        self.keys: Dict[Hashable, int] = {}
+
+    def codes(self, values: Sequence[Hashable]) -> np.ndarray:
+        """Key codes, growing the key axis as new keys appear."""
+        codes = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            code = self.keys.get(value)
+            if code is None:
+                code = self.keys[value] = len(self.keys)
+            codes[i] = code
+        if len(self.keys) > self.counts.shape[1]:
+            grown = np.zeros((self.days, max(2 * self.counts.shape[1], len(self.keys))))
+            grown[:, :self.counts.shape[1]] = self.counts
+            self.counts = grown
+        return codes
+
+    def add(self, days: np.ndarray, values: Sequence[Hashable]) -> None:
+        """Count one event per (day, key)."""
+        if len(days) == 0:
+            return
+        codes = self.codes(values)
+        slots = days % self.days
+        for slot, day in set(zip(slots.tolist(), days.tolist())):
+            if self.slot_day[slot] != day:
+                # The slot held a day that has left every window
+                self.counts[slot] = 0
+                self.slot_day[slot] = day
+        np.add.at(self.counts, (slots, codes), 1.0)
+
+    def window(self, first_day: int, last_day: int) -> pd.Series:
+        """Counts by key summed over days first_day..last_day."""
+        days = np.arange(first_day, last_day + 1)
+        slots = days % self.days
+        live = self.slot_day[slots] == days
+        totals = self.counts[slots[live]].sum(axis=0)[:len(self.keys)]
+        return pd.Series(totals, index=list(self.keys))
+
+class WindowedMetricsProcessor:
+    """Micro-batch processor for sliding and tumbling window metrics."""
+
+    def __init__(
+        self,
+        output_dir: str,
+        products: Optional[pd.DataFrame] = None,
+        windows: Sequence[int] = (7, 30),
+        allowed_lateness_days: int = 1,
+        expected_customers: int = 1_000_000
+    ):
+        """
+        Initialize the processor.
+
+        Args:
+            output_dir: Directory receiving Parquet window results
+            products: Optional products (product_id, name, sku) used to name,
+                style and size events that lack those columns; band and cup
+                come from the SKU as in JourneyMapper._prepare_data, kept only
+                when every variant of a product agrees
+            windows: Window lengths in days
+            allowed_lateness_days: Days an event may arrive behind the
+                latest event time and still be counted
+            expected_customers: Capacity of the seen-customer filter used to
+                detect entry purchases
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.windows = tuple(sorted(windows))
+        self.lateness = allowed_lateness_days
+        ring_days = self.windows[-1] + allowed_lateness_days + 1
+
+        self.products = None
+        self.sizes = None
+        if products is not None:
+            products = products.rename(columns={'id': 'product_id'})
+            dimension = products.drop_duplicates('product_id')
+            self.products = dimension.set_index('product_id')['name']
+            if 'sku' in products.columns:
+                sku = products['sku'].astype('string')
+                sizes = pd.DataFrame({
+                    'product_id': products['product_id'],
+                    'band_size': sku.str[5:7].where(sku.str.len() > 7),
+                    'cup_size': sku.str[7:9].where(sku.str.len() > 9),
+                }).astype(object)
+                grouped = sizes.groupby('product_id', sort=False)
+                self.sizes = grouped.first().where(grouped.nunique() <= 1)
+
+        self.orders = _DailyRing(ring_days)
+        self.returns = _DailyRing(ring_days)
+        self.entries = _DailyRing(ring_days)
+        self.stages = _DailyRing(ring_days)
+        self.seen = BloomFilter(expected_customers, 0.001)
+        self.customers = StreamingConfidence()
+        self.pending_returns = pd.DataFrame(
+            columns=['day', 'ns', 'customer_id', 'style', 'band_size', 'cup_size']
+        )
+
+        self.max_event_ns: Optional[int] = None
+        self.next_day: Optional[int] = None  # first day not yet emitted
+        self.late_events = 0
+        self.parts_written = 0
+
+    @property
+    def watermark_day(self) -> Optional[int]:
+        """Latest day whose events are all considered received."""
+        if self.max_event_ns is None:
+            return None
+        return self.max_event_ns // NANOS_PER_DAY - self.lateness - 1
+
+    def _normalize(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Apply load_pepper_data's renames and date parsing, derive style."""
+        rows = rows.rename(columns={'user_id': 'customer_id', 'order_date': 'created_at'})
+        rows = parse_dates(rows, DATE_COLUMNS)
+        if 'name' not in rows.columns and self.products is not None and 'product_id' in rows.columns:
+            rows['name'] = rows['product_id'].map(self.products)
+        if 'style' not in rows.columns and 'name' in rows.columns:
+            rows['style'] = rows['name'].str.extract(r'(.*?)(?:\s*-\s*[A-Za-z]+)?$')[0]
+        for col in ['band_size', 'cup_size']:
+            if col not in rows.columns:
+                known = self.sizes is not None and 'product_id' in rows.columns
+                rows[col] = rows['product_id'].map(self.sizes[col]) if known else None
+        return rows
+
+    def _accept(self, ns: np.ndarray) -> np.ndarray:
+        """Mask of events not behind the watermark."""
+        if self.next_day is None:
+            return np.ones(len(ns), dtype=bool)
+        accepted = ns // NANOS_PER_DAY >= self.next_day
+        self.late_events += int((~accepted).sum())
+        return accepted
+
+    def process(self, rows: pd.DataFrame) -> List[pd.DataFrame]:
+        """
+        Count a micro-batch of order item rows and emit finished windows.
+
+        Each row is an order event at created_at; rows with returned_at
+        also produce a return event, released once the stream reaches
+        that time. Rows are processed in per-day chunks in time order, and
+        windows are emitted before the clock moves to the next day, so no
+        ring slot is reused while a pending window still needs it.
+
+        Args:
+            rows: New order item rows
+
+        Returns:
+            Window result frames emitted by this batch
+        """
+        if rows.empty:
+            return []
+        rows = self._normalize(rows).dropna(subset=['created_at']).sort_values('created_at', kind='stable')
+        ns = _nanos(rows['created_at'])
+        days = ns // NANOS_PER_DAY
+        bounds = np.flatnonzero(np.diff(days)) + 1
+
+        emitted = []
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(rows)]):
+            emitted += self._advance_to(int(days[start]))
+            emitted += self._process_day(rows.iloc[start:end], ns[start:end])
+        return emitted
+
+    def _advance_to(self, day: int) -> List[pd.DataFrame]:
+        """
+        Move the clock through the event-free days before `day`.
+
+        Each skipped day releases its returns and emits its windows, as if
+        an event had arrived at its end, so the watermark advances at most
+        one day per step.
+        """
+        if self.max_event_ns is None:
+            return []
+        emitted = []
+        for skipped in range(self.max_event_ns // NANOS_PER_DAY + 1, day):
+            self.max_event_ns = (skipped + 1) * NANOS_PER_DAY - 1
+            self._update_customers(self._release_returns())
+            emitted += self._emit()
+        return emitted
+
+    def _process_day(self, rows: pd.DataFrame, ns: np.ndarray) -> List[pd.DataFrame]:
+        """Count rows of one event day and emit the windows they complete."""
+        latest = int(ns.max())
+        self.max_event_ns = latest if self.max_event_ns is None else max(self.max_event_ns, latest)
+
+        accepted = self._accept(ns)
+        orders, ns = rows[accepted], ns[accepted]
+        days = ns // NANOS_PER_DAY
+        styles = orders['style'].tolist() if 'style' in orders.columns else ['unknown'] * len(orders)
+        self.orders.add(days, styles)
+
+        # First order of a customer not seen before is an entry purchase
+        first = ~orders['customer_id'].duplicated().to_numpy()
+        new = first & ~self.seen.contains(orders['customer_id'])
+        self.seen.add(orders['customer_id'][first])
+        if 'name' in orders.columns:
+            self.entries.add(days[new], orders['name'].to_numpy()[new].tolist())
+
+        if 'returned_at' in orders.columns:
+            returned = orders['returned_at'].notna().to_numpy()
+            return_ns = _nanos(orders['returned_at'])[returned]
+            self.pending_returns = pd.concat([
+                self.pending_returns,
+                pd.DataFrame({
+                    'day': return_ns // NANOS_PER_DAY,
+                    'ns': return_ns,
+                    'customer_id': orders['customer_id'].to_numpy(dtype=object)[returned],
+                    'style': np.asarray(styles, dtype=object)[returned],
+                    'band_size': orders['band_size'].to_numpy(dtype=object)[returned],
+                    'cup_size': orders['cup_size'].to_numpy(dtype=object)[returned],
+                })
+            ], ignore_index=True)
+        stages = self._update_customers(self._release_returns(), orders, ns)
+        if 'journey_stage' in orders.columns:
+            stages = orders['journey_stage'].tolist()
+        self.stages.add(days, stages)
+        return self._emit()
+
+    def _release_returns(self) -> pd.DataFrame:
+        """Count return events the stream has caught up with and return them."""
+        due = self.pending_returns['ns'].to_numpy(dtype=np.int64) <= self.max_event_ns
+        if not due.any():
+            return self.pending_returns.iloc[:0]
+        released = self.pending_returns[due]
+        self.pending_returns = self.pending_returns[~due].reset_index(drop=True)
+        accepted = self._accept(released['ns'].to_numpy(dtype=np.int64))
+        released = released[accepted]
+        self.returns.add(released['day'].to_numpy(dtype=np.int64), released['style'].tolist())
+        return released
+
+    def _update_customers(
+        self,
+        returns: pd.DataFrame,
+        orders: Optional[pd.DataFrame] = None,
+        order_ns: Optional[np.ndarray] = None
+    ) -> List[str]:
+        """
+        Apply return and order events to the per-customer state in time order.
+
+        An order counts as kept until its return event arrives, so each
+        stage is the customer's stage as of that order's time.
+
+        Returns:
+            Journey stage value of each order's customer right after it
+        """
+        columns = ['customer_id', 'band_size', 'cup_size', 'style']
+        events = [(int(ns), 0, i) for i, ns in enumerate(returns['ns'].tolist())]
+        return_values = returns[columns].to_numpy(dtype=object)
+        if orders is not None:
+            events += [(int(ns), 1, i) for i, ns in enumerate(order_ns.tolist())]
+            order_values = orders.reindex(columns=columns).to_numpy(dtype=object)
+
+        stages = [None] * (0 if orders is None else len(orders))
+        for ns, is_order, i in sorted(events):  # returns first on equal times
+            if is_order:
+                customer_id, band, cup, style = order_values[i]
+                self.customers.record_order(customer_id, ns, band, cup, style=style)
+                stages[i] = self.customers.stage(customer_id)[0].value
+            else:
+                customer_id, band, cup, style = return_values[i]
+                self.customers.record_return(customer_id, ns, band, cup, style=style)
+        return stages
+
+    def _emit(self) -> List[pd.DataFrame]:
+        """Emit windows ending on every day the watermark has passed."""
+        watermark = self.watermark_day
+        if watermark is None:
+            return []
+        if self.next_day is None:
+            # Start at the earliest day holding events
+            self.next_day = int(self.orders.slot_day[self.orders.slot_day >= 0].min())
+
+        emitted = []
+        while self.next_day <= watermark:
+            day = self.next_day
+            frames = [self._window_frame(day, size, 'sliding') for size in self.windows]
+            frames += [
+                self._window_frame(day, size, 'tumbling') for size in self.windows
+                if (day + 1) % size == 0
+            ]
+            frames = [frame for frame in frames if not frame.empty]
+            if frames:
+                result = pd.concat(frames, ignore_index=True)
+                self._write(result)
+                emitted.append(result)
+            self.next_day += 1
+        return emitted
+
+    def _window_frame(self, last_day: int, size: int, kind: str) -> pd.DataFrame:
+        """Metrics of the window of `size` days ending on last_day."""
+        first_day = last_day - size + 1
+        orders = self.orders.window(first_day, last_day)
+        returns = self.returns.window(first_day, last_day).reindex(orders.index, fill_value=0.0)
+        entries = self.entries.window(first_day, last_day)
+        stages = self.stages.window(first_day, last_day)
+
+        parts = []
+        if orders.sum() > 0:
+            rate = (returns / orders.where(orders > 0)).dropna()
+            parts.append(('return_rate', rate))
+        if entries.sum() > 0:
+            parts.append(('entry_share', entries[entries > 0] / entries.sum()))
+        if stages.sum() > 0:
+            parts.append(('stage_mix', stages[stages > 0] / stages.sum()))
+        if not parts:
+            return pd.DataFrame()
+
+        start = pd.Timestamp(first_day * NANOS_PER_DAY)
+        end = pd.Timestamp((last_day + 1) * NANOS_PER_DAY)
+        return pd.concat([
+            pd.DataFrame({
+                'window': kind,
+                'window_days': size,
+                'window_start': start,
+                'window_end': end,
+                'metric': metric,
+                'key': values.index.astype(str),
+                'value': values.to_numpy(),
+            })
+            for metric, values in parts
+        ], ignore_index=True)
+
+    def _write(self, result: pd.DataFrame) -> None:
+        """Write one emission as a Parquet part file."""
+        path = self.output_dir / f"windows-{self.parts_written:06d}.parquet"
+        tmp = path.with_suffix('.tmp')
+        result.to_parquet(tmp, index=False)
+        tmp.replace(path)
+        self.parts_written += 1
+
+    def run(self, source: CSVTailSource, polls: Optional[int] = None, interval: float = 5.0) -> None:
+        """
+        Poll a source and process each micro-batch.
+
+        Args:
+            source: Append-only order item source
+            polls: Number of polls; None runs until interrupted
+            interval: Seconds between polls
+        """
+        count = 0
+        while polls is None or count < polls:
+            rows = source.poll()
+            emitted = self.process(rows)
+            if emitted:
+                logger.debug(f"Emitted {len(emitted)} window days, {self.late_events} late events dropped")
+            count += 1
+            if polls is None or count < polls:
+                time.sleep(interval)
@@ -0,0 +1,358 @@
+"""
+Streaming Confidence Module
+
+This module keeps live confidence scores current as order and return
+events arrive. Each customer has a small fixed-size state held in numpy
+arrays indexed by customer code: order counts, first/last order time,
+a few per-value counters standing in for the band/cup/style nunique
+checks, and exponentially decayed return and completed-order masses.
+Every event updates that state in O(1), independent of the customer's
+history, and the journey stage follows from it with the mapper's rules.
+"""
+
+import math
+from enum import Enum
+from typing import Dict, Hashable, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NANOS_PER_DAY = 86_400 * 10**9
+
+# Distinct sizes (and styles) held in dense slots per customer; more spill
+# to a sparse dict
+SIZE_SLOTS = 4
+
+# Per-customer value counters kept in slots
+SLOT_KINDS = ('band', 'cup', 'style')
+
+class StreamingConfidence:
+    """Per-customer confidence state with O(1) event updates."""
+
+    def __init__(self, half_life_days: Optional[float] = None, capacity: int = 1024):
+        """
+        Initialize empty state.
+
+        Args:
+            half_life_days: Half-life of the return and frequency terms.
+                None reproduces JourneyMapper._calculate_confidence_score
+                exactly (all-history return rate and date-range frequency)
+            capacity: Initial number of customer slots; grows by doubling
+
+        Raises:
+            ValueError: If half_life_days is not positive
+        """
+        if half_life_days is not None and half_life_days <= 0:
+            raise ValueError("half_life_days must be positive")
+        self.half_life_days = half_life_days
+        self.customer_codes: Dict[Hashable, int] = {}
+        self.size_codes: Dict[Hashable, int] = {}
+        # Values beyond SIZE_SLOTS per customer code, with their counts
+        self._band_spilled: Dict[int, Dict[int, int]] = {}
+        self._cup_spilled: Dict[int, Dict[int, int]] = {}
+        self._style_spilled: Dict[int, Dict[int, int]] = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        """Create (or grow) the state arrays."""
+        old = getattr(self, 'orders', None)
+        size = 0 if old is None else len(old)
+        fields = {
+            'orders': (np.int32, 0),
+            'returns': (np.int32, 0),
+            'size_swaps': (np.bool_, False),
+            'first_ns': (np.int64, np.iinfo(np.int64).max),
+            'last_ns': (np.int64, np.iinfo(np.int64).min),
+            'decayed_orders': (np.float64, 0.0),
+            'decayed_returns': (np.float64, 0.0),
+            'decayed_completed': (np.float64, 0.0),
+            'decayed_at_ns': (np.int64, 0),
+            'band_overflow': (np.int32, 0),
+            'cup_overflow': (np.int32, 0),
+            'style_overflow': (np.int32, 0),
+        }
+        for name, (dtype, fill) in fields.items():
+            grown = np.full(capacity, fill, dtype=dtype)
+            if size:
+                grown[:size] = getattr(self, name)
+            setattr(self, name, grown)
+        for name, (dtype, fill) in {
+            f"{kind}_{field}": (np.int32, fill)
+            for kind in SLOT_KINDS for field, fill in [('slots', -1), ('counts', 0)]
+        }.items():
+            grown = np.full((capacity, SIZE_SLOTS), fill, dtype=dtype)
+            if size:
+                grown[:size] = getattr(self, name)
+            setattr(self, name, grown)
+
+    def _code(self, customer_id: Hashable) -> int:
+        """Code of a customer, allocating a slot for new customers."""
+        code = self.customer_codes.get(customer_id)
+        if code is None:
+            code = len(self.customer_codes)
+            if code >= len(self.orders):
+                self._allocate(2 * len(self.orders))
+            self.customer_codes[customer_id] = code
+        return code
+
+    def _size_code(self, size: Hashable) -> int:
+        """Code of a size or style value; -1 for missing values."""
+        if size is None or (isinstance(size, float) and math.isnan(size)):
+            return -1
+        return self.size_codes.setdefault(size, len(self.size_codes))
+
+    def _count_size(self, kind: str, code: int, size: int, delta: int) -> None:
+        """
+        Add delta to one band, cup or style counter of a customer.
+
+        A value lives either in one of the SIZE_SLOTS slots or, once they
+        are taken, in a sparse per-customer overflow dict, never in both.
+        A slot that empties takes an overflowed value back, and removing
+        a value that was never counted is ignored, so counts stay >= 0.
+        """
+        if size < 0:
+            return
+        row, counts = getattr(self, f"{kind}_slots")[code], getattr(self, f"{kind}_counts")[code]
+        overflow = getattr(self, f"{kind}_overflow")
+        spilled = getattr(self, f"_{kind}_spilled")
+        extra = spilled.get(code, {})
+
+        hit = np.flatnonzero(row == size)
+        if len(hit):
+            slot = hit[0]
+            counts[slot] = max(counts[slot] + delta, 0)
+            if counts[slot] == 0:
+                row[slot] = -1
+                if extra:
+                    # Move an overflowed size into the freed slot whole
+                    row[slot], counts[slot] = extra.popitem()
+                    overflow[code] -= counts[slot]
+        elif size in extra:
+            applied = max(delta, -extra[size])
+            extra[size] += applied
+            overflow[code] += applied
+            if extra[size] == 0:
+                del extra[size]
+        elif delta > 0:
+            free = np.flatnonzero(row < 0)
+            if len(free):
+                row[free[0]], counts[free[0]] = size, delta
+            else:
+                spilled.setdefault(code, extra)[size] = delta
+                overflow[code] += delta
+        if not extra:
+            spilled.pop(code, None)
+
+    def _decay(self, code: int, timestamp_ns: int) -> None:
+        """Bring a customer's decayed masses forward to a timestamp."""
+        if self.half_life_days is None:
+            return
+        elapsed = timestamp_ns - self.decayed_at_ns[code]
+        if self.decayed_at_ns[code] and elapsed > 0:
+            factor = 0.5 ** (elapsed / NANOS_PER_DAY / self.half_life_days)
+            self.decayed_orders[code] *= factor
+            self.decayed_returns[code] *= factor
+            self.decayed_completed[code] *= factor
+        if elapsed > 0 or not self.decayed_at_ns[code]:
+            self.decayed_at_ns[code] = timestamp_ns
+
+    def record_order(
+        self,
+        customer_id: Hashable,
+        created_at,
+        band_size: Hashable = None,
+        cup_size: Hashable = None,
+        returned: bool = False,
+        size_swap: bool = False,
+        style: Hashable = None
+    ) -> None:
+        """
+        Apply one order event.
+
+        Args:
+            customer_id: Ordering customer
+            created_at: Order time (anything pd.Timestamp accepts)
+            band_size: Band size of the item
+            cup_size: Cup size of the item
+            returned: Whether the order is already known to be returned
+            size_swap: Whether the order was exchanged for another size
+            style: Style of the item
+        """
+        code = self._code(customer_id)
+        timestamp_ns = pd.Timestamp(created_at).value
+        self._decay(code, timestamp_ns)
+
+        self.orders[code] += 1
+        self.first_ns[code] = min(self.first_ns[code], timestamp_ns)
+        self.last_ns[code] = max(self.last_ns[code], timestamp_ns)
+        self.size_swaps[code] |= bool(size_swap)
+        self.decayed_orders[code] += 1.0
+        if returned:
+            self.returns[code] += 1
+            self.decayed_returns[code] += 1.0
+        else:
+            self.decayed_completed[code] += 1.0
+            self._count_size('band', code, self._size_code(band_size), 1)
+            self._count_size('cup', code, self._size_code(cup_size), 1)
+            self._count_size('style', code, self._size_code(style), 1)
+
+    def record_return(
+        self,
+        customer_id: Hashable,
+        returned_at,
+        band_size: Hashable = None,
+        cup_size: Hashable = None,
+        size_swap: bool = False,
+        style: Hashable = None
+    ) -> None:
+        """
+        Apply one return event for a previously recorded completed order.
+
+        Args:
+            customer_id: Returning customer
+            returned_at: Time the return was received
+            band_size: Band size of the returned item
+            cup_size: Cup size of the returned item
+            size_swap: Whether the return was an exchange into another size
+            style: Style of the returned item
+        """
+        code = self._code(customer_id)
+        self._decay(code, pd.Timestamp(returned_at).value)
+
+        self.returns[code] += 1
+        self.size_swaps[code] |= bool(size_swap)
+        self.decayed_returns[code] += 1.0
+        self.decayed_completed[code] = max(self.decayed_completed[code] - 1.0, 0.0)
+        self._count_size('band', code, self._size_code(band_size), -1)
+        self._count_size('cup', code, self._size_code(cup_size), -1)
+        self._count_size('style', code, self._size_code(style), -1)
+
+    @classmethod
+    def from_orders(cls, orders: pd.DataFrame, half_life_days: Optional[float] = None) -> 'StreamingConfidence':
+        """
+        Replay prepared orders in chronological order.
+
+        Args:
+            orders: Orders with customer_id, created_at, returned, band_size
+                and cup_size (size_swap and style are optional)
+            half_life_days: See __init__
+
+        Returns:
+            StreamingConfidence holding every customer's current state
+        """
+        state = cls(half_life_days, capacity=max(16, orders['customer_id'].nunique()))
+        events = orders.sort_values('created_at', kind='stable')
+        swaps = events['size_swap'] if 'size_swap' in events.columns else pd.Series(False, index=events.index)
+        styles = events['style'] if 'style' in events.columns else pd.Series(None, index=events.index)
+        for customer_id, created_at, band, cup, returned, swap, style in zip(
+            events['customer_id'], events['created_at'], events['band_size'],
+            events['cup_size'], events['returned'].fillna(False), swaps.fillna(False), styles
+        ):
+            state.record_order(customer_id, created_at, band, cup, bool(returned), bool(swap), style)
+        return state
+
+    def _score(self, codes: np.ndarray, now=None) -> np.ndarray:
+        """Confidence of the given customer codes, from the state arrays."""
+        orders = self.orders[codes].astype(float)
+        completed = orders - self.returns[codes]
+
+        # nunique == 1 over completed orders: exactly one live size slot
+        size_consistency = (
+            ((self.band_slots[codes] >= 0).sum(axis=1) == 1) & (self.band_overflow[codes] == 0) &
+            ((self.cup_slots[codes] >= 0).sum(axis=1) == 1) & (self.cup_overflow[codes] == 0) &
+            ~self.size_swaps[codes]
+        )
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self.half_life_days is None:
+                return_rate = self.returns[codes] / orders
+                date_range = (self.last_ns[codes] - self.first_ns[codes]) // NANOS_PER_DAY
+                frequency = np.minimum(1.0, completed / (date_range / 30 + 1))
+            else:
+                factor = 1.0
+                if now is not None:
+                    elapsed = np.maximum(pd.Timestamp(now).value - self.decayed_at_ns[codes], 0)
+                    factor = 0.5 ** (elapsed / NANOS_PER_DAY / self.half_life_days)
+                return_rate = self.decayed_returns[codes] / self.decayed_orders[codes]
+                mean_life_days = self.half_life_days / math.log(2)
+                frequency = np.minimum(1.0, self.decayed_completed[codes] * factor * 30 / mean_life_days)
+
+        score = np.clip(size_consistency * 0.4 + (1 - return_rate) * 0.3 + frequency * 0.3, 0.0, 1.0)
+        return np.where(completed > 0, score, 0.0)
+
+    def scores(self, now=None) -> pd.Series:
+        """
+        Current confidence of every customer.
+
+        Args:
+            now: Time to decay to; defaults to each customer's last event
+
+        Returns:
+            Series of scores between 0 and 1 indexed by customer_id
+        """
+        codes = np.arange(len(self.customer_codes))
+        return pd.Series(
+            self._score(codes, now),
+            index=pd.Index(list(self.customer_codes), name='customer_id')
+        )
+
+    def score(self, customer_id: Hashable, now=None) -> float:
+        """
+        Current confidence of one customer in O(1).
+
+        Args:
+            customer_id: Customer to score
+            now: Time to decay to; defaults to the customer's last event
+
+        Returns:
+            Score between 0 and 1; 0 for unknown customers
+        """
+        code = self.customer_codes.get(customer_id)
+        if code is None:
+            return 0.0
+        return float(self._score(np.array([code]), now)[0])
+
+    def stage(self, customer_id: Hashable, now=None) -> Tuple[Enum, float]:
+        """
+        Current journey stage of one customer in O(1).
+
+        Applies JourneyMapper._stage_for_orders' rules to the counters:
+        completed and returned orders, distinct completed styles and the
+        confidence score.
+
+        Args:
+            customer_id: Customer to classify
+            now: Time to decay to; defaults to the customer's last event
+
+        Returns:
+            Tuple of (JourneyStage, confidence_score); FIRST_PURCHASE and
+            0.0 for unknown customers
+        """
+        from .journey_mapping import JourneyMapper, JourneyStage
+
+        code = self.customer_codes.get(customer_id)
+        if code is None:
+            return JourneyStage.FIRST_PURCHASE, 0.0
+        confidence = float(self._score(np.array([code]), now)[0])
+        returns = int(self.returns[code])
+        completed = int(self.orders[code]) - returns
+        styles = int((self.style_slots[code] >= 0).sum()) + len(self._style_spilled.get(code, ()))
+        confident = confidence > JourneyMapper.CONFIDENCE_THRESHOLD
+
+        # Same precedence as JourneyMapper._stage_for_orders
+        if completed <= 0:
+            return JourneyStage.SIZE_EXPLORATION, 0.0
+        if completed == 1 and returns == 0:
+            return JourneyStage.FIRST_PURCHASE, confidence
+        if completed >= 2 and styles >= JourneyMapper.STYLE_THRESHOLD:
+            return JourneyStage.STYLE_EXPLORATION, confidence
+        if returns > 0:
+            return JourneyStage.SIZE_EXPLORATION, confidence
+        if completed >= JourneyMapper.LOYALTY_THRESHOLD and confident:
+            return JourneyStage.BRAND_LOYAL, confidence
+        if confident:
+            return JourneyStage.CONFIDENCE_BUILDING, confidence
+        return JourneyStage.SIZE_EXPLORATION, confidence
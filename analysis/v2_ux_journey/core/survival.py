@@ -0,0 +1,218 @@
+"""
+Survival Module
+
+This module measures how long customers take to reach journey events,
+treating customers who have not reached them yet as censored: time from
+first to second purchase, time from delivery to return, and time spent
+in each journey stage. Durations and censoring flags are derived for all
+customers at once with grouped array operations, and Kaplan-Meier curves are built
+from cumulative event counts per group instead of per-customer loops.
+"""
+
+from typing import Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NANOS_PER_DAY = 86_400 * 10**9
+
+def _days(values: pd.Series) -> np.ndarray:
+    """Epoch days of a datetime column as floats, NaN where missing."""
+    ns = values.to_numpy().astype('datetime64[ns]')
+    days = ns.view('int64') / NANOS_PER_DAY
+    days[np.isnat(ns)] = np.nan
+    return days
+
+def _censor_day(orders: pd.DataFrame, as_of: Optional[pd.Timestamp]) -> float:
+    """Epoch day at which follow-up ends: as_of or the latest date seen."""
+    if as_of is not None:
+        return pd.Timestamp(as_of).value / NANOS_PER_DAY
+    latest = [
+        np.nanmax(_days(orders[col])) for col in
+        ['created_at', 'shipped_at', 'delivered_at', 'returned_at']
+        if col in orders.columns and orders[col].notna().any()
+    ]
+    return max(latest)
+
+def kaplan_meier(
+    durations: pd.Series,
+    observed: pd.Series,
+    groups: Optional[pd.Series] = None
+) -> pd.DataFrame:
+    """
+    Kaplan-Meier survival curves, one per group.
+
+    Subjects are counted per distinct (group, duration); the number at
+    risk at each time is the group size minus the cumulative exits before
+    it, and survival is the grouped cumulative product of 1 - events / at
+    risk.
+
+    Args:
+        durations: Time to event or censoring per subject
+        observed: True where the event happened, False where censored
+        groups: Optional group label per subject
+
+    Returns:
+        DataFrame with group, time, at_risk, events, censored and survival,
+        sorted by group and time
+    """
+    frame = pd.DataFrame({
+        'group': 'all' if groups is None else np.asarray(groups, dtype=object),
+        'time': np.asarray(durations, dtype=float),
+        'observed': np.asarray(observed, dtype=bool),
+    }).dropna(subset=['group', 'time'])
+    frame['time'] = frame['time'].clip(lower=0.0)
+
+    counts = frame.groupby(['group', 'time'], sort=True)['observed'].agg(['size', 'sum'])
+    exits = counts['size'].astype(np.int64)
+    events = counts['sum'].astype(np.int64)
+    by_group = exits.groupby(level='group', sort=False)
+    at_risk = by_group.transform('sum') - (by_group.cumsum() - exits)
+    survival = (1.0 - events / at_risk).groupby(level='group', sort=False).cumprod()
+
+    return pd.DataFrame({
+        'at_risk': at_risk,
+        'events': events,
+        'censored': exits - events,
+        'survival': survival,
+    }).reset_index()
+
+def median_survival(curves: pd.DataFrame) -> pd.Series:
+    """
+    Median time to event per group.
+
+    Args:
+        curves: Output of kaplan_meier
+
+    Returns:
+        Series indexed by group: first time survival drops to 0.5 or
+        below, NaN when it never does
+    """
+    reached = curves[curves['survival'] <= 0.5].groupby('group', sort=True)['time'].min()
+    groups = pd.Index(curves['group'].unique(), name='group').sort_values()
+    return reached.reindex(groups)
+
+def second_purchase_durations(orders: pd.DataFrame, as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Days from each customer's first purchase to their second.
+
+    Order item rows of the same order (order_id, or the same created_at
+    when there is no order_id) count as one purchase. Both purchases are
+    found with grouped minimums over int64 ticks, without sorting orders.
+    Customers without a second purchase are censored at as_of.
+
+    Args:
+        orders: Orders with customer_id and created_at; style is used for
+            the entry style when present
+        as_of: End of follow-up; defaults to the latest date in orders
+
+    Returns:
+        DataFrame indexed by customer_id with duration_days, observed,
+        cohort (first purchase month) and entry_style
+    """
+    data = orders[orders['created_at'].notna()]
+    codes, customers = pd.factorize(data['customer_id'])
+    created_at = data['created_at'].to_numpy().astype('datetime64[ns]')
+    ticks = created_at.view('int64')
+
+    first = pd.Series(ticks).groupby(codes, sort=True).idxmin().to_numpy()
+    if 'order_id' in data.columns:
+        order_ids = data['order_id'].to_numpy()
+        later = order_ids != order_ids[first][codes]
+    else:
+        later = ticks != ticks[first][codes]
+    second = pd.Series(ticks[later]).groupby(codes[later], sort=True).min()
+    second = second.reindex(np.arange(len(customers))).to_numpy()
+
+    start = ticks[first] / NANOS_PER_DAY
+    observed = ~np.isnan(second)
+    end = np.where(observed, second / NANOS_PER_DAY, _censor_day(orders, as_of))
+
+    return pd.DataFrame({
+        'duration_days': end - start,
+        'observed': observed,
+        'cohort': np.datetime_as_string(created_at[first].astype('datetime64[M]')),
+        'entry_style': data['style'].to_numpy()[first] if 'style' in data.columns else None,
+    }, index=pd.Index(customers, name='customer_id'))
+
+def return_durations(orders: pd.DataFrame, as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Days from delivery to return for every delivered order item.
+
+    Items without a return are censored at as_of.
+
+    Args:
+        orders: Orders with delivered_at and returned_at
+        as_of: End of follow-up; defaults to the latest date in orders
+
+    Returns:
+        DataFrame aligned with the delivered rows of orders, with
+        duration_days and observed plus style and category when present
+
+    Raises:
+        ValueError: If delivered_at or returned_at is missing
+    """
+    missing = {'delivered_at', 'returned_at'} - set(orders.columns)
+    if missing:
+        raise ValueError(f"Missing required columns in orders data: {missing}")
+
+    delivered = orders[orders['delivered_at'].notna()]
+    start = _days(delivered['delivered_at'])
+    end = _days(delivered['returned_at'])
+    observed = ~np.isnan(end)
+    end = np.where(observed, end, _censor_day(orders, as_of))
+
+    result = pd.DataFrame({'duration_days': end - start, 'observed': observed}, index=delivered.index)
+    for col in ['style', 'category']:
+        if col in delivered.columns:
+            result[col] = delivered[col]
+    return result
+
+def stage_dwell_durations(
+    orders: pd.DataFrame,
+    stages: pd.Series,
+    as_of: Optional[pd.Timestamp] = None
+) -> pd.DataFrame:
+    """
+    Days spent in each journey stage spell.
+
+    A spell starts at the order where a customer's stage changes and ends
+    at the next change; a customer's current spell is censored at as_of.
+
+    Args:
+        orders: Orders with customer_id and created_at, grouped by customer
+            in chronological order
+        stages: Journey stage after each of those orders, aligned by
+            position
+        as_of: End of follow-up; defaults to the latest date in orders
+
+    Returns:
+        DataFrame with customer_id, stage, duration_days and observed, one
+        row per spell
+    """
+    customers = orders['customer_id'].to_numpy()
+    stage = np.asarray(stages, dtype=object)
+    if len(stage) != len(customers):
+        raise ValueError("Stages must align with orders")
+    if len(customers) == 0:
+        return pd.DataFrame(columns=['customer_id', 'stage', 'duration_days', 'observed'])
+
+    new_customer = np.r_[True, customers[1:] != customers[:-1]]
+    starts = np.flatnonzero(new_customer | np.r_[True, stage[1:] != stage[:-1]])
+    start = _days(orders['created_at'])[starts]
+    spell_customers = customers[starts]
+
+    # A spell is closed by the next spell of the same customer
+    observed = np.r_[spell_customers[1:] == spell_customers[:-1], False]
+    end = np.r_[start[1:], np.nan]
+    end = np.where(observed, end, _censor_day(orders, as_of))
+
+    return pd.DataFrame({
+        'customer_id': spell_customers,
+        'stage': stage[starts],
+        'duration_days': end - start,
+        'observed': observed,
+    })
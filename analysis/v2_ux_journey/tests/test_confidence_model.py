@@ -0,0 +1,68 @@
+"""
+Test suite for batch confidence prediction.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+from ..core.confidence_model import customer_features, rule_confidence
+
+pytest.importorskip('sklearn')
+
+@pytest.fixture
+def mapper():
+    """Create a mapper with a year of random orders."""
+    rng = np.random.default_rng(11)
+    n = 3000
+    customers = rng.integers(0, 300, n)
+    orders = pd.DataFrame({
+        'customer_id': [f"c{i}" for i in customers],
+        'product_id': np.where(customers % 3 == 0, rng.integers(1, 4, n), 1),
+        'created_at': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24, n), unit='h'),
+        'returned': rng.random(n) < np.where(customers % 2 == 0, 0.5, 0.05),
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2, 3],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand', 'Sport Bra - Grey'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A', 'BRA003GR36DD'],
+        'category': ['Intimates', 'Lounge', 'Athletic'],
+    })
+    return JourneyMapper(orders, products)
+
+def test_rule_confidence_matches_scalar_score(mapper):
+    """Test that the vectorized score reproduces _calculate_confidence_score."""
+    scores = rule_confidence(customer_features(mapper.orders))
+    for customer_id in scores.index[:40]:
+        customer_orders = mapper.orders[mapper.orders['customer_id'] == customer_id]
+        assert scores[customer_id] == pytest.approx(mapper._calculate_confidence_score(customer_orders))
+
+def test_predict_confidence_uses_positions(mapper):
+    """Test that prefixes are taken by position, not index label."""
+    customer_orders = mapper.orders[mapper.orders['customer_id'] == 'c1'].sort_values('created_at')
+    shifted = customer_orders.set_axis(range(100, 100 + len(customer_orders)))
+    assert mapper.predict_confidence(shifted) == pytest.approx(
+        mapper.predict_confidence(customer_orders.reset_index(drop=True))
+    )
+
+def test_batch_model_and_snapshot(mapper, tmp_path):
+    """Test fitting, batch scoring and persistence with the snapshot."""
+    baseline = mapper.predict_confidence_batch(['c1', 'c2', 'nobody'])
+    assert baseline['nobody'] == 0.0
+
+    mapper.fit_confidence_model(cutoff=pd.Timestamp('2024-10-01'))
+    scores = mapper.predict_confidence_batch()
+    assert len(scores) == 300
+    assert scores.between(0, 1).all()
+    # Low-return customers should look more confident than high-return ones
+    odd = scores[[f"c{i}" for i in range(1, 300, 2)]].mean()
+    even = scores[[f"c{i}" for i in range(0, 300, 2)]].mean()
+    assert odd > even
+
+    mapper.save_snapshot(str(tmp_path))
+    loaded = JourneyMapper.load_snapshot(str(tmp_path))
+    requested = ['c5', 'c1', 'nobody']
+    pd.testing.assert_series_equal(
+        loaded.predict_confidence_batch(requested),
+        mapper.predict_confidence_batch(requested)
+    )
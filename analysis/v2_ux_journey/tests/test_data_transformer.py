@@ -0,0 +1,97 @@
+"""
+Test suite for the columnar DataTransformer.
+"""
+
+import pytest
+import pandas as pd
+from ..utils.data_transformer import DataTransformer, PRODUCT_COLUMNS, ORDER_ITEM_COLUMNS
+from ..utils.data_loader import parse_dates
+
+class TestDataTransformer:
+    @pytest.fixture
+    def raw_products(self):
+        """Create raw Shopify variant rows."""
+        return pd.DataFrame({
+            'product_id': [1, 1, 2, 3],
+            'title': [
+                'All Over Lace Lift Up Bra Bisou', 'All Over Lace Lift Up Bra Bisou',
+                'Strapless Sports Bralette', 'Everyday Wireless Bras Pack'
+            ],
+            'variant_id': [11, 12, 21, 31],
+            'sku': ['BRA030BI30A', 'BRA030BI30B', 'STR001BL32A', 'WIR001SA34B'],
+            'price': [68.0, 68.0, 55.0, 12.0],
+            'weight': [0.0, 0.0, 200.0, None],
+            'width': [0.0, 0.0, 0.0, 12.0],
+            'height': [0.0, 0.0, 0.0, 0.0],
+            'length': [0.0, 0.0, 0.0, 0.0],
+        })
+
+    def test_transform_products_schema(self, raw_products):
+        """Test output columns, defaults and derived fields."""
+        products = DataTransformer().transform_products(raw_products)
+
+        assert list(products.columns) == PRODUCT_COLUMNS
+        assert products['inventory_item_id'].tolist() == [11, 12, 21, 31]
+        assert products['cost'].iloc[0] == pytest.approx(68.0 * 0.4)
+        assert products['product_weight_g'].tolist() == [150.0, 150.0, 200.0, 150.0]
+        assert products['product_width_cm'].tolist() == [5.0, 5.0, 5.0, 12.0]
+
+    def test_category_priority(self, raw_products):
+        """Test keyword priority when a title matches several keywords."""
+        categories = DataTransformer().map_categories(raw_products['title'])
+
+        assert categories.tolist() == ['Intimates', 'Intimates', 'Intimates', 'Intimates']
+
+        custom = DataTransformer({'sports': 'Athletic', 'strapless': 'Intimates'})
+        assert custom.map_categories(raw_products['title']).iloc[2] == 'Athletic'
+
+    def test_missing_product_columns(self):
+        """Test that ValueError is raised for incomplete raw data."""
+        with pytest.raises(ValueError, match="Missing required columns"):
+            DataTransformer().transform_products(pd.DataFrame({'title': ['Bra']}))
+
+    def test_transform_order_items_dates(self):
+        """Test explicit-format date parsing with mixed inputs."""
+        items = pd.DataFrame({
+            'order_id': ['o1', 'o2'],
+            'user_id': ['u1', 'u2'],
+            'product_id': [1, 2],
+            'status': ['complete', None],
+            'created_at': ['2024-12-29 16:03:13.850219', '2024-12-30'],
+            'returned_at': [None, '2025-01-02 10:00:00.000001'],
+        })
+        transformed = DataTransformer().transform_order_items(items)
+
+        assert list(transformed.columns) == ORDER_ITEM_COLUMNS
+        assert transformed['status'].tolist() == ['complete', 'Complete']
+        assert transformed['created_at'].iloc[1] == pd.Timestamp('2024-12-30')
+        assert pd.isna(transformed['returned_at'].iloc[0])
+        assert transformed['returned_at'].iloc[1].microsecond == 1
+
+    def test_transform_order_items_keeps_missing_dates(self):
+        """Test missing purchase dates stay NaT and the transform is deterministic."""
+        items = pd.DataFrame({'order_id': ['o1'], 'created_at': [None]})
+        first = DataTransformer().transform_order_items(items)
+        second = DataTransformer().transform_order_items(items)
+
+        assert pd.isna(first['created_at'].iloc[0])
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_streamed_chunks_match_full_transform(self, raw_products, tmp_path):
+        """Test that chunked CSV output equals a single in-memory pass."""
+        source = tmp_path / 'raw.csv'
+        destination = tmp_path / 'out' / 'transformed.csv'
+        raw_products.to_csv(source, index=False)
+
+        rows = DataTransformer().transform_csv(str(source), str(destination), 'products', chunksize=1)
+        streamed = pd.read_csv(destination)
+        full = DataTransformer().transform_products(pd.read_csv(source))
+
+        assert rows == len(raw_products)
+        pd.testing.assert_frame_equal(streamed, full, check_dtype=False)
+
+def test_parse_dates_skips_missing_columns():
+    """Test that parse_dates ignores columns not present."""
+    df = pd.DataFrame({'created_at': ['2024-12-01 00:00:00.000000']})
+    parsed = parse_dates(df, ['created_at', 'shipped_at'])
+    assert pd.api.types.is_datetime64_any_dtype(parsed['created_at'])
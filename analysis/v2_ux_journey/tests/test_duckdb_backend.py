@@ -0,0 +1,127 @@
+"""
+Test suite comparing the DuckDB backend with the pandas JourneyMapper.
+"""
+
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper, JourneyStage
+
+duckdb = pytest.importorskip('duckdb')
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Write minimal Pepper exports with distinct order timestamps."""
+    orders = pd.DataFrame({
+        'id': [f'o{i}' for i in range(1, 10)],
+        'user_id': ['new', 'size', 'size', 'style', 'style', 'loyal', 'loyal', 'loyal', 'loyal'],
+        'status': ['Complete'] * 9,
+        'created_at': [
+            '2024-12-01 10:00:00.000000', '2024-12-01 11:00:00.000000',
+            '2024-12-05 11:00:00.000000', '2024-12-02 09:00:00.000000',
+            '2024-12-04 09:00:00.000000', '2024-12-01 08:00:00.000000',
+            '2024-12-08 08:00:00.000000', '2024-12-15 08:00:00.000000',
+            '2024-12-22 08:00:00.000000',
+        ],
+    })
+    items = pd.DataFrame({
+        'order_id': orders['id'],
+        'product_id': [1, 1, 1, 1, 2, 3, 3, 3, 3],
+        'returned_at': [None, '2024-12-03 00:00:00.000000'] + [None] * 7,
+    })
+    products = pd.DataFrame({
+        'id': [1, 2, 3],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand', 'Mesh Bra - Flora'],
+        'sku': ['BRA001BL34B', 'BRA002SA34B', 'BRA003FL34B'],
+        'retail_price': [68.0, 72.0, 65.0],
+        'category': ['Intimates', 'Intimates', 'Lounge'],
+    })
+    orders.to_csv(tmp_path / 'simulated_orders_20250101_000000.csv', index=False)
+    items.to_csv(tmp_path / 'transformed_order_items_20250101_000000.csv', index=False)
+    products.to_csv(tmp_path / 'transformed_bra_products_20250101_000000.csv', index=False)
+    return str(tmp_path)
+
+@pytest.fixture
+def mappers(data_dir):
+    """Build both backends over the same exports."""
+    return (
+        JourneyMapper.from_data_dir(data_dir),
+        JourneyMapper.from_data_dir(data_dir, backend='duckdb', threads=2),
+    )
+
+def test_unknown_backend(data_dir):
+    """Test that unknown backends are rejected."""
+    with pytest.raises(ValueError, match="Unknown backend"):
+        JourneyMapper.from_data_dir(data_dir, backend='spark')
+
+def test_stages_match_pandas(mappers):
+    """Test journey stages and confidence against the pandas backend."""
+    pandas_mapper, duck_mapper = mappers
+    for customer_id in ['new', 'size', 'style', 'loyal', 'missing']:
+        pandas_stage, pandas_score = pandas_mapper.determine_journey_stage(customer_id)
+        duck_stage, duck_score = duck_mapper.determine_journey_stage(customer_id)
+        assert duck_stage == pandas_stage
+        assert duck_score == pytest.approx(pandas_score)
+
+    assert duck_mapper.determine_journey_stage('missing') == (JourneyStage.FIRST_PURCHASE, 0.0)
+
+def test_confidence_progression_matches_pandas(mappers):
+    """Test running confidence scores per customer."""
+    pandas_mapper, duck_mapper = mappers
+    expected = pandas_mapper.map_confidence_progression()
+    result = duck_mapper.map_confidence_progression()
+
+    assert set(result) == set(expected)
+    for customer_id, scores in expected.items():
+        assert result[customer_id] == pytest.approx(scores)
+
+def test_entry_points_and_flow_match_pandas(mappers):
+    """Test entry point shares and category transitions."""
+    pandas_mapper, duck_mapper = mappers
+
+    assert duck_mapper.identify_entry_points() == pytest.approx(pandas_mapper.identify_entry_points())
+    assert duck_mapper.analyze_category_flow() == pandas_mapper.analyze_category_flow()
+
+def test_stage_patterns_and_cohorts(mappers):
+    """Test SQL-only stage transitions and cohort mix."""
+    _, duck_mapper = mappers
+
+    patterns = duck_mapper.analyze_journey_patterns()
+    assert patterns['FIRST_PURCHASE']['STYLE_EXPLORATION'] == pytest.approx(0.5)
+
+    cohorts = duck_mapper.analyze_cohort_journeys()
+    assert cohorts['first_time'] == {'FIRST_PURCHASE': 1.0}
+    assert sum(cohorts['occasional'].values()) == pytest.approx(1.0)
+
+def test_multi_item_orders_match_pandas(tmp_path):
+    """Test that items sharing a timestamp keep the pandas row order."""
+    orders = pd.DataFrame({
+        'id': ['o9', 'o10', 'o11'],
+        'user_id': ['multi', 'multi', 'multi'],
+        'status': ['Complete'] * 3,
+        'created_at': ['2024-12-01 10:00:00.000000'] * 2 + ['2024-12-09 10:00:00.000000'],
+    })
+    items = pd.DataFrame({
+        'order_id': ['o9', 'o9', 'o10', 'o11', 'o11'],
+        'product_id': [2, 1, 3, 3, 1],
+        'returned_at': ['2024-12-04 00:00:00.000000', None, None, None, '2024-12-12 00:00:00.000000'],
+    })
+    products = pd.DataFrame({
+        'id': [1, 2, 3],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand', 'Mesh Bra - Flora'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A', 'BRA003FL36C'],
+        'retail_price': [68.0, 72.0, 65.0],
+        'category': ['Intimates', 'Intimates', 'Lounge'],
+    })
+    orders.to_csv(tmp_path / 'simulated_orders_20250101_000000.csv', index=False)
+    items.to_csv(tmp_path / 'transformed_order_items_20250101_000000.csv', index=False)
+    products.to_csv(tmp_path / 'transformed_bra_products_20250101_000000.csv', index=False)
+    pandas_mapper = JourneyMapper.from_data_dir(str(tmp_path))
+    duck_mapper = JourneyMapper.from_data_dir(str(tmp_path), backend='duckdb', threads=2)
+
+    expected = pandas_mapper.map_confidence_progression()['multi']
+    assert duck_mapper.map_confidence_progression()['multi'] == pytest.approx(expected)
+    assert duck_mapper.identify_entry_points() == pytest.approx(pandas_mapper.identify_entry_points())
+    sequence = duck_mapper.query(
+        "SELECT name FROM order_metrics WHERE customer_id = 'multi' ORDER BY order_index"
+    )['name'].tolist()
+    assert sequence == pandas_mapper.orders['name'].tolist()
@@ -0,0 +1,72 @@
+"""
+Test suite for single-pass entry point computation.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+
+@pytest.fixture
+def mapper():
+    """Create a mapper with shuffled orders, returns and several attributes."""
+    rng = np.random.default_rng(3)
+    n = 400
+    orders = pd.DataFrame({
+        'customer_id': rng.choice([f"c{i}" for i in range(60)], n),
+        'product_id': rng.choice([1, 2, 3], n),
+        'created_at': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.permutation(n), unit='h'),
+        'returned': rng.random(n) < 0.3,
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2, 3],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand', 'Sport Bra - Grey'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A', 'BRA003GR36DD'],
+        'category': ['Intimates', 'Lounge', 'Athletic'],
+    })
+    return JourneyMapper(orders, products)
+
+def _sorted_first_purchases(mapper):
+    """Reference: the sort-and-first approach."""
+    return (
+        mapper.orders[~mapper.orders['returned']]
+        .sort_values('created_at')
+        .groupby('customer_id')
+        .first()
+    )
+
+def test_matches_sort_based_reference(mapper):
+    """Test name, style and category distributions against a global sort."""
+    reference = _sorted_first_purchases(mapper)
+    result = mapper.entry_points_by(['name', 'style', 'category'])
+
+    for attribute in ['name', 'style', 'category']:
+        expected = (reference[attribute].value_counts() / len(reference)).to_dict()
+        assert result[attribute] == pytest.approx(expected)
+    assert mapper.identify_entry_points() == pytest.approx(result['name'])
+
+def test_size_entry_points(mapper):
+    """Test that size combines band and cup of the first purchase."""
+    reference = _sorted_first_purchases(mapper)
+    sizes = (reference['band_size'] + reference['cup_size']).value_counts() / len(reference)
+    assert mapper.entry_points_by(['size'])['size'] == pytest.approx(sizes.to_dict())
+
+def test_ties_returns_and_missing_dates():
+    """Test tie-breaking, returned orders and undated orders."""
+    orders = pd.DataFrame({
+        'customer_id': ['c1', 'c1', 'c1', 'c2', 'c2'],
+        'product_id': [2, 1, 2, 1, 2],
+        'created_at': ['2024-12-01', '2024-12-02', '2024-12-02', None, '2024-12-09'],
+        'returned': [True, False, False, False, False],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'category': ['Intimates', 'Lounge'],
+    })
+    mapper = JourneyMapper(orders, products)
+
+    assert mapper.identify_entry_points() == {'Classic Bra - Black': 0.5, 'Lace Bra - Sand': 0.5}
+    with pytest.raises(ValueError):
+        mapper.entry_points_by(['colour'])
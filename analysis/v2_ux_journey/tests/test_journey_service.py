@@ -0,0 +1,136 @@
+"""
+Test suite for the asyncio journey service.
+"""
+
+import asyncio
+import json
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+from ..core.journey_service import JourneyService, LatencyHistogram, MicroBatcher
+
+@pytest.fixture
+def mapper():
+    """Create a prepared mapper."""
+    orders = pd.DataFrame({
+        'customer_id': ['c1', 'c2', 'c1', 'c3'],
+        'product_id': [1, 1, 2, 2],
+        'created_at': ['2024-12-01', '2024-12-02', '2024-12-05', '2024-12-03'],
+        'returned': [False, False, False, True],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'category': ['Intimates', 'Lounge'],
+    })
+    return JourneyMapper(orders, products)
+
+async def _get(port, targets):
+    """Send GET requests over one keep-alive connection."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    responses = []
+    for target in targets:
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while (line := await reader.readline()) != b'\r\n':
+            name, _, value = line.decode().partition(':')
+            headers[name.lower()] = value.strip()
+        body = await reader.readexactly(int(headers['content-length']))
+        responses.append((status, json.loads(body)))
+    writer.close()
+    return responses
+
+def test_service_routes(mapper):
+    """Test point lookups, reports, errors and metrics over HTTP."""
+    expected_stage, expected_confidence = mapper.determine_journey_stage('c1')
+    c1_orders = mapper.orders[mapper.orders['customer_id'] == 'c1'].sort_values('created_at')
+
+    async def run():
+        service = JourneyService(mapper)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await _get(port, [
+                '/stage?customer_id=c1',
+                '/recommendations?customer_id=unknown',
+                '/confidence?customer_id=c1',
+                '/reports/entry_points',
+                '/stage',
+                '/nope',
+                '/metrics',
+            ])
+        finally:
+            await service.close()
+
+    stage, recs, confidence, entry_points, missing, unknown, metrics = asyncio.run(run())
+    assert stage == (200, {'customer_id': 'c1', 'stage': expected_stage.value, 'confidence': expected_confidence})
+    assert recs[1]['recommendations'] == mapper.generate_recommendations('unknown')
+    assert confidence[1]['predicted_confidence'] == pytest.approx(
+        mapper.predict_confidence(c1_orders.reset_index(drop=True))
+    )
+    assert entry_points == (200, mapper.identify_entry_points())
+    assert missing[0] == 400 and unknown[0] == 404
+    assert metrics[1]['latency']['stage']['count'] == 2
+
+def test_confidence_memo_is_bounded(mapper):
+    """Test that unknown ids are not memoized and known ids are LRU-bounded."""
+    service = JourneyService(mapper, max_predictions=2)
+    try:
+        results = service._resolve_confidence(['x1', 'x2', 'c1', 'c2', 'c3', 'c1'])
+        predictions = service._state.predictions
+
+        assert [r['predicted_confidence'] for r in results[:2]] == [0.0, 0.0]
+        assert results[2] == results[5]
+        assert set(predictions._memory) == {'c3', 'c1'}
+
+        view = service.view
+        service.load(mapper, version='v2')
+        assert service.view is not view
+        assert service._state.view.version == 'v2'
+        assert len(service._state.predictions._memory) == 0
+    finally:
+        service.executor.shutdown(wait=False)
+
+def test_micro_batcher_groups_concurrent_lookups():
+    """Test that lookups submitted together resolve in one batch."""
+    calls = []
+
+    def resolve(keys):
+        calls.append(list(keys))
+        return [key * 2 for key in keys]
+
+    async def run():
+        batcher = MicroBatcher(resolve, window=0.01)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+def test_latency_histogram_quantiles():
+    """Test bucketed quantile bounds."""
+    hist = LatencyHistogram()
+    for ms in [0.05] * 98 + [3, 3000]:
+        hist.record(ms / 1000)
+    assert hist.quantile(0.5) == 0.1
+    assert hist.quantile(0.99) == 5
+    assert hist.quantile(1.0) == float('inf')
+
+def test_snapshot_offsets_are_reused(mapper, tmp_path):
+    """Test that a snapshot mapper is served without re-sorting its orders."""
+    mapper.save_snapshot(str(tmp_path))
+    loaded = JourneyMapper.load_snapshot(str(tmp_path))
+    c1_orders = mapper.orders[mapper.orders['customer_id'] == 'c1'].sort_values('created_at')
+    service = JourneyService(loaded)
+    try:
+        state = service._state
+        assert state.orders is loaded.orders
+        assert state.offsets is loaded.customer_offsets
+        assert service._resolve_confidence(['c1'])[0]['predicted_confidence'] == pytest.approx(
+            mapper.predict_confidence(c1_orders.reset_index(drop=True))
+        )
+        assert service.view.stage('c1') == mapper.determine_journey_stage('c1')
+    finally:
+        service.executor.shutdown(wait=False)
@@ -0,0 +1,79 @@
+"""
+Test suite for immutable journey views.
+"""
+
+import threading
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper, JourneyStage
+from ..core.journey_view import JourneyView, JourneyViewHolder
+
+@pytest.fixture
+def mapper():
+    """Create a prepared mapper with customers at different stages."""
+    orders = pd.DataFrame({
+        'customer_id': ['c1', 'c1', 'c2', 'c3', 'c3'],
+        'product_id': [1, 2, 1, 2, 2],
+        'created_at': ['2024-12-01', '2024-12-05', '2024-12-02', '2024-12-03', '2024-12-04'],
+        'returned': [False, False, False, True, False],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'category': ['Intimates', 'Lounge'],
+    })
+    return JourneyMapper(orders, products)
+
+def test_view_matches_mapper(mapper):
+    """Test that precomputed lookups match the mapper's answers."""
+    view = JourneyView.from_mapper(mapper, version='v1')
+
+    assert len(view) == 3
+    for customer_id in ['c1', 'c2', 'c3', 'unknown']:
+        assert view.stage(customer_id) == mapper.determine_journey_stage(customer_id)
+        assert list(view.recommendations(customer_id)) == mapper.generate_recommendations(customer_id)
+    assert dict(view.entry_points) == mapper.identify_entry_points()
+    assert sum(view.stage_distribution.values()) == pytest.approx(1.0)
+
+def test_view_is_immutable(mapper):
+    """Test that a view cannot be modified after it is built."""
+    view = JourneyView.from_mapper(mapper)
+
+    with pytest.raises(AttributeError):
+        view.version = 'v2'
+    with pytest.raises(TypeError):
+        view.entry_points['Classic Bra - Black'] = 1.0
+    with pytest.raises(Exception):
+        view.journey('c1').confidence = 1.0
+
+def test_holder_swaps_views(mapper):
+    """Test publishing, failed refreshes and reads during refreshes."""
+    holder = JourneyViewHolder(JourneyView.from_mapper(mapper, version='v1'))
+
+    def failing_build():
+        raise RuntimeError("source unavailable")
+
+    assert not holder.refresh(failing_build)
+    assert holder.view.version == 'v1'
+
+    seen = set()
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            view = holder.view
+            seen.add(view.version)
+            assert view.stage('c2')[0] == JourneyStage.FIRST_PURCHASE
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(2, 6):
+        assert holder.refresh(lambda: JourneyView.from_mapper(mapper, version=f'v{i}'))
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert holder.view.version == 'v5'
+    assert seen <= {'v1', 'v2', 'v3', 'v4', 'v5'}
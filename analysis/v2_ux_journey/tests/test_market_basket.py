@@ -0,0 +1,90 @@
+"""
+Test suite for the MarketBasketAnalyzer.
+"""
+
+import pytest
+import pandas as pd
+from ..core.market_basket import MarketBasketAnalyzer
+
+@pytest.fixture
+def order_items():
+    """Create order items for five multi-item orders."""
+    baskets = {
+        'o1': ['bra', 'thong', 'extender'],
+        'o2': ['bra', 'thong'],
+        'o3': ['bra', 'thong', 'robe'],
+        'o4': ['bra', 'extender'],
+        'o5': ['robe'],
+    }
+    rows = [(order, item) for order, items in baskets.items() for item in items]
+    # Duplicate line item should not double-count the basket
+    rows.append(('o2', 'thong'))
+    return pd.DataFrame(rows, columns=['order_id', 'product_id'])
+
+def test_invalid_input():
+    """Test validation of the order items frame."""
+    with pytest.raises(ValueError, match="must be a DataFrame"):
+        MarketBasketAnalyzer([])
+    with pytest.raises(ValueError, match="Missing required columns"):
+        MarketBasketAnalyzer(pd.DataFrame({'order_id': ['o1']}))
+
+def test_pair_metrics(order_items):
+    """Test sparse pair support, confidence and lift."""
+    analyzer = MarketBasketAnalyzer(order_items)
+    pairs = analyzer.pair_metrics(block_size=2)
+
+    bra_thong = pairs[
+        pairs[['item_a', 'item_b']].apply(set, axis=1) == {'bra', 'thong'}
+    ].iloc[0]
+    assert bra_thong['count'] == 3
+    assert bra_thong['support'] == pytest.approx(3 / 5)
+    assert bra_thong['lift'] == pytest.approx((3 / 5) / ((4 / 5) * (3 / 5)))
+    assert pairs['lift'].is_monotonic_decreasing
+
+def test_frequent_itemsets_match_brute_force(order_items):
+    """Test FP-growth against exhaustive counting."""
+    analyzer = MarketBasketAnalyzer(order_items)
+    itemsets = analyzer.frequent_itemsets(min_support=0.4)
+    found = {frozenset(i): c for i, c in zip(itemsets['itemset'], itemsets['count'])}
+
+    baskets = order_items.groupby('order_id')['product_id'].apply(set)
+    assert found[frozenset({'bra', 'thong'})] == 3
+    assert found[frozenset({'bra', 'extender'})] == 2
+    for itemset, count in found.items():
+        assert count == sum(itemset <= basket for basket in baskets)
+    assert frozenset({'bra', 'thong', 'extender'}) not in found
+
+def test_identical_baskets_are_weighted(order_items):
+    """Test that repeated baskets collapse into one weighted transaction."""
+    repeated = pd.concat(
+        [order_items, order_items.assign(order_id=order_items['order_id'] + 'b')],
+        ignore_index=True
+    )
+    analyzer = MarketBasketAnalyzer(repeated)
+    transactions = analyzer._weighted_baskets(min_count=1)
+
+    assert len(transactions) == 5
+    assert all(weight == 2 for _, weight in transactions)
+    itemsets = analyzer.frequent_itemsets(min_support=0.4)
+    assert dict(zip(itemsets['itemset'].map(frozenset), itemsets['count']))[frozenset({'bra', 'thong'})] == 6
+
+def test_association_rules_ranked_and_queryable(order_items):
+    """Test rule generation thresholds and querying."""
+    analyzer = MarketBasketAnalyzer(order_items)
+    rules = analyzer.association_rules(min_support=0.4, min_confidence=0.5)
+
+    assert rules['lift'].is_monotonic_decreasing
+    assert (rules['confidence'] >= 0.5).all()
+
+    from_thong = MarketBasketAnalyzer.query_rules(rules, antecedent='thong')
+    assert (from_thong['consequent'] == ('bra',)).any()
+    assert from_thong.iloc[0]['confidence'] == pytest.approx(1.0)
+
+def test_from_csv(order_items, tmp_path):
+    """Test building from a CSV with extra columns."""
+    path = tmp_path / 'items.csv'
+    order_items.assign(sale_price=10.0).to_csv(path, index=False)
+
+    analyzer = MarketBasketAnalyzer.from_csv(str(path))
+    assert analyzer.n_baskets == 5
+    assert analyzer.baskets.nnz == len(order_items) - 1
@@ -0,0 +1,108 @@
+"""
+Test suite for frequent journey path mining.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+from ..core.path_mining import PathTrie, encode_sequences, stage_sequences
+
+@pytest.fixture
+def sequences():
+    """Create per-customer style sequences, grouped by customer."""
+    journeys = {
+        'c1': ['Lace', 'Wireless', 'Strapless'],
+        'c2': ['Lace', 'Wireless', 'Strapless', 'Lace', 'Wireless'],
+        'c3': ['Wireless', 'Strapless'],
+        'c4': ['Lace', 'Lace', 'Wireless'],
+        'c5': ['Sports'],
+    }
+    rows = [(c, s) for c, steps in journeys.items() for s in steps]
+    return pd.DataFrame(rows, columns=['customer_id', 'style'])
+
+def test_encode_collapses_repeats(sequences):
+    """Test flat encoding and collapsing of repeated steps."""
+    codes, offsets, vocabulary = encode_sequences(sequences['customer_id'], sequences['style'])
+    assert offsets.tolist() == [0, 3, 8, 10, 12, 13]
+    assert list(vocabulary[codes[offsets[3]:offsets[4]]]) == ['Lace', 'Wireless']
+
+def test_support_counts_customers_once(sequences):
+    """Test contiguous path support, pruning and top-k ordering."""
+    trie = PathTrie(*encode_sequences(sequences['customer_id'], sequences['style']), min_support=0.4)
+
+    assert trie.support_of(['Lace', 'Wireless']) == 3
+    assert trie.support_of(['Lace', 'Wireless', 'Strapless']) == 2
+    assert trie.support_of(['Wireless', 'Strapless']) == 3
+    assert trie.support_of(['Sports']) == 0  # below min support
+    assert trie.support_of(['Strapless', 'Lace']) == 0
+
+    top = trie.top_paths(k=3)
+    assert top['support'].tolist() == [3, 3, 2]
+    assert top['path'].iloc[2] == ('Lace', 'Wireless', 'Strapless')
+    assert trie.next_steps(['Lace', 'Wireless']) == {'Strapless': pytest.approx(2 / 3)}
+
+def test_anchored_and_depth_limit(sequences):
+    """Test journeys counted from the first step only, up to max_depth."""
+    trie = PathTrie(
+        *encode_sequences(sequences['customer_id'], sequences['style']),
+        min_support=0.0, max_depth=2, anchored=True
+    )
+    assert trie.support_of(['Lace', 'Wireless']) == 3
+    assert trie.support_of(['Wireless', 'Strapless']) == 1
+    assert trie.top_paths(k=10)['length'].max() == 2
+    assert trie.top_paths(k=10, prefix=['Wireless'])['path'].tolist() == [('Wireless', 'Strapless')]
+
+def test_mapper_stage_and_category_paths():
+    """Test mining from a mapper's orders and stage progressions."""
+    orders = pd.DataFrame({
+        'customer_id': ['c1', 'c1', 'c1', 'c2', 'c2'],
+        'product_id': [1, 2, 1, 1, 2],
+        'created_at': ['2024-12-01', '2024-12-05', '2024-12-09', '2024-12-02', '2024-12-03'],
+        'returned': [False, True, False, False, False],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'category': ['Intimates', 'Lounge'],
+    })
+    mapper = JourneyMapper(orders, products)
+
+    categories = mapper.mine_paths('category', min_support=0.0)
+    assert categories.support_of(['Intimates', 'Lounge']) == 2
+    assert categories.support_of(['Lounge', 'Intimates']) == 1
+
+    stages = mapper.mine_paths('stage', min_support=0.0, anchored=True)
+    assert stages.support_of(['First Purchase', 'Size Exploration']) == 1
+    with pytest.raises(ValueError):
+        mapper.mine_paths('colour')
+
+def test_stage_sequences_match_prefix_evaluation():
+    """Test vectorized stages against the mapper's stage logic on every prefix."""
+    rng = np.random.default_rng(3)
+    n = 300
+    orders = pd.DataFrame({
+        'customer_id': rng.choice([f'c{i}' for i in range(40)], n),
+        'product_id': rng.integers(1, 5, n),
+        'created_at': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 400, n), unit='D'),
+        'returned': rng.random(n) < 0.25,
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2, 3, 4],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand', 'Classic Bra - Nude', 'Mesh Bra - Flora'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A', 'BRA001NU34B', 'BRA003FL34B'],
+        'category': ['Intimates', 'Lounge', 'Intimates', 'Intimates'],
+    })
+    mapper = JourneyMapper(orders, products)
+
+    expected = []
+    ordered = mapper.orders.sort_values(['customer_id', 'created_at'], kind='stable')
+    for customer_id, customer_orders in ordered.groupby('customer_id', sort=False):
+        for i in range(min(len(customer_orders), 4)):
+            stage, _ = mapper._stage_for_orders(customer_orders.iloc[:i + 1])
+            expected.append((customer_id, stage.value))
+
+    found = stage_sequences(mapper, max_steps=4)
+    assert list(found.itertuples(index=False, name=None)) == expected
+    assert len(stage_sequences(mapper)) == n
@@ -0,0 +1,71 @@
+"""
+Test suite for queue-based pipeline logging.
+"""
+
+import json
+import logging
+
+import pytest
+from ..utils.pipeline_logger import (
+    log_request, read_log, setup_logging, shutdown_logging, throughput_stats
+)
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Log file path; listeners are stopped after each test."""
+    yield tmp_path / 'logs' / 'pipeline.log'
+    shutdown_logging()
+
+def test_setup_is_idempotent(log_file):
+    """Test repeated setup does not duplicate handlers."""
+    logger = setup_logging('test.idempotent', str(log_file), console=False)
+    again = setup_logging('test.idempotent', str(log_file), console=False)
+    assert again is logger
+    assert len(logger.handlers) == 1
+    assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+
+    logger.info('hello')
+    shutdown_logging('test.idempotent')
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['message'] == 'hello'
+
+def test_structured_fields_and_rotation(log_file):
+    """Test JSON fields survive rotation and compression."""
+    logger = setup_logging('test.rotation', str(log_file), console=False, max_bytes=2000, backup_count=50)
+    for i in range(40):
+        log_request(logger, f"https://example.com/products/{i}", latency_ms=10.0 + i, bytes_received=1000, status=200)
+    shutdown_logging('test.rotation')
+
+    assert list(log_file.parent.glob('pipeline.log.*.gz'))
+    records = read_log(str(log_file))
+    assert len(records) == 40
+    assert records['url'].iloc[-1].endswith('/39')
+    assert records['bytes'].sum() == 40000
+
+def test_throughput_stats(log_file):
+    """Test aggregation of latency and bytes into throughput."""
+    logger = setup_logging('test.stats', str(log_file), console=False)
+    for latency in range(1, 101):
+        log_request(logger, '/page', latency_ms=float(latency), bytes_received=500, status=200)
+    logger.info('done')  # records without latency are ignored
+    shutdown_logging('test.stats')
+
+    stats = throughput_stats(str(log_file))
+    row = stats.loc['request']
+    assert row['requests'] == 100
+    assert row['bytes'] == 50000
+    assert row['latency_p50'] == pytest.approx(50.5)
+    assert row['latency_p95'] == pytest.approx(95.05)
+
+def test_throughput_stats_without_bytes(log_file):
+    """Test timing-only records aggregate with zero bytes."""
+    logger = setup_logging('test.timing', str(log_file), console=False)
+    for latency in [10.0, 20.0, 30.0]:
+        logger.info('step', extra={'event': 'step', 'latency_ms': latency})
+    shutdown_logging('test.timing')
+
+    row = throughput_stats(str(log_file)).loc['step']
+    assert row['requests'] == 3
+    assert row['bytes'] == 0
+    assert row['latency_p50'] == pytest.approx(20.0)
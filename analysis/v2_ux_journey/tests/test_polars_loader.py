@@ -0,0 +1,112 @@
+"""
+Test suite for the Polars lazy loading backend.
+"""
+
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+from ..utils.data_loader import load_pepper_data
+
+pl = pytest.importorskip('polars')
+from ..utils.polars_loader import scan_pepper_data, prepare_journey_frame, entry_point_shares
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Write minimal Pepper exports, including an order without items."""
+    pd.DataFrame({
+        'id': ['o1', 'o2', 'o3', 'o4'],
+        'user_id': ['c1', 'c1', 'c2', 'c3'],
+        'status': ['Complete', 'Shipped', 'Complete', 'Pending'],
+        'created_at': [
+            '2024-12-01 10:00:00.000000', '2024-12-05 10:00:00.000000',
+            '2024-12-02 10:00:00', '2024-12-03 10:00:00.500000',
+        ],
+        'total_amount': [76.19, 80.0, 70.0, 0.0],
+    }).to_csv(tmp_path / 'simulated_orders_20250101_000000.csv', index=False)
+    pd.DataFrame({
+        'order_id': ['o1', 'o2', 'o3'],
+        'product_id': [1, 2, 1],
+        'returned_at': [None, '2024-12-09 00:00:00.000000', None],
+    }).to_csv(tmp_path / 'transformed_order_items_20250101_000000.csv', index=False)
+    pd.DataFrame({
+        'id': [1, 1, 2],
+        'name': ['Classic Bra - Black', 'Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA001BL36C', 'BRA002SA34B'],
+        'retail_price': [68.0, 68.0, 72.0],
+        'category': ['Intimates'] * 3,
+    }).to_csv(tmp_path / 'transformed_bra_products_20250101_000000.csv', index=False)
+    return str(tmp_path)
+
+def test_polars_load_matches_pandas(data_dir):
+    """Test the conversion shim returns the pandas loader's frames."""
+    expected_orders, expected_products = load_pepper_data(data_dir)
+    orders, products = load_pepper_data(data_dir, backend='polars')
+
+    key = ['id', 'product_id']
+    pd.testing.assert_frame_equal(
+        orders.sort_values(key).reset_index(drop=True),
+        expected_orders.sort_values(key).reset_index(drop=True),
+        check_dtype=False
+    )
+    pd.testing.assert_frame_equal(products, expected_products, check_dtype=False)
+
+def test_unknown_loader_backend(data_dir):
+    """Test that unknown loader backends are rejected."""
+    with pytest.raises(ValueError, match="Unknown backend"):
+        load_pepper_data(data_dir, backend='spark')
+
+def test_since_filter_is_pushed_into_plan(data_dir):
+    """Test predicate filtering and column validation on the lazy plan."""
+    orders, _ = scan_pepper_data(data_dir, since='2024-12-02')
+    assert sorted(orders.select('id').collect()['id'].to_list()) == ['o2', 'o3', 'o4']
+
+def test_entry_points_match_mapper(data_dir):
+    """Test lazy entry point shares against JourneyMapper."""
+    orders, products = scan_pepper_data(data_dir)
+    shares = entry_point_shares(prepare_journey_frame(orders, products))
+
+    mapper = JourneyMapper.from_data_dir(data_dir, backend='polars')
+    assert shares == pytest.approx(mapper.identify_entry_points())
+
+def test_from_data_dir_routes_options(data_dir):
+    """Test that mapper and loader options reach the right constructor."""
+    from ..core.result_cache import ResultCache
+
+    cache = ResultCache()
+    mapper = JourneyMapper.from_data_dir(data_dir, backend='polars', cache=cache)
+    assert mapper.cache is cache
+    with pytest.raises(ValueError, match="Unknown options"):
+        JourneyMapper.from_data_dir(data_dir, threads=2)
+
+def test_polars_mapper_matches_pandas(data_dir):
+    """Test that lazily prepared frames equal the pandas preparation."""
+    expected = JourneyMapper.from_data_dir(data_dir)
+    mapper = JourneyMapper.from_data_dir(data_dir, backend='polars')
+
+    pd.testing.assert_frame_equal(mapper.orders, expected.orders, check_dtype=False, check_like=True)
+    pd.testing.assert_frame_equal(mapper.products, expected.products, check_dtype=False)
+
+def test_variant_attributes_join_lazily(data_dir, tmp_path):
+    """Test variant-level sizes, ambiguous product sizes and name clashes."""
+    orders_file = next(tmp_path.glob('simulated_orders_*.csv'))
+    items_file = next(tmp_path.glob('transformed_order_items_*.csv'))
+    products_file = next(tmp_path.glob('transformed_bra_products_*.csv'))
+    pd.read_csv(orders_file).assign(category='web').to_csv(orders_file, index=False)
+    items = pd.read_csv(items_file)
+    items.assign(inventory_item_id=[11, 99, None]).to_csv(items_file, index=False)
+    products = pd.read_csv(products_file)
+    products.assign(
+        sku=['BRA0134BBL1', 'BRA0136CCL1', 'BRA0234BSA1'], inventory_item_id=[10, 11, 20]
+    ).to_csv(products_file, index=False)
+
+    orders, products = scan_pepper_data(data_dir)
+    journey = prepare_journey_frame(orders, products).collect().sort('id')
+    # o1 names variant 11; o2 names an unknown variant of a one-size product;
+    # o3 names no variant of a product sold in two sizes
+    assert journey['band_size'].to_list()[:3] == ['36', '34', None]
+    assert journey['category'].unique().to_list() == ['web']
+    assert journey['category_product'].to_list()[:3] == ['Intimates'] * 3
+
+    expected = JourneyMapper.from_data_dir(data_dir)
+    mapper = JourneyMapper.from_data_dir(data_dir, backend='polars')
+    pd.testing.assert_frame_equal(mapper.orders, expected.orders, check_dtype=False, check_like=True)
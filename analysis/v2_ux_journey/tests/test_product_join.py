@@ -0,0 +1,82 @@
+"""
+Test suite for the variant-aware product join in JourneyMapper.
+"""
+
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper, join_fanout_factor
+
+@pytest.fixture
+def variant_products():
+    """Create products with one row per size variant."""
+    return pd.DataFrame({
+        'product_id': [10, 10, 10, 20],
+        'inventory_item_id': [101, 102, 103, 201],
+        'name': ['Lace Bra - Sand'] * 3 + ['Mesh Bra - Flora'],
+        'sku': ['BRA001SA32A', 'BRA001SA34B', 'BRA001SA36C', 'BRA002FL34B'],
+        'size': ['32A', '34B', '36C', '34B'],
+        'category': ['Intimates'] * 4,
+    })
+
+@pytest.fixture
+def variant_orders():
+    """Create orders, some resolved to a variant and some not."""
+    return pd.DataFrame({
+        'order_id': ['o1', 'o2', 'o3', 'o4'],
+        'customer_id': ['c1', 'c1', 'c2', 'c3'],
+        'product_id': [10, 10, 20, 10],
+        'inventory_item_id': [102, 103, None, None],
+        'created_at': ['2024-12-01', '2024-12-05', '2024-12-02', '2024-12-03'],
+        'returned': [False, False, False, False],
+    })
+
+def test_join_fanout_factor(variant_orders, variant_products):
+    """Test the multiplication factor a naive product_id join would have."""
+    factor = join_fanout_factor(variant_orders['product_id'], variant_products['product_id'])
+    assert factor == pytest.approx((3 + 3 + 1 + 3) / 4)
+    assert join_fanout_factor(pd.Series([], dtype=int), variant_products['product_id']) == 1.0
+
+def test_variant_join_keeps_one_row_per_order(variant_orders, variant_products):
+    """Test that orders are not multiplied by the variant count."""
+    mapper = JourneyMapper(variant_orders, variant_products)
+
+    assert len(mapper.orders) == len(variant_orders)
+    assert mapper.orders['size'].tolist()[:2] == ['34B', '36C']
+
+def test_product_fallback_drops_ambiguous_sizes(variant_orders, variant_products):
+    """Test that product-level fallback only keeps unambiguous sizes."""
+    mapper = JourneyMapper(variant_orders, variant_products)
+
+    # Product 20 has a single variant; product 10 has three sizes
+    assert mapper.orders.loc[2, 'size'] == '34B'
+    assert pd.isna(mapper.orders.loc[3, 'size'])
+    assert mapper.orders.loc[3, 'name'] == 'Lace Bra - Sand'
+
+def test_join_without_variant_ids(variant_orders, variant_products):
+    """Test product-level joining when orders have no variant key."""
+    orders = variant_orders.drop(columns='inventory_item_id')
+    mapper = JourneyMapper(orders, variant_products)
+
+    assert len(mapper.orders) == len(orders)
+    assert mapper.orders['category'].eq('Intimates').all()
+
+def test_product_fallback_warns_on_fanout(variant_orders, variant_products, caplog):
+    """Test that duplicate product_ids behind unresolved orders are reported."""
+    with caplog.at_level('WARNING', logger='analysis.v2_ux_journey.core.journey_mapping'):
+        mapper = JourneyMapper(variant_orders, variant_products)
+    assert len(mapper.orders) == len(variant_orders)
+    assert 'fan-out factor 2.00' in caplog.text
+
+    caplog.clear()
+    resolved = variant_orders.iloc[:3].assign(inventory_item_id=[102, 103, 201])
+    with caplog.at_level('WARNING', logger='analysis.v2_ux_journey.core.journey_mapping'):
+        JourneyMapper(resolved, variant_products)
+    assert 'fan-out' not in caplog.text
+
+def test_join_keeps_order_columns(variant_orders, variant_products):
+    """Test that attributes already on the orders are not overwritten."""
+    orders = variant_orders.assign(category='Sale').set_index('order_id')
+    mapper = JourneyMapper(orders, variant_products)
+
+    assert mapper.orders['category'].eq('Sale').all()
+    assert mapper.orders['category_product'].eq('Intimates').all()
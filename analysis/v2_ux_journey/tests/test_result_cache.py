@@ -0,0 +1,106 @@
+"""
+Test suite for the analysis result cache.
+"""
+
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+from ..core.result_cache import CACHE_VERSION, ResultCache, frame_fingerprint, make_key
+
+@pytest.fixture
+def journey_data():
+    """Create orders and products usable by JourneyMapper."""
+    orders = pd.DataFrame({
+        'customer_id': ['c1', 'c1', 'c2', 'c3'],
+        'product_id': [1, 2, 1, 2],
+        'created_at': ['2024-12-01', '2024-12-05', '2024-12-02', '2024-12-03'],
+        'returned': [False, False, False, True],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'category': ['Intimates', 'Lounge'],
+    })
+    return orders, products
+
+def test_fingerprint_tracks_content():
+    """Test that fingerprints change with values, columns and dtypes."""
+    df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+    assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+    assert frame_fingerprint(df) != frame_fingerprint(df.assign(a=[1, 3]))
+    assert frame_fingerprint(df) != frame_fingerprint(df.rename(columns={'b': 'c'}))
+    assert frame_fingerprint(df) != frame_fingerprint(df.astype({'a': float}))
+    assert frame_fingerprint(pd.DataFrame({'a': [[1], [2]]})) != frame_fingerprint(pd.DataFrame({'a': [[1], [3]]}))
+
+def test_mapper_hits_and_misses(journey_data):
+    """Test memoization and misses on data or threshold changes."""
+    orders, products = journey_data
+    cache = ResultCache()
+    mapper = JourneyMapper(orders, products, cache=cache)
+
+    first = mapper.identify_entry_points()
+    assert mapper.identify_entry_points() == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    mapper.orders.loc[0, 'returned'] = True
+    assert mapper.identify_entry_points() != first
+    assert cache.misses == 2
+
+    mapper.STYLE_THRESHOLD = 3
+    mapper.identify_entry_points()
+    assert cache.misses == 3
+
+def test_cached_results_are_isolated(journey_data):
+    """Test that mutating a returned result does not corrupt the cache."""
+    orders, products = journey_data
+    mapper = JourneyMapper(orders, products, cache=ResultCache())
+
+    result = mapper.map_confidence_progression()
+    result['c1'].append(99.0)
+    assert 99.0 not in mapper.map_confidence_progression()['c1']
+
+def test_disk_tier_persists_and_evicts(tmp_path):
+    """Test on-disk reuse across instances, eviction and invalidation."""
+    cache = ResultCache(max_items=1, cache_dir=str(tmp_path), max_disk_bytes=10_000)
+    key = make_key('analysis', ['abc'], {'threshold': 2})
+    cache.put(key, {'Lace': 0.5})
+
+    reopened = ResultCache(cache_dir=str(tmp_path))
+    assert reopened.get(key) == {'Lace': 0.5}
+
+    for i in range(20):
+        cache.put(f'big{i}', 'x' * 2_000)
+    assert sum(p.stat().st_size for p in tmp_path.glob('*.pkl')) <= 10_000
+    assert reopened.get('big19') is not None
+
+    cache.invalidate('big19')
+    assert ResultCache(cache_dir=str(tmp_path)).get('big19') is None
+    cache.invalidate()
+    assert list(tmp_path.glob('*.pkl')) == []
+
+def test_key_version_retires_entries(tmp_path):
+    """Test that a new logic version does not serve old disk entries."""
+    cache = ResultCache(cache_dir=str(tmp_path))
+    old_key = make_key('analysis', ['abc'], (), version=1)
+    cache.put(old_key, 'stale')
+
+    new_key = make_key('analysis', ['abc'], (), version=2)
+    assert new_key != old_key
+    assert ResultCache(cache_dir=str(tmp_path)).get(new_key) is None
+    assert make_key('analysis', ['abc'], ()) == make_key('analysis', ['abc'], (), version=CACHE_VERSION)
+
+def test_concurrent_access(tmp_path):
+    """Test that threads sharing a cache keep the LRU consistent."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = ResultCache(max_items=8, cache_dir=str(tmp_path))
+
+    def work(i):
+        cache.put(f'k{i % 16}', i)
+        return cache.get(f'k{(i + 1) % 16}')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(400)))
+    assert len(cache._memory) == 8
+    assert cache.hits + cache.misses == 400
@@ -0,0 +1,124 @@
+"""
+Test suite for attaching ReturnTracker records to journey data.
+"""
+
+import sqlite3
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper, JourneyStage
+from ..utils.data_loader import RETURN_COLUMNS, load_return_records, attach_returns
+
+@pytest.fixture
+def returns_db(tmp_path):
+    """Create a ReturnTracker database with a few returns."""
+    db_path = tmp_path / 'returns.db'
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE return_tracking (
+            return_id TEXT PRIMARY KEY, order_id TEXT, product_id TEXT,
+            user_id TEXT, original_order_date DATE, return_initiated_date DATE,
+            return_received_date DATE, return_reason TEXT, size_returned TEXT,
+            condition_rating INTEGER, refund_amount REAL,
+            exchange_requested INTEGER, new_size_requested TEXT, notes TEXT,
+            status TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO return_tracking (return_id, order_id, product_id, user_id, "
+        "return_received_date, return_reason, size_returned, exchange_requested, "
+        "new_size_requested) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            ('r1', 'o2', '1', 'c1', '2024-12-05', 'too_small', '34B', 1, '34C'),
+            ('r2', 'o4', '2', 'c2', '2024-12-06', 'style', '32A', 0, None),
+            ('r3', 'o4', '2', 'c2', '2024-12-09', 'style', '32A', 1, '32A'),
+        ]
+    )
+    conn.commit()
+    conn.close()
+    return str(db_path)
+
+@pytest.fixture
+def journey_data():
+    """Create orders and products usable by JourneyMapper."""
+    orders = pd.DataFrame({
+        'order_id': ['o1', 'o2', 'o3', 'o4'],
+        'customer_id': ['c1', 'c1', 'c1', 'c2'],
+        'product_id': [1, 1, 1, 2],
+        'created_at': ['2024-12-01', '2024-12-02', '2024-12-10', '2024-12-03'],
+        'returned': [False, False, False, False],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic All You Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'size': ['34B', '32A'],
+        'category': ['Intimates', 'Intimates'],
+    })
+    return orders, products
+
+def test_load_return_records_keeps_latest(returns_db):
+    """Test that duplicate keys resolve to the latest received return."""
+    returns = load_return_records(returns_db)
+
+    assert len(returns) == 2
+    latest = returns[returns['order_id'] == 'o4'].iloc[0]
+    assert bool(latest['exchange_requested'])
+    assert latest['return_received_date'] == pd.Timestamp('2024-12-09')
+
+def test_load_return_records_missing_db(tmp_path):
+    """Test that a missing database raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        load_return_records(str(tmp_path / 'missing.db'))
+
+def test_attach_returns_flags_size_swaps(returns_db, journey_data):
+    """Test key matching across int/str product IDs and swap detection."""
+    orders, _ = journey_data
+    attached = attach_returns(orders, load_return_records(returns_db))
+
+    assert attached['has_return_record'].tolist() == [False, True, False, True]
+    assert attached['size_swap'].tolist() == [False, True, False, False]
+    assert attached.loc[1, 'return_reason'] == 'too_small'
+    assert len(attached) == len(orders)
+
+def test_mapper_uses_return_records(returns_db, journey_data):
+    """Test that attached returns drive stage and swap summaries."""
+    orders, products = journey_data
+    mapper = JourneyMapper(orders, products)
+    mapper.attach_return_records(load_return_records(returns_db))
+
+    assert mapper.orders['returned'].sum() == 2
+    stage, _ = mapper.determine_journey_stage('c2')
+    assert stage == JourneyStage.SIZE_EXPLORATION
+
+    summary = mapper.size_swap_summary()
+    assert summary.loc['c1', 'size_swaps'] == 1
+    assert summary.loc['c1', 'last_requested_size'] == '34C'
+    assert summary.loc['c2', 'size_swaps'] == 0
+
+def test_attach_returns_empty_table(journey_data):
+    """Test a freshly created tracker with no returns attaches nothing."""
+    orders, _ = journey_data
+    attached = attach_returns(orders, pd.DataFrame(columns=RETURN_COLUMNS))
+
+    assert not attached['has_return_record'].any()
+    assert not attached['size_swap'].any()
+    assert attached['return_reason'].isna().all()
+
+def test_attach_returns_normalizes_keys_and_dedupes(journey_data):
+    """Test float/str key matching and duplicate return keys."""
+    orders, _ = journey_data
+    returns = pd.DataFrame({
+        'order_id': ['o2', 'o2', 'o4'],
+        'product_id': ['1.0', '1.0', 2.0],
+        'user_id': ['c1', 'c1', 'c2'],
+        'return_received_date': pd.to_datetime(['2024-12-07', '2024-12-05', '2024-12-06']),
+        'return_reason': ['latest', 'older', 'style'],
+        'size_returned': ['34B', '34B', '32A'],
+        'new_size_requested': ['34C', None, None],
+        'exchange_requested': [True, False, False],
+    })
+    attached = attach_returns(orders, returns)
+
+    assert attached['has_return_record'].tolist() == [False, True, False, True]
+    assert attached.loc[1, 'return_reason'] == 'latest'
+    assert attached['size_swap'].tolist() == [False, True, False, False]
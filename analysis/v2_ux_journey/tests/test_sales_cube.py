@@ -0,0 +1,97 @@
+"""
+Test suite for the pre-aggregated sales cube.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.sales_cube import SalesCube
+
+pytest.importorskip('pyarrow')
+
+@pytest.fixture
+def orders():
+    """Create prepared orders over two months."""
+    rng = np.random.default_rng(2)
+    n = 500
+    return pd.DataFrame({
+        'created_at': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60 * 24, n), unit='h'),
+        'category': rng.choice(['Intimates', 'Athletic'], n),
+        'style': rng.choice(['Lace Bra', 'Sport Bra', 'Classic Bra'], n),
+        'band_size': rng.choice(['32', '34', '36', None], n),
+        'cup_size': rng.choice(['A', 'B', 'C'], n),
+        'sale_price': rng.uniform(20, 80, n).round(2),
+        'returned': rng.random(n) < 0.2,
+    })
+
+def _expected(orders, keys):
+    """Reference groupby over raw orders."""
+    return orders.groupby(keys, dropna=False).agg(
+        orders=('sale_price', 'size'), revenue=('sale_price', 'sum'), returns=('returned', 'sum')
+    ).reset_index()
+
+def test_rollups_match_raw_groupby(orders):
+    """Test queries against groupbys over the raw orders."""
+    cube = SalesCube.from_orders(orders)
+
+    result = cube.query(by=['style'], grain='month')
+    expected = _expected(orders.assign(period=orders['created_at'].dt.to_period('M').dt.start_time), ['period', 'style'])
+    assert result['orders'].tolist() == expected['orders'].tolist()
+    assert result['revenue'].to_numpy() == pytest.approx(expected['revenue'].to_numpy())
+    assert result['returns'].tolist() == expected['returns'].tolist()
+
+    sliced = cube.query(by=['cup_size'], grain=None, filters={'category': 'Athletic'}, end='2024-01-31')
+    subset = orders[(orders['category'] == 'Athletic') & (orders['created_at'] < '2024-02-01')]
+    assert sliced.set_index('cup_size')['orders'].to_dict() == subset['cup_size'].value_counts().to_dict()
+
+    total = cube.query(grain=None)
+    assert total['orders'].iloc[0] == len(orders)
+    assert total['return_rate'].iloc[0] == pytest.approx(orders['returned'].mean())
+
+    with pytest.raises(ValueError):
+        cube.query(by=['colour'])
+
+def test_append_and_persistence(orders, tmp_path):
+    """Test that appending in pieces equals building at once, across save/load."""
+    ordered = orders.sort_values('created_at')
+    first, second = ordered.iloc[:300], ordered.iloc[300:]
+
+    cube = SalesCube.from_orders(first)
+    cube.save(str(tmp_path))
+    reloaded = SalesCube.load(str(tmp_path))
+    reloaded.append(second)
+
+    whole = SalesCube.from_orders(orders)
+    left = reloaded.query(by=['band_size', 'cup_size'], grain='week')
+    right = whole.query(by=['band_size', 'cup_size'], grain='week')
+    pd.testing.assert_frame_equal(left, right, check_categorical=False, check_dtype=False)
+
+def test_multi_item_orders_count_once():
+    """Test distinct order counts and item-level revenue for multi-item orders."""
+    items = pd.DataFrame({
+        'id': ['o1', 'o1', 'o1', 'o2', 'o3'],
+        'created_at': pd.to_datetime(['2024-01-01'] * 3 + ['2024-01-01', '2024-01-09']),
+        'category': ['Intimates', 'Intimates', 'Athletic', 'Intimates', 'Athletic'],
+        'style': ['Lace Bra', 'Sport Bra', 'Sport Bra', 'Lace Bra', 'Sport Bra'],
+        'band_size': '34',
+        'cup_size': 'B',
+        'sale_price': [30.0, 20.0, 10.0, 40.0, 25.0],
+        'total_amount': [60.0, 60.0, 60.0, 40.0, 25.0],
+        'returned': [True, False, False, False, False],
+    })
+    cube = SalesCube.from_orders(items)
+
+    total = cube.query(grain=None).iloc[0]
+    assert (total['orders'], total['items'], total['revenue']) == (3, 5, 125.0)
+    assert total['return_rate'] == pytest.approx(1 / 5)
+
+    by_style = cube.query(by=['style'], grain='month').set_index('style')
+    assert by_style.loc['Lace Bra', 'orders'] == 2
+    assert by_style.loc['Sport Bra', 'orders'] == 2
+    by_category = cube.query(by=['category'], grain=None, filters={'style': 'Sport Bra'}).set_index('category')
+    assert by_category['orders'].to_dict() == {'Athletic': 2, 'Intimates': 1}
+
+    # Without item prices the order total is split over its items
+    split = SalesCube.from_orders(items.drop(columns='sale_price'))
+    assert split.query(grain=None)['revenue'].iloc[0] == pytest.approx(125.0)
+    assert split.query(by=['style'], grain=None).set_index('style')['revenue']['Lace Bra'] == pytest.approx(60.0)
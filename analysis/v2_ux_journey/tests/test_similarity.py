@@ -0,0 +1,89 @@
+"""
+Test suite for the customer similarity index.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.similarity import SimilarityIndex
+
+@pytest.fixture
+def orders():
+    """Create random orders for 300 customers over three bands."""
+    rng = np.random.default_rng(5)
+    n = 1500
+    customers = rng.integers(0, 300, n)
+    bands = np.array(['32', '34', '36'])[customers % 3]
+    return pd.DataFrame({
+        'customer_id': [f"c{c}" for c in customers],
+        'band_size': bands,
+        'cup_size': rng.choice(['A', 'B', 'C', 'D'], n),
+        'style': rng.choice([f"Style {i}" for i in range(12)], n),
+        'category': rng.choice(['Bras', 'Lounge'], n),
+        'returned': rng.random(n) < 0.3,
+    })
+
+def _brute_force(orders, customer_id):
+    """Cosine similarities of TF-IDF profiles within the customer's band."""
+    tokens = pd.concat([
+        orders['customer_id'].to_frame().assign(token=col + '=' + orders[col].astype(str))
+        for col in ['band_size', 'cup_size', 'style', 'category']
+    ] + [orders['customer_id'].to_frame().assign(token=np.where(orders['returned'], 'order=returned', 'order=kept'))],
+        ignore_index=True)
+    counts = pd.crosstab(tokens['customer_id'], tokens['token']).astype(float)
+    idf = np.log((1 + len(counts)) / (1 + (counts > 0).sum())) + 1
+    vectors = counts * idf
+    vectors = vectors.div(np.sqrt((vectors ** 2).sum(axis=1)), axis=0)
+
+    band = orders.groupby('customer_id')['band_size'].first()
+    same = band.index[(band == band[customer_id]) & (band.index != customer_id)]
+    return (vectors.loc[same] @ vectors.loc[customer_id]).sort_values(ascending=False)
+
+def test_similar_matches_brute_force(orders):
+    """Test exact top-k cosine search within the band block."""
+    index = SimilarityIndex.from_orders(orders)
+    assert len(index.blocks) == 3
+
+    result = index.similar('c7', k=5)
+    expected = _brute_force(orders, 'c7')
+    assert result['similarity'].to_numpy() == pytest.approx(expected.iloc[:5].to_numpy(), abs=1e-5)
+    assert result['similarity'].is_monotonic_decreasing
+    assert 'c7' not in set(result['customer_id'])
+    assert set(orders.loc[orders['customer_id'].isin(result['customer_id']), 'band_size']) == {'34'}
+
+    with pytest.raises(ValueError):
+        index.similar('nobody')
+
+def test_top_k_all_agrees_with_single_queries(orders):
+    """Test the chunked batch search against one-customer queries."""
+    index = SimilarityIndex.from_orders(orders)
+    batch = index.top_k_all(k=3, max_cells=500, workers=2)
+
+    assert len(batch) == 3 * len(index.customers)
+    for customer_id in ['c0', 'c11', 'c250']:
+        single = index.similar(customer_id, k=3)
+        rows = batch[batch['customer_id'] == customer_id].sort_values('rank')
+        assert rows['similarity'].to_numpy() == pytest.approx(single['similarity'].to_numpy())
+
+def test_save_and_load(orders, tmp_path):
+    """Test a persisted index answers queries identically."""
+    index = SimilarityIndex.from_orders(orders, block_by=None)
+    index.save(str(tmp_path / 'index'))
+    loaded = SimilarityIndex.load(str(tmp_path / 'index'))
+
+    assert list(loaded.blocks) == ['all']
+    pd.testing.assert_frame_equal(loaded.similar('c3', k=4), index.similar('c3', k=4))
+
+@pytest.mark.parametrize('to_id', [
+    lambda number: number,
+    lambda number: pd.Timestamp('2024-01-01') + pd.Timedelta(days=number),
+])
+def test_save_and_load_keeps_id_types(orders, tmp_path, to_id):
+    """Test that non-string customer ids are still found after a round trip."""
+    ids = orders['customer_id'].str[1:].astype(int).map(to_id)
+    index = SimilarityIndex.from_orders(orders.assign(customer_id=ids))
+    index.save(str(tmp_path / 'index'))
+    loaded = SimilarityIndex.load(str(tmp_path / 'index'))
+
+    assert loaded.customers.dtype == index.customers.dtype
+    pd.testing.assert_frame_equal(loaded.similar(to_id(3), k=4), index.similar(to_id(3), k=4))
@@ -0,0 +1,84 @@
+"""
+Test suite for size-fit tables and size recommendations.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.size_fit import SizeFitMatrix
+
+@pytest.fixture
+def orders():
+    """Create orders where 34B returns in Lace Bra lead to 32C."""
+    rows = [
+        # customer, day, band, cup, style, returned
+        ('c1', 1, '34', 'B', 'Lace Bra', True),
+        ('c1', 5, '32', 'C', 'Lace Bra', False),
+        ('c2', 2, '34', 'B', 'Lace Bra', True),
+        ('c2', 6, '32', 'C', 'Lace Bra', False),
+        ('c3', 3, '34', 'B', 'Lace Bra', True),
+        ('c3', 7, '34', 'C', 'Lace Bra', False),
+        ('c4', 1, '36', 'D', 'Sport Bra', False),
+        ('c4', 9, '36', 'D', 'Sport Bra', False),
+        ('c5', 4, '34', 'B', 'Sport Bra', True),
+        ('c6', 4, '34', 'B', 'Classic Bra', True),
+        ('c6', 8, '34', 'C', 'Classic Bra', False),
+        ('c7', 2, None, 'B', 'Lace Bra', False),
+    ]
+    df = pd.DataFrame(rows, columns=['customer_id', 'day', 'band_size', 'cup_size', 'style', 'returned'])
+    df['created_at'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(df.pop('day'), unit='D')
+    return df
+
+def test_tensor_counts(orders):
+    """Test purchase, return and keep counts per band, cup and style."""
+    fit = SizeFitMatrix(orders)
+    b34, cb, lace = list(fit.bands).index('34'), list(fit.cups).index('B'), list(fit.styles).index('Lace Bra')
+
+    assert fit.purchases.shape == (3, 3, 3)
+    assert fit.purchases.sum() == 11  # the order without a band is skipped
+    assert fit.purchases[b34, cb, lace] == 3
+    assert fit.returns[b34, cb, lace] == 3
+    assert (fit.keeps == fit.purchases - fit.returns).all()
+    assert fit.keep_rate('36', 'D', 'Sport Bra') == 1.0
+    assert np.isnan(fit.keep_rate('30', 'A', 'Sport Bra'))
+
+def test_shift_probabilities(orders):
+    """Test per-style and overall size shifts after returns."""
+    fit = SizeFitMatrix(orders)
+    lace = fit.shift_table('Lace Bra')
+    assert lace.loc['34B', '32C'] == pytest.approx(2 / 3)
+    assert lace.loc['34B', '34C'] == pytest.approx(1 / 3)
+    assert fit.shift_table().loc['34B', '34C'] == pytest.approx(2 / 4)
+    # Only observed (style, from, to) triples are stored
+    assert len(fit.shifts) == 3
+    assert fit.shifts['count'].sum() == 4
+    with pytest.raises(ValueError):
+        fit.shift_table('Unknown')
+
+def test_recommend_size(orders):
+    """Test each recommendation path."""
+    fit = SizeFitMatrix(orders)
+
+    rec = fit.recommend_size('c5', 'Lace Bra')
+    assert (rec.band_size, rec.cup_size, rec.reason) == ('32', 'C', 'style_shift')
+    assert rec.probability == pytest.approx(2 / 3)
+
+    assert fit.recommend_size('c5', 'Sport Bra').reason == 'shift'
+    rec = fit.recommend_size('c4', 'Lace Bra')
+    assert (rec.band_size, rec.cup_size, rec.reason) == ('36', 'D', 'last_kept')
+    rec = fit.recommend_size('new', 'Sport Bra')
+    assert (rec.band_size, rec.cup_size, rec.reason) == ('36', 'D', 'style_top')
+    assert fit.recommend_size('new', 'Unknown').reason == 'unknown'
+
+def test_missing_sizes(orders):
+    """Test that orders without sizes are skipped rather than rejected."""
+    fit = SizeFitMatrix(orders.assign(cup_size=None))
+    assert fit.purchases.size == 0
+    assert fit.shift_table().empty
+    assert fit.recommend_size('c1', 'Lace Bra').reason == 'unknown'
+
+    partial = orders.copy()
+    partial.loc[partial['customer_id'] == 'c4', 'band_size'] = None
+    rec = SizeFitMatrix(partial).recommend_size('c4', 'Lace Bra')
+    assert (rec.band_size, rec.cup_size, rec.reason) == ('32', 'C', 'style_top')
+    assert rec.probability == pytest.approx(2 / 3)
@@ -0,0 +1,107 @@
+"""
+Test suite for streaming sketches.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+from ..core.sketches import BloomFilter, CountMinSketch, HyperLogLog, JourneySketch, SpaceSaving
+
+@pytest.fixture
+def stream():
+    """Create a skewed item stream."""
+    rng = np.random.default_rng(7)
+    return [f"item{i}" for i in rng.zipf(1.5, 20_000) if i < 5_000]
+
+def test_count_min_bounds(stream):
+    """Test that estimates never undercount and respect the error bound."""
+    sketch = CountMinSketch(epsilon=0.001, delta=0.01)
+    sketch.update(stream)
+    truth = pd.Series(stream).value_counts()
+    estimates = sketch.estimate(truth.index)
+    assert (estimates >= truth.to_numpy()).all()
+    assert (estimates - truth.to_numpy()).max() <= 0.001 * len(stream) * 2
+
+def test_space_saving_and_merge(stream):
+    """Test heavy hitters, also after merging two halves."""
+    truth = pd.Series(stream).value_counts()
+    whole = SpaceSaving(50)
+    whole.update(stream)
+    left, right = SpaceSaving(50), SpaceSaving(50)
+    left.update(stream[::2])
+    right.update(stream[1::2])
+    merged = left.merge(right)
+
+    for summary in [whole, merged]:
+        top = [item for item, _, _ in summary.top(5)]
+        assert top == list(truth.index[:5])
+        for item, count, error in summary.top(10):
+            assert count - error <= truth[item] <= count
+
+def test_hyperloglog_and_bloom():
+    """Test distinct counts, merging and membership."""
+    left, right = HyperLogLog(12), HyperLogLog(12)
+    left.update(range(0, 60_000))
+    right.update(range(40_000, 100_000))
+    assert left.merge(right).count() == pytest.approx(100_000, rel=4 * left.relative_error)
+    small = HyperLogLog(12)
+    small.update(['a', 'b', 'c', 'a'])
+    assert round(small.count()) == 3
+
+    bloom = BloomFilter(capacity=1_000, error_rate=0.01)
+    bloom.add([f"c{i}" for i in range(1_000)])
+    assert bloom.contains([f"c{i}" for i in range(1_000)]).all()
+    assert bloom.contains([f"x{i}" for i in range(10_000)]).mean() < 0.03
+    with pytest.raises(ValueError):
+        bloom.merge(BloomFilter(capacity=10))
+
+def test_journey_sketch_matches_exact():
+    """Test that small streams reproduce the exact entry points across batches and shards."""
+    orders = pd.DataFrame({
+        'customer_id': ['c1', 'c1', 'c2', 'c3', 'c3', 'c4'],
+        'product_id': [1, 2, 1, 2, 1, 1],
+        'created_at': ['2024-12-01', '2024-12-05', '2024-12-02', '2024-12-03', '2024-12-04', '2024-12-06'],
+        'returned': [False, False, False, True, False, False],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'category': ['Intimates', 'Lounge'],
+    })
+    mapper = JourneyMapper(orders, products)
+    exact = mapper.identify_entry_points()
+
+    assert mapper.build_sketch().entry_points() == pytest.approx(exact)
+
+    prepared = mapper.orders.sort_values('created_at')
+    shard_a, shard_b = JourneySketch(), JourneySketch()
+    shard_a.update(prepared[prepared['customer_id'].isin(['c1', 'c2'])].iloc[:2])
+    shard_a.update(prepared[prepared['customer_id'].isin(['c1', 'c2'])].iloc[2:])
+    shard_b.update(prepared[prepared['customer_id'].isin(['c3', 'c4'])])
+    merged = shard_a.merge(shard_b)
+
+    assert merged.entry_points() == pytest.approx(exact)
+    assert merged.top_transitions() == pytest.approx({
+        ('Intimates', 'Lounge'): 0.5, ('Lounge', 'Intimates'): 0.5
+    })
+    assert round(merged.distinct_customers()) == 4
+
+def test_journey_sketch_transition_keys_and_merge_order():
+    """Test tuple transition keys and that merging keeps the newer last category."""
+    def batch(customer, categories, dates):
+        return pd.DataFrame({
+            'customer_id': customer, 'created_at': pd.to_datetime(dates),
+            'name': 'Bra', 'category': categories, 'returned': False,
+        })
+
+    newer, older = JourneySketch(), JourneySketch()
+    newer.update(batch('c1', ['Bras -> Sale', 'Lounge'], ['2024-12-05', '2024-12-06']))
+    older.update(batch('c1', ['Intimates'], ['2024-12-01']))
+    assert newer.top_transitions() == {('Bras -> Sale', 'Lounge'): 1.0}
+
+    for merged in (newer.merge(older), older.merge(newer)):
+        assert merged.last_category['c1'] == ('Lounge', pd.Timestamp('2024-12-06'))
+        merged.update(batch('c1', ['Intimates'], ['2024-12-10']))
+        assert merged.top_transitions()[('Lounge', 'Intimates')] == pytest.approx(0.5)
@@ -0,0 +1,89 @@
+"""
+Test suite for JourneyMapper snapshots.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+
+@pytest.fixture
+def mapper():
+    """Create a prepared mapper with mixed column types."""
+    orders = pd.DataFrame({
+        'customer_id': ['c2', 'c1', 'c1', 'c3', 'c2'],
+        'product_id': [1, 2, 1, 2, 2],
+        'created_at': ['2024-12-04', '2024-12-05', '2024-12-01', '2024-12-03', '2024-12-02'],
+        'returned': [False, True, False, False, False],
+        'total_amount': [76.19, 80.0, np.nan, 70.0, 65.0],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'category': ['Intimates', None],
+    })
+    return JourneyMapper(orders, products)
+
+def test_snapshot_round_trip(mapper, tmp_path):
+    """Test that a loaded snapshot reproduces data and analyses."""
+    mapper.save_snapshot(str(tmp_path))
+    loaded = JourneyMapper.load_snapshot(str(tmp_path))
+
+    expected = mapper.orders.sort_values(['customer_id', 'created_at'], kind='stable').reset_index(drop=True)
+    text_columns = loaded.orders.select_dtypes('category').columns
+    decoded = loaded.orders.astype({col: expected[col].dtype for col in text_columns})
+    pd.testing.assert_frame_equal(decoded, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(
+        JourneyMapper.load_snapshot(str(tmp_path), as_categorical=False).products, mapper.products, check_dtype=False
+    )
+
+    assert loaded.identify_entry_points() == mapper.identify_entry_points()
+    for customer_id in ['c1', 'c2', 'c3']:
+        assert loaded.determine_journey_stage(customer_id) == mapper.determine_journey_stage(customer_id)
+
+def test_snapshot_is_memory_mapped(mapper, tmp_path):
+    """Test that numeric and date columns are backed by read-only maps."""
+    mapper.save_snapshot(str(tmp_path))
+    loaded = JourneyMapper.load_snapshot(str(tmp_path))
+
+    amounts = loaded.orders['total_amount'].to_numpy()
+    assert not amounts.flags.writeable
+    assert np.isnan(amounts).sum() == 1
+    customers = loaded.orders['customer_id']
+    assert isinstance(customers.dtype, pd.CategoricalDtype)
+    assert not customers.array.codes.flags.writeable
+
+def test_snapshot_metadata_stays_small(mapper, tmp_path):
+    """Test that dictionaries and customer ids are stored as arrays, not JSON."""
+    mapper.save_snapshot(str(tmp_path))
+    metadata = (tmp_path / 'snapshot.json').read_text()
+
+    assert 'Lace Bra - Sand' not in metadata and 'c1' not in metadata
+    assert (tmp_path / 'customer_index.npy').exists()
+
+def test_customer_lookup_uses_offsets(mapper, tmp_path):
+    """Test that per-customer lookups slice offsets instead of scanning."""
+    mapper.save_snapshot(str(tmp_path))
+    loaded = JourneyMapper.load_snapshot(str(tmp_path))
+    loaded.orders = loaded.orders.assign(customer_id='scan would miss')
+
+    assert loaded.determine_journey_stage('c1') == mapper.determine_journey_stage('c1')
+    assert loaded.generate_recommendations('unknown') == ["Explore our new arrivals!"]
+
+def test_customer_offsets(mapper, tmp_path):
+    """Test that offsets delimit each customer's rows."""
+    mapper.save_snapshot(str(tmp_path))
+    loaded = JourneyMapper.load_snapshot(str(tmp_path))
+
+    offsets = loaded.customer_offsets
+    assert list(loaded.customer_index) == ['c1', 'c2', 'c3']
+    assert offsets.tolist() == [0, 2, 4, 5]
+    c2 = loaded.orders.iloc[offsets[1]:offsets[2]]
+    assert (c2['customer_id'] == 'c2').all()
+    assert c2['created_at'].is_monotonic_increasing
+
+def test_missing_snapshot(tmp_path):
+    """Test that loading a missing snapshot raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        JourneyMapper.load_snapshot(str(tmp_path / 'missing'))
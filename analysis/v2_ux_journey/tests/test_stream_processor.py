@@ -0,0 +1,153 @@
+"""
+Test suite for the windowed stream processor.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.stream_processor import CSVTailSource, WindowedMetricsProcessor
+
+pytest.importorskip('pyarrow')
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+@pytest.fixture
+def items():
+    """Create 40 days of order items with some returns."""
+    rng = np.random.default_rng(9)
+    n = 800
+    created = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 40 * 24, n)), unit='h')
+    returned = rng.random(n) < 0.25
+    return pd.DataFrame({
+        'order_id': np.arange(n),
+        'user_id': rng.integers(0, 200, n),
+        'product_id': rng.choice([1, 2], n),
+        'created_at': created,
+        'returned_at': np.where(returned, created + pd.Timedelta(days=3), pd.NaT),
+    })
+
+@pytest.fixture
+def products():
+    """Create products with variant rows."""
+    return pd.DataFrame({
+        'id': [1, 1, 2],
+        'name': ['Classic Bra - Black', 'Classic Bra - Black', 'Lace Bra - Sand'],
+    })
+
+def _write(items, path, mode):
+    """Write items the way the exporter does."""
+    out = items.copy()
+    for col in ['created_at', 'returned_at']:
+        out[col] = pd.to_datetime(out[col]).dt.strftime(DATE_FORMAT)
+    out.to_csv(path, mode=mode, header=(mode == 'w'), index=False)
+
+def test_tail_source_reads_only_new_rows(items, tmp_path):
+    """Test incremental reads and partial lines."""
+    path = tmp_path / 'items.csv'
+    _write(items.iloc[:10], path, 'w')
+    source = CSVTailSource(str(path))
+    assert len(source.poll()) == 10
+    assert source.poll().empty
+
+    with open(path, 'a') as f:
+        f.write('10,5,1,2024-02-01 00:00:00.000000')  # no newline yet
+    assert source.poll().empty
+    with open(path, 'a') as f:
+        f.write(',\n')
+    assert source.poll()['order_id'].tolist() == [10]
+
+def test_sliding_windows_match_batch(items, products, tmp_path):
+    """Test emitted 7-day return rates against a batch computation."""
+    path = tmp_path / 'items.csv'
+    _write(items.iloc[:400], path, 'w')
+    processor = WindowedMetricsProcessor(str(tmp_path / 'out'), products=products)
+    source = CSVTailSource(str(path))
+    processor.run(source, polls=1, interval=0)
+    _write(items.iloc[400:], path, 'a')
+    processor.run(source, polls=1, interval=0)
+
+    results = pd.read_parquet(tmp_path / 'out')
+    weekly = results[(results['window'] == 'sliding') & (results['window_days'] == 7) &
+                     (results['metric'] == 'return_rate')]
+    end = pd.Timestamp('2024-01-20')
+    emitted = weekly[weekly['window_end'] == end].set_index('key')['value']
+
+    in_window = items[(items['created_at'] >= end - pd.Timedelta(days=7)) & (items['created_at'] < end)]
+    returns = items[(items['returned_at'] >= end - pd.Timedelta(days=7)) & (items['returned_at'] < end)]
+    names = {1: 'Classic Bra', 2: 'Lace Bra'}
+    for product_id, style in names.items():
+        expected = (returns['product_id'] == product_id).sum() / (in_window['product_id'] == product_id).sum()
+        assert emitted[style] == pytest.approx(expected)
+
+    entries = results[(results['metric'] == 'entry_share') & (results['window'] == 'tumbling')]
+    assert entries.groupby(['window_end', 'window_days'])['value'].sum().to_numpy() == pytest.approx(1.0)
+    assert processor.late_events == 0
+
+def test_late_events_behind_watermark_are_dropped(items, tmp_path):
+    """Test the watermark drops events older than the allowed lateness."""
+    processor = WindowedMetricsProcessor(str(tmp_path / 'out'), allowed_lateness_days=1)
+    processor.process(items.iloc[:600])
+    stale = items.iloc[:5].assign(returned_at=pd.NaT)
+    processor.process(stale)
+    assert processor.late_events == 5
+
+def test_large_batch_matches_day_by_day(items, products, tmp_path):
+    """Test that a batch spanning more days than the ring emits like daily batches."""
+    # 40 days, a 45-day gap, then 40 more days: far beyond the 32-day ring
+    stream = pd.concat([
+        items, items.assign(
+            created_at=items['created_at'] + pd.Timedelta(days=85),
+            returned_at=items['returned_at'] + pd.Timedelta(days=85),
+            user_id=items['user_id'] + 1000,
+        )
+    ], ignore_index=True)
+
+    whole = WindowedMetricsProcessor(str(tmp_path / 'whole'), products=products)
+    at_once = pd.concat(whole.process(stream), ignore_index=True)
+
+    daily = WindowedMetricsProcessor(str(tmp_path / 'daily'), products=products)
+    by_day = pd.concat([
+        frame for _, day_rows in stream.groupby(stream['created_at'].dt.floor('D'))
+        for frame in daily.process(day_rows)
+    ], ignore_index=True)
+
+    pd.testing.assert_frame_equal(at_once, by_day)
+    assert at_once['window_end'].min() == pd.Timestamp('2024-01-02')
+    assert whole.late_events == daily.late_events == 0
+
+    # Counts near the end are not merged with days a ring length earlier
+    end = pd.Timestamp('2024-05-01')
+    weekly = at_once[(at_once['window'] == 'sliding') & (at_once['window_days'] == 7) &
+                     (at_once['metric'] == 'return_rate') & (at_once['window_end'] == end)]
+    in_window = stream[(stream['created_at'] >= end - pd.Timedelta(days=7)) & (stream['created_at'] < end)]
+    returns = stream[(stream['returned_at'] >= end - pd.Timedelta(days=7)) & (stream['returned_at'] < end)]
+    expected = (returns['product_id'] == 2).sum() / (in_window['product_id'] == 2).sum()
+    assert weekly.set_index('key')['value']['Lace Bra'] == pytest.approx(expected)
+
+def test_stage_mix_is_derived_per_event(tmp_path):
+    """Test that stages come from the stage rules when rows carry none."""
+    items = pd.DataFrame({
+        'order_id': [1, 2, 3, 4, 5],
+        'user_id': ['a', 'b', 'a', 'b', 'c'],
+        'product_id': [1, 1, 2, 1, 1],
+        'created_at': pd.to_datetime([
+            '2024-01-01 10:00', '2024-01-01 11:00', '2024-01-02 10:00', '2024-01-04 10:00', '2024-01-12 10:00'
+        ]),
+        'returned_at': pd.to_datetime([None, '2024-01-03 10:00', None, None, None]),
+    })
+    products = pd.DataFrame({
+        'id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA34B'],
+    })
+    processor = WindowedMetricsProcessor(str(tmp_path / 'out'), products=products)
+    processor.process(items)
+
+    results = pd.read_parquet(tmp_path / 'out')
+    mix = results[(results['window'] == 'sliding') & (results['window_days'] == 7) &
+                  (results['metric'] == 'stage_mix') & (results['window_end'] == pd.Timestamp('2024-01-08'))]
+    # a: first purchase, then a second style; b: first purchase, then a
+    # reorder after returning it
+    assert mix.set_index('key')['value'].to_dict() == pytest.approx({
+        'First Purchase': 0.5, 'Style Exploration': 0.25, 'Size Exploration': 0.25,
+    })
@@ -0,0 +1,102 @@
+"""
+Test suite for streaming confidence state.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+from ..core.streaming_confidence import StreamingConfidence
+
+@pytest.fixture
+def mapper():
+    """Create a mapper with random orders over several sizes."""
+    rng = np.random.default_rng(5)
+    n = 600
+    orders = pd.DataFrame({
+        'customer_id': [f"c{i}" for i in rng.integers(0, 80, n)],
+        'product_id': rng.choice([1, 1, 1, 2, 3, 4], n),
+        'created_at': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24, n), unit='h'),
+        'returned': rng.random(n) < 0.25,
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2, 3, 4],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand', 'Sport Bra - Grey', 'Plain Bra - Red'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A', 'BRA003GR36DD', 'BRA004RE'],
+        'category': ['Intimates', 'Lounge', 'Athletic', 'Intimates'],
+    })
+    return JourneyMapper(orders, products)
+
+def test_replay_matches_full_history_score(mapper):
+    """Test that undecayed state reproduces _calculate_confidence_score."""
+    state = StreamingConfidence.from_orders(mapper.orders)
+    scores = state.scores()
+    assert len(scores) == mapper.orders['customer_id'].nunique()
+    for customer_id, customer_orders in mapper.orders.groupby('customer_id'):
+        expected = mapper._calculate_confidence_score(customer_orders)
+        assert scores[customer_id] == pytest.approx(expected)
+        assert state.score(customer_id) == pytest.approx(expected)
+
+def test_return_events_update_sizes():
+    """Test that returning the odd size restores size consistency."""
+    state = StreamingConfidence(capacity=1)
+    state.record_order('c1', '2024-01-01', '34', 'B')
+    state.record_order('c1', '2024-01-10', '36', 'B')
+    before = state.score('c1')
+    state.record_return('c1', '2024-01-20', '36', 'B')
+    after = state.score('c1')
+
+    assert before == pytest.approx(0.3 + 0.3)
+    assert after == pytest.approx(0.4 + 0.3 * 0.5 + 0.3 / 1.3)
+
+    state.record_order('c2', '2024-01-05', '32', 'A')  # grows the arrays
+    assert state.score('c2') == pytest.approx(1.0)
+    assert state.score('unknown') == 0.0
+
+def test_uncounted_return_does_not_go_negative():
+    """Test that returning a size that never got a slot is ignored."""
+    state = StreamingConfidence()
+    state.record_order('c1', '2024-01-01', '34', 'B')
+    state.record_order('c1', '2024-01-05', '36', 'C', returned=True)
+    state.record_return('c1', '2024-01-09', '36', 'C')
+    state.record_order('c1', '2024-01-09', '34', 'B')
+
+    assert state.band_overflow[0] == 0 and state.cup_overflow[0] == 0
+    assert state.band_counts[0].min() >= 0
+    assert state.score('c1') == pytest.approx(0.4 + 0.3 * (1 - 2 / 3) + 0.3 * min(1.0, 1 / (8 / 30 + 1)))
+
+def test_overflowed_size_is_never_split():
+    """Test that a freed slot takes an overflowed size back whole."""
+    state = StreamingConfidence()
+    bands = ['30', '32', '34', '36', '38']
+    for day, band in enumerate(bands, start=1):
+        state.record_order('c1', f"2024-01-0{day}", band, 'B')
+    assert state.band_overflow[0] == 1  # '38' has no slot
+
+    state.record_return('c1', '2024-01-10', '30', 'B')
+    assert state.band_overflow[0] == 0
+    state.record_order('c1', '2024-01-11', '38', 'B')
+    for band in ['32', '34', '36']:
+        state.record_return('c1', '2024-01-12', band, 'B')
+
+    live = state.band_slots[0] >= 0
+    assert state.band_overflow[0] == 0
+    assert live.sum() == 1 and state.band_counts[0][live].tolist() == [2]
+    assert state.score('c1') == pytest.approx(0.4 + 0.3 * (1 - 4 / 6) + 0.3 * min(1.0, 2 / (10 / 30 + 1)))
+
+def test_decayed_mode_forgets_old_returns():
+    """Test that decayed return and frequency terms fade over time."""
+    state = StreamingConfidence(half_life_days=30)
+    state.record_order('c1', '2023-01-01', '34', 'B', returned=True)
+    state.record_order('c1', '2024-01-01', '34', 'B')
+    state.record_order('c1', '2024-01-15', '34', 'B')
+
+    recent = state.score('c1')
+    assert recent > StreamingConfidence.from_orders(pd.DataFrame({
+        'customer_id': ['c1'] * 3,
+        'created_at': pd.to_datetime(['2023-01-01', '2024-01-01', '2024-01-15']),
+        'band_size': ['34'] * 3,
+        'cup_size': ['B'] * 3,
+        'returned': [True, False, False],
+    })).score('c1')
+    assert state.score('c1', now='2025-01-01') < recent
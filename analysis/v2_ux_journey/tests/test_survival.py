@@ -0,0 +1,185 @@
+"""
+Test suite for time-to-event survival analysis.
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.journey_mapping import JourneyMapper
+from ..core.survival import (
+    kaplan_meier, median_survival, return_durations,
+    second_purchase_durations, stage_dwell_durations
+)
+
+DAY = pd.Timestamp('2024-01-01')
+
+@pytest.fixture
+def orders():
+    """Create orders for five customers over two cohorts."""
+    rows = [
+        # customer, order, day, style, delivered day, returned day
+        ('c1', 1, 0, 'Lace Bra', 3, 10),
+        ('c1', 1, 0, 'Lace Bra', 3, None),  # second item of the same order
+        ('c1', 2, 20, 'Lace Bra', 23, None),
+        ('c2', 3, 5, 'Sport Bra', 8, None),
+        ('c2', 4, 15, 'Sport Bra', 18, 20),
+        ('c3', 5, 40, 'Lace Bra', 43, None),
+        ('c4', 6, 35, 'Lace Bra', None, None),
+        ('c4', 7, 45, 'Classic Bra', 48, None),
+        ('c5', 8, 50, 'Sport Bra', 53, None),
+    ]
+    df = pd.DataFrame(rows, columns=['customer_id', 'order_id', 'day', 'style', 'delivered', 'returned_day'])
+    df['created_at'] = DAY + pd.to_timedelta(df.pop('day'), unit='D')
+    df['delivered_at'] = DAY + pd.to_timedelta(df.pop('delivered'), unit='D')
+    df['returned_at'] = DAY + pd.to_timedelta(df.pop('returned_day'), unit='D')
+    return df
+
+def test_kaplan_meier_matches_hand_computation():
+    """Test the product-limit estimate on a textbook example."""
+    durations = pd.Series([2, 3, 3, 5, 6, 8])
+    observed = pd.Series([True, True, False, True, False, True])
+    curves = kaplan_meier(durations, observed)
+
+    assert curves['time'].tolist() == [2, 3, 5, 6, 8]
+    assert curves['at_risk'].tolist() == [6, 5, 3, 2, 1]
+    assert curves['events'].tolist() == [1, 1, 1, 0, 1]
+    expected = np.cumprod([5 / 6, 4 / 5, 2 / 3, 1.0, 0.0])
+    assert curves['survival'].to_numpy() == pytest.approx(expected)
+    assert median_survival(curves)['all'] == 5
+
+def test_kaplan_meier_groups_are_independent():
+    """Test grouped curves equal curves of each group alone."""
+    rng = np.random.default_rng(3)
+    durations = pd.Series(rng.integers(0, 30, 500))
+    observed = pd.Series(rng.random(500) < 0.7)
+    groups = pd.Series(rng.choice(['a', 'b'], 500))
+    curves = kaplan_meier(durations, observed, groups)
+
+    for group in ['a', 'b']:
+        alone = kaplan_meier(durations[groups == group], observed[groups == group])
+        grouped = curves[curves['group'] == group]
+        assert grouped['survival'].to_numpy() == pytest.approx(alone['survival'].to_numpy())
+
+def test_second_purchase_durations(orders):
+    """Test first-to-second purchase times and censoring."""
+    durations = second_purchase_durations(orders, as_of=DAY + pd.Timedelta(days=60))
+
+    assert durations.loc['c1', 'duration_days'] == 20  # item rows of order 1 count once
+    assert durations.loc['c2', 'duration_days'] == 10
+    assert not durations.loc['c3', 'observed']
+    assert durations.loc['c3', 'duration_days'] == 20
+    assert durations.loc['c4', 'entry_style'] == 'Lace Bra'
+    assert durations['cohort'].tolist() == ['2024-01', '2024-01', '2024-02', '2024-02', '2024-02']
+
+def test_return_durations(orders):
+    """Test delivery-to-return times; undelivered items are skipped."""
+    durations = return_durations(orders)
+
+    assert len(durations) == len(orders) - 1
+    assert durations.loc[0, 'duration_days'] == 7 and durations.loc[0, 'observed']
+    assert durations.loc[4, 'duration_days'] == 2
+    # censored at the latest date in the data (day 53)
+    assert durations.loc[2, 'duration_days'] == 30 and not durations.loc[2, 'observed']
+
+def test_stage_dwell_durations(orders):
+    """Test stage spells close on the next stage change."""
+    data = orders.drop_duplicates('order_id')
+    stages = ['First Purchase', 'Size Exploration', 'First Purchase', 'First Purchase',
+              'First Purchase', 'First Purchase', 'Style Exploration', 'First Purchase']
+    spells = stage_dwell_durations(data, stages, as_of=DAY + pd.Timedelta(days=60))
+
+    c1 = spells[spells['customer_id'] == 'c1']
+    assert c1['stage'].tolist() == ['First Purchase', 'Size Exploration']
+    assert c1['duration_days'].tolist() == [20, 40]
+    assert c1['observed'].tolist() == [True, False]
+    c2 = spells[spells['customer_id'] == 'c2']
+    assert c2['duration_days'].tolist() == [55] and not c2['observed'].any()
+
+def test_mapper_survival_curves():
+    """Test curves from a mapper, grouped per event."""
+    orders = pd.DataFrame({
+        'customer_id': ['c1', 'c1', 'c1', 'c2', 'c2'],
+        'product_id': [1, 2, 1, 1, 2],
+        'created_at': pd.to_datetime(['2024-12-01', '2024-12-05', '2024-12-09', '2024-12-02', '2024-12-03']),
+        'delivered_at': pd.to_datetime(['2024-12-03', '2024-12-07', '2024-12-11', '2024-12-04', '2024-12-05']),
+        'returned_at': pd.to_datetime([None, '2024-12-10', None, None, None]),
+        'returned': [False, True, False, False, False],
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A'],
+        'category': ['Intimates', 'Lounge'],
+    })
+    mapper = JourneyMapper(orders, products)
+
+    second = mapper.survival_curves('second_purchase')
+    assert second['time'].tolist() == [1, 4]
+    assert second['survival'].iloc[-1] == 0.0
+
+    returns = mapper.survival_curves('return', by='style')
+    assert set(returns['group']) == {'Classic Bra', 'Lace Bra'}
+
+    dwell = mapper.survival_curves('stage_dwell')
+    assert 'Size Exploration' in set(dwell['group'])
+    with pytest.raises(ValueError):
+        mapper.survival_curves('return', by='cohort')
+
+def _write_exports(orders, path):
+    """Write the orders fixture as Pepper exports with fulfilment dates."""
+    fmt = '%Y-%m-%d %H:%M:%S.%f'
+    styles = {'Lace Bra': 1, 'Sport Bra': 2, 'Classic Bra': 3}
+    export = orders.assign(
+        order_id=orders['order_id'].map('o{}'.format),
+        product_id=orders['style'].map(styles),
+        shipped_at=orders['delivered_at'] - pd.Timedelta(days=1),
+    )
+    header = export.drop_duplicates('order_id').rename(columns={'order_id': 'id', 'customer_id': 'user_id'})
+    header.assign(status='Complete', created_at=header['created_at'].dt.strftime(fmt))[
+        ['id', 'user_id', 'status', 'created_at']
+    ].to_csv(path / 'simulated_orders_20250101_000000.csv', index=False)
+    items = export[['order_id', 'product_id', 'shipped_at', 'delivered_at', 'returned_at']].copy()
+    for col in ['shipped_at', 'delivered_at', 'returned_at']:
+        items[col] = items[col].dt.strftime(fmt)
+    items.to_csv(path / 'transformed_order_items_20250101_000000.csv', index=False)
+    pd.DataFrame({
+        'id': list(styles.values()),
+        'name': [f"{style} - Black" for style in styles],
+        'sku': ['BRA001BL34B', 'BRA002BL34B', 'BRA003BL34B'],
+        'retail_price': [72.0, 60.0, 65.0],
+        'category': ['Intimates', 'Athletic', 'Intimates'],
+    }).to_csv(path / 'transformed_bra_products_20250101_000000.csv', index=False)
+    return str(path)
+
+@pytest.mark.parametrize('backend', ['pandas', 'polars'])
+def test_return_curves_from_data_dir(orders, tmp_path, backend):
+    """Test that the loaders carry delivery dates through to survival_curves."""
+    if backend == 'polars':
+        pytest.importorskip('polars')
+    mapper = JourneyMapper.from_data_dir(_write_exports(orders, tmp_path), backend=backend)
+    assert {'shipped_at', 'delivered_at'} <= set(mapper.orders.columns)
+
+    curves = mapper.survival_curves('return', by='style')
+    durations = return_durations(orders)
+    expected = kaplan_meier(durations['duration_days'], durations['observed'], durations['style'])
+    pd.testing.assert_frame_equal(curves, expected, check_dtype=False)
+
+def test_duckdb_orders_carry_fulfilment_dates(orders, tmp_path):
+    """Test that the DuckDB journey_orders view exposes delivery dates."""
+    pytest.importorskip('duckdb')
+    mapper = JourneyMapper.from_data_dir(_write_exports(orders, tmp_path), backend='duckdb')
+    counts = mapper.query("SELECT count(shipped_at), count(delivered_at), count(returned_at) FROM journey_orders")
+    assert counts.iloc[0].tolist() == [8, 8, 2]
+
+@pytest.mark.parametrize('event,by', [
+    ('second_purchase', 'entry_style'),
+    ('return', 'style'),
+    ('stage_dwell', None),
+])
+def test_duckdb_survival_curves_match_pandas(orders, tmp_path, event, by):
+    """Test that the DuckDB backend builds the same curves as pandas."""
+    pytest.importorskip('duckdb')
+    data_dir = _write_exports(orders, tmp_path)
+    expected = JourneyMapper.from_data_dir(data_dir).survival_curves(event, by=by)
+    curves = JourneyMapper.from_data_dir(data_dir, backend='duckdb').survival_curves(event, by=by)
+    pd.testing.assert_frame_equal(curves, expected, check_dtype=False)
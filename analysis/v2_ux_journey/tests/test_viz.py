@@ -0,0 +1,102 @@
+"""
+Test suite for pre-aggregated visualizations and the artifact cache.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import pandas as pd
+from ..core.confidence_model import running_confidence
+from ..core.journey_mapping import JourneyMapper
+from ..viz.artifacts import ArtifactCache, save_figure
+from ..viz.category_viz import category_flow_sankey, sankey_data, transition_counts
+from ..viz.confidence_viz import confidence_heatmap, confidence_histogram
+
+@pytest.fixture
+def mapper():
+    """Create a mapper over random orders of 60 customers."""
+    rng = np.random.default_rng(1)
+    n = 400
+    orders = pd.DataFrame({
+        'customer_id': rng.integers(0, 60, n),
+        'product_id': rng.integers(1, 5, n),
+        'created_at': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 300 * 24, n), unit='h'),
+        'returned': rng.random(n) < 0.3,
+        'size_swap': rng.random(n) < 0.05,
+    })
+    products = pd.DataFrame({
+        'product_id': [1, 2, 3, 4],
+        'name': ['Classic Bra - Black', 'Lace Bra - Sand', 'Classic Bra - Black', 'Sport Bra - Red'],
+        'sku': ['BRA001BL34B', 'BRA002SA32A', 'BRA001BL34C', 'BRA003RE36D'],
+        'category': ['Bras', 'Bras', 'Bras', 'Active'],
+    })
+    return JourneyMapper(orders, products)
+
+def test_running_confidence_matches_progression(mapper):
+    """Test the vectorized trajectories against per-prefix scoring."""
+    expected = mapper.map_confidence_progression()
+    trajectories = running_confidence(mapper.orders)
+    for customer_id, scores in trajectories.groupby('customer_id')['confidence']:
+        assert scores.tolist() == pytest.approx(expected[customer_id])
+
+def test_confidence_histogram(mapper):
+    """Test binning of trajectories given as a frame or a dict."""
+    histogram = confidence_histogram(running_confidence(mapper.orders), max_orders=5, confidence_bins=10)
+    assert histogram.shape == (10, 5)
+    assert histogram.sum().to_numpy() == pytest.approx(1.0)
+    assert histogram.index[0] == 0.9
+
+    counts = confidence_histogram({'a': [0.0, 0.95, 0.95], 'b': [0.5]}, max_orders=2, confidence_bins=2, normalize=False)
+    assert counts[1].tolist() == [1, 1]
+    assert counts[2].tolist() == [2, 0]  # orders beyond max_orders land in the last column
+
+def test_transitions_and_sankey_cutoff():
+    """Test transition counting and merging of minor nodes into Other."""
+    orders = pd.DataFrame({
+        'customer_id': ['c1', 'c1', 'c1', 'c2', 'c2', 'c3'],
+        'created_at': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-01', '2024-01-05', '2024-01-01']),
+        'style': ['A', 'B', 'A', 'A', 'C', 'B'],
+    })
+    matrix = transition_counts(orders)
+    assert matrix.loc['A', 'B'] == 1 and matrix.loc['B', 'A'] == 1 and matrix.loc['A', 'C'] == 1
+    assert matrix.to_numpy().sum() == 3
+
+    links = sankey_data(matrix, top_n=2)
+    assert set(links['source']) | set(links['target']) == {'A', 'B', 'Other'}
+    assert links['value'].sum() == 3
+    assert links['share'].sum() == pytest.approx(1.0)
+
+def test_rendering_is_cached_per_snapshot(mapper, tmp_path):
+    """Test PNG and HTML artifacts are rendered once per snapshot."""
+    pytest.importorskip('matplotlib')
+    cache = ArtifactCache.for_mapper(str(tmp_path), mapper)
+
+    png = confidence_heatmap(mapper, cache=cache)
+    assert open(png, 'rb').read(4) == b'\x89PNG'
+    assert confidence_heatmap(mapper, cache=cache) == png
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    page = category_flow_sankey(mapper, cache=cache, fmt='html', top_n=3)
+    assert 'data:image/png;base64' in open(page).read()
+
+    mapper.orders = mapper.orders.iloc[:-1]
+    other = ArtifactCache.for_mapper(str(tmp_path), mapper)
+    assert other.path('confidence_heatmap', (20, 20)) != cache.path('confidence_heatmap', (20, 20))
+    other.prune()
+    assert not cache.directory.exists()
+
+class _StaticFigure:
+    """Figure stand-in whose savefig writes fixed bytes without rendering."""
+
+    def savefig(self, buffer, **kwargs):
+        buffer.write(b'\x89PNG' + bytes(4096))
+
+def test_concurrent_saves_do_not_collide(tmp_path):
+    """Test that writers of the same artifact use separate temporary files."""
+    path = tmp_path / 'figure.png'
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: save_figure(_StaticFigure(), str(path)), range(64)))
+
+    assert [p.name for p in tmp_path.iterdir()] == ['figure.png']
+    assert path.read_bytes() == b'\x89PNG' + bytes(4096)
@@ -4,9 +4,53 @@ Data Loading Module for Pepper Analysis
 Handles loading and preprocessing of Pepper's Shopify data.
 """
 
+import sqlite3
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Tuple
+from typing import List, Optional, Tuple
+
+# Columns read from the ReturnTracker return_tracking table
+RETURN_COLUMNS = [
+    'order_id', 'product_id', 'user_id', 'return_received_date',
+    'return_reason', 'size_returned', 'new_size_requested', 'exchange_requested'
+]
+
+# Timestamp layout written by the simulator and transformer
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+DATE_COLUMNS = ['created_at', 'shipped_at', 'delivered_at', 'returned_at']
+# Order item columns carried onto orders when the export has them
+OPTIONAL_ITEM_COLUMNS = ['inventory_item_id', 'sale_price', 'shipped_at', 'delivered_at']
+
+def parse_dates(
+    df: pd.DataFrame,
+    columns: List[str],
+    date_format: str = DATE_FORMAT
+) -> pd.DataFrame:
+    """
+    Parse date columns in place using an explicit format.
+    
+    Parsing with a known format avoids per-value format inference. Values
+    that do not match (e.g. dates without a time part) are parsed again
+    with inference, so no valid date is lost.
+    
+    Args:
+        df: DataFrame containing the date columns
+        columns: Columns to parse; missing columns are skipped
+        date_format: strftime format of the stored timestamps
+        
+    Returns:
+        The same DataFrame with parsed columns
+    """
+    for col in columns:
+        if col not in df.columns or pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue
+        parsed = pd.to_datetime(df[col], format=date_format, errors='coerce')
+        unmatched = parsed.isna() & df[col].notna()
+        if unmatched.any():
+            parsed[unmatched] = pd.to_datetime(df.loc[unmatched, col])
+        df[col] = parsed
+    return df
 
 def validate_columns(df: pd.DataFrame, required_cols: list, context: str) -> None:
     """
@@ -26,11 +70,18 @@ def validate_columns(df: pd.DataFrame, required_cols: list, context: str) -> Non
             f"Missing required columns in {context} data: {missing_cols}"
         )
 
-def load_pepper_data(data_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def load_pepper_data(
+    data_dir: str,
+    returns_db: Optional[str] = None,
+    backend: str = "pandas"
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Load and preprocess Pepper's order and product data.
     Args:
         data_dir: Directory containing the data files
+        returns_db: Optional ReturnTracker database; when given, its
+            records are attached and also mark rows as returns
+        backend: "pandas" (eager) or "polars" (lazy scan, collected to pandas)
         
     Returns:
         Tuple of (orders_df, products_df)
@@ -39,6 +90,15 @@ def load_pepper_data(data_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
         ValueError: If required columns are missing or data format is invalid
         FileNotFoundError: If data files are not found
     """
+    if backend == "polars":
+        from .polars_loader import load_pepper_data_polars
+        orders_df, products_df = load_pepper_data_polars(data_dir)
+        if returns_db is not None:
+            orders_df = attach_return_db(orders_df, returns_db)
+        return orders_df, products_df
+    if backend != "pandas":
+        raise ValueError(f"Unknown backend: {backend}")
+    
     try:
         # Find most recent data files
         orders_file = sorted(
@@ -59,17 +119,17 @@ def load_pepper_data(data_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
         products_df = pd.read_csv(products_file)
         
         # Convert dates in order_items
-        date_columns = ['created_at', 'shipped_at', 'delivered_at', 'returned_at']
-        for col in date_columns:
-            if col in order_items_df.columns:
-                order_items_df[col] = pd.to_datetime(order_items_df[col])
+        order_items_df = parse_dates(order_items_df, DATE_COLUMNS)
         
         # Add is_return based on returned_at date
         order_items_df['is_return'] = ~order_items_df['returned_at'].isna()
         
-        # Join orders with order items
+        # Join orders with order items, keeping the variant key, item
+        # price and fulfilment dates when exported
+        item_columns = ['order_id', 'product_id', 'is_return', 'returned_at']
+        item_columns += [c for c in OPTIONAL_ITEM_COLUMNS if c in order_items_df.columns]
         orders_df = orders_df.merge(
-            order_items_df[['order_id', 'product_id', 'is_return', 'returned_at']],
+            order_items_df[item_columns],
             left_on='id',
             right_on='order_id',
             how='left'
@@ -107,9 +167,12 @@ def load_pepper_data(data_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
         validate_columns(products_df, required_product_cols, "Products")
         
         # Basic data cleaning
-        orders_df['created_at'] = pd.to_datetime(orders_df['created_at'])
+        orders_df = parse_dates(orders_df, ['created_at'])
         orders_df['status'] = orders_df['status'].str.lower()
         
+        if returns_db is not None:
+            orders_df = attach_return_db(orders_df, returns_db)
+        
         return orders_df, products_df
         
     except IndexError:
@@ -118,4 +181,131 @@ def load_pepper_data(data_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
             "Expected files matching patterns: "
             "'simulated_orders_*.csv', 'transformed_order_items_*.csv', "
             "and 'transformed_bra_products_*.csv'"
-        )
\ No newline at end of file
+        )
+
+def load_return_records(db_path: str) -> pd.DataFrame:
+    """
+    Bulk-read return records from a ReturnTracker SQLite database.
+    
+    All rows are fetched with one query, sorted by (order_id, product_id)
+    so they can be attached to orders without per-order lookups.
+    
+    Args:
+        db_path: Path to the ReturnTracker database
+        
+    Returns:
+        DataFrame with RETURN_COLUMNS, one row per (order_id, product_id);
+        the most recently received return wins for duplicate keys
+        
+    Raises:
+        FileNotFoundError: If the database does not exist
+    """
+    if not Path(db_path).exists():
+        raise FileNotFoundError(f"Return database not found: {db_path}")
+    
+    query = (
+        f"SELECT {', '.join(RETURN_COLUMNS)} FROM return_tracking "
+        "ORDER BY order_id, product_id, return_received_date"
+    )
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        returns = pd.read_sql_query(query, conn)
+    finally:
+        conn.close()
+    
+    returns['order_id'] = returns['order_id'].astype(str)
+    returns['product_id'] = returns['product_id'].astype(str)
+    returns['exchange_requested'] = returns['exchange_requested'].fillna(0).astype(bool)
+    returns = parse_dates(returns, ['return_received_date'])
+    
+    # Rows are sorted, so keeping the last duplicate keeps the latest return
+    return returns.drop_duplicates(['order_id', 'product_id'], keep='last').reset_index(drop=True)
+
+def _normalize_keys(values: pd.Series) -> np.ndarray:
+    """
+    Join keys as strings that compare equal across int, float and str.
+    
+    Integral numbers (1, 1.0, '1.0') all become '1'; anything else is
+    kept as its stripped string form.
+    """
+    keys = values.astype(str).str.strip()
+    numbers = pd.to_numeric(values, errors='coerce')
+    integral = numbers.notna() & (numbers == np.floor(numbers))
+    keys[integral] = numbers[integral].astype('int64').astype(str)
+    return keys.to_numpy(dtype=object)
+
+def attach_returns(orders: pd.DataFrame, returns: pd.DataFrame) -> pd.DataFrame:
+    """
+    Attach return records to order rows by (order_id, product_id).
+    
+    Return keys are held in a MultiIndex and each order row is resolved
+    with a single vectorized indexer lookup, so the cost is one pass over
+    the orders regardless of how many returns exist. Keys are normalized
+    first, so a product_id stored as 123, 123.0 or '123' matches. Return
+    keys must be unique; duplicates keep the latest received return, as
+    in load_return_records.
+    
+    Adds return_reason, size_returned, new_size_requested,
+    exchange_requested, has_return_record and size_swap, where size_swap
+    marks an exchange into a different size.
+    
+    Args:
+        orders: Orders with order_id and product_id columns
+        returns: Output of load_return_records
+        
+    Returns:
+        Copy of orders with the return columns added
+        
+    Raises:
+        ValueError: If key columns are missing
+    """
+    validate_columns(orders, ['order_id', 'product_id'], "Orders")
+    validate_columns(returns, RETURN_COLUMNS, "Returns")
+    
+    returns = returns.assign(
+        order_id=_normalize_keys(returns['order_id']),
+        product_id=_normalize_keys(returns['product_id'])
+    )
+    returns = returns.sort_values('return_received_date', kind='stable')
+    returns = returns.drop_duplicates(['order_id', 'product_id'], keep='last')
+    return_index = pd.MultiIndex.from_arrays([returns['order_id'], returns['product_id']])
+    order_keys = pd.MultiIndex.from_arrays([
+        _normalize_keys(orders['order_id']),
+        _normalize_keys(orders['product_id'])
+    ])
+    positions = return_index.get_indexer(order_keys)
+    matched = positions >= 0
+    matched_positions = positions[matched]
+    
+    result = orders.copy()
+    for col in ['return_reason', 'size_returned', 'new_size_requested']:
+        values = np.full(len(result), None, dtype=object)
+        values[matched] = returns[col].to_numpy(dtype=object)[matched_positions]
+        result[col] = values
+    
+    exchange = np.zeros(len(result), dtype=bool)
+    exchange[matched] = returns['exchange_requested'].to_numpy(dtype=bool)[matched_positions]
+    result['exchange_requested'] = exchange
+    result['has_return_record'] = matched
+    result['size_swap'] = (
+        result['exchange_requested']
+        & result['new_size_requested'].notna()
+        & (result['new_size_requested'] != result['size_returned'])
+    )
+    return result
+
+def attach_return_db(orders: pd.DataFrame, db_path: str) -> pd.DataFrame:
+    """
+    Attach a ReturnTracker database's records and mark them as returns.
+    
+    Args:
+        orders: Order rows with order_id, product_id and is_return
+        db_path: Path to the ReturnTracker database
+        
+    Returns:
+        Copy of orders with the return columns added and is_return set
+        for rows that have a return record
+    """
+    orders = attach_returns(orders, load_return_records(db_path))
+    orders['is_return'] = orders['is_return'].fillna(False).astype(bool) | orders['has_return_record']
+    return orders
@@ -0,0 +1,229 @@
+"""
+Data Transformer Module for Pepper Analysis
+
+Columnar transforms from raw Shopify exports into the TheLook-style
+schema used by the ``transformed_bra_products_*`` and
+``transformed_order_items_*`` files. Every step works on whole columns,
+so the same code runs on a full frame or on streamed CSV chunks.
+"""
+
+import logging
+import re
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from .data_loader import DATE_COLUMNS, parse_dates
+
+logger = logging.getLogger(__name__)
+
+# Keyword -> category, in priority order (first listed keyword wins)
+CATEGORY_KEYWORDS = {
+    'bras': 'Intimates',
+    'wireless': 'Intimates',
+    'strapless': 'Intimates',
+    'sports': 'Athletic',
+}
+DEFAULT_CATEGORY = 'Intimates'
+
+DEFAULT_MEASUREMENTS = {
+    'product_weight_g': 150.0,
+    'product_length_cm': 25.0,
+    'product_height_cm': 15.0,
+    'product_width_cm': 5.0,
+}
+
+# Raw Shopify measurement column for each transformed column
+MEASUREMENT_SOURCES = {
+    'product_weight_g': 'weight',
+    'product_length_cm': 'length',
+    'product_height_cm': 'height',
+    'product_width_cm': 'width',
+}
+
+PRODUCT_COLUMNS = [
+    'id', 'brand', 'category', 'name', 'retail_price', 'department', 'sku',
+    'distribution_center_id', 'cost', 'product_weight_g', 'product_length_cm',
+    'product_height_cm', 'product_width_cm', 'inventory_item_id',
+    'inventory_quantity', 'inventory_location'
+]
+
+ORDER_ITEM_COLUMNS = [
+    'order_id', 'user_id', 'product_id', 'status', 'sale_price',
+    'shipping_cost', 'created_at', 'shipped_at', 'delivered_at', 'returned_at'
+]
+
+COST_RATIO = 0.4
+
+
+class DataTransformer:
+    """Transform Pepper data to match the TheLook schema."""
+
+    def __init__(self, category_keywords: Optional[Dict[str, str]] = None):
+        """
+        Initialize with a keyword to category mapping.
+
+        Args:
+            category_keywords: Ordered mapping of title keyword to category.
+                Defaults to CATEGORY_KEYWORDS.
+        """
+        self.category_keywords = dict(category_keywords or CATEGORY_KEYWORDS)
+        self._priority = {
+            keyword.lower(): rank
+            for rank, keyword in enumerate(self.category_keywords)
+        }
+        self._categories = list(self.category_keywords.values())
+        # One alternation compiled once: the regex engine walks each
+        # title a single time instead of once per keyword
+        self._keyword_pattern = re.compile(
+            '|'.join(re.escape(k) for k in sorted(self._priority, key=len, reverse=True)),
+            re.IGNORECASE
+        )
+        # Title -> category cache shared by every chunk
+        self._category_cache: Dict[str, str] = {}
+
+    def map_categories(self, titles: pd.Series) -> pd.Series:
+        """
+        Map product titles to categories.
+
+        Only titles not seen in an earlier call are scanned; repeated
+        titles (one per size variant) are resolved through the cache.
+
+        Args:
+            titles: Series of product titles
+
+        Returns:
+            Series of categories aligned with titles
+        """
+        for title in titles.dropna().unique():
+            if title in self._category_cache:
+                continue
+            matches = self._keyword_pattern.findall(title)
+            if matches:
+                best = min(self._priority[m.lower()] for m in matches)
+                self._category_cache[title] = self._categories[best]
+            else:
+                self._category_cache[title] = DEFAULT_CATEGORY
+
+        return titles.map(self._category_cache).fillna(DEFAULT_CATEGORY)
+
+    def transform_products(self, raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Transform raw Shopify variant rows to the product schema.
+
+        Args:
+            raw: DataFrame with product_id, title, variant_id, sku, price
+                and optional weight/width/height/length columns
+
+        Returns:
+            DataFrame with PRODUCT_COLUMNS
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        missing = {'product_id', 'title', 'variant_id', 'sku', 'price'} - set(raw.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+
+        price = pd.to_numeric(raw['price'], errors='coerce')
+        transformed = pd.DataFrame({
+            'id': raw['product_id'],
+            'brand': 'Pepper',
+            'category': self.map_categories(raw['title']),
+            'name': raw['title'],
+            'retail_price': price,
+            'department': 'Womens',
+            'sku': raw['sku'],
+            'distribution_center_id': 1,
+            'cost': price * COST_RATIO,
+        }, index=raw.index)
+
+        # Zero or missing measurements fall back to the defaults
+        for column, default in DEFAULT_MEASUREMENTS.items():
+            source = MEASUREMENT_SOURCES[column]
+            if source in raw.columns:
+                values = pd.to_numeric(raw[source], errors='coerce')
+                transformed[column] = values.where(values > 0).fillna(default)
+            else:
+                transformed[column] = default
+
+        transformed['inventory_item_id'] = raw['variant_id']
+        transformed['inventory_quantity'] = 100
+        transformed['inventory_location'] = 'MAIN_WAREHOUSE'
+
+        return transformed[PRODUCT_COLUMNS]
+
+    def transform_order_items(self, items: pd.DataFrame) -> pd.DataFrame:
+        """
+        Transform order items to the order item schema.
+
+        Args:
+            items: DataFrame of simulated or exported order items
+
+        Returns:
+            DataFrame with ORDER_ITEM_COLUMNS and parsed date columns;
+            missing purchase dates stay NaT rather than being invented
+        """
+        transformed = items.reindex(columns=ORDER_ITEM_COLUMNS)
+        transformed['status'] = transformed['status'].fillna('Complete')
+        transformed = parse_dates(transformed, DATE_COLUMNS)
+        missing = int(transformed['created_at'].isna().sum())
+        if missing:
+            logger.warning(f"{missing} order items have no created_at")
+        return transformed
+
+    def iter_transform_csv(
+        self,
+        source: str,
+        kind: str,
+        chunksize: int = 100_000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a CSV through a transform chunk by chunk.
+
+        Args:
+            source: Path to the raw CSV
+            kind: 'products' or 'order_items'
+            chunksize: Rows per chunk
+
+        Yields:
+            Transformed chunks
+
+        Raises:
+            ValueError: If kind is not recognized
+        """
+        transforms = {
+            'products': self.transform_products,
+            'order_items': self.transform_order_items,
+        }
+        if kind not in transforms:
+            raise ValueError(f"Unknown transform kind: {kind}")
+
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            yield transforms[kind](chunk)
+
+    def transform_csv(
+        self,
+        source: str,
+        destination: str,
+        kind: str,
+        chunksize: int = 100_000
+    ) -> int:
+        """
+        Transform a CSV file into another CSV without loading it whole.
+
+        Args:
+            source: Path to the raw CSV
+            destination: Output CSV path (overwritten)
+            kind: 'products' or 'order_items'
+            chunksize: Rows per chunk
+
+        Returns:
+            Number of rows written
+        """
+        rows = 0
+        Path(destination).parent.mkdir(parents=True, exist_ok=True)
+        for i, chunk in enumerate(self.iter_transform_csv(source, kind, chunksize)):
+            chunk.to_csv(destination, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            rows += len(chunk)
+        return rows
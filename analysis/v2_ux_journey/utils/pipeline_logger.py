@@ -0,0 +1,253 @@
+"""
+Pipeline Logging Module
+
+Sets up non-blocking logging for data loading, crawling and serving
+code. Callers only enqueue records through a QueueHandler; a single
+QueueListener thread formats them and writes to the console and to a
+size-rotated JSON-lines file whose rotated parts can be gzip-compressed.
+Setup is idempotent, so modules may call it freely without duplicating
+handlers. Records carrying latency and byte counts can be aggregated
+into throughput statistics from the log files.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_lock = threading.Lock()
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Serialize a record with its extra fields.
+
+        Args:
+            record: Log record
+
+        Returns:
+            JSON line with time, level, logger, message and any extra
+            fields such as latency_ms and bytes
+        """
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Compress a rotated log file."""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+def setup_logging(
+    name: str,
+    log_file: Optional[str] = None,
+    level: int = logging.INFO,
+    console: bool = True,
+    max_bytes: int = 50 * 1024 * 1024,
+    backup_count: int = 5,
+    compress: bool = True
+) -> logging.Logger:
+    """
+    Attach a queue-backed handler to a logger, once.
+
+    The calling thread only puts records on an unbounded queue; a
+    background QueueListener writes them to the console (plain text) and
+    to log_file (JSON lines, rotated at max_bytes). Calling again for the
+    same name returns the logger unchanged.
+
+    Args:
+        name: Logger name
+        log_file: JSON-lines log file; None logs to the console only
+        level: Logger level
+        console: Also write human-readable lines to stderr
+        max_bytes: Size at which the log file is rotated
+        backup_count: Rotated files kept
+        compress: Gzip rotated files (named like pipeline.log.1.gz)
+
+    Returns:
+        The configured logger
+    """
+    logger = logging.getLogger(name)
+    with _lock:
+        if name in _listeners:
+            return logger
+
+        handlers: List[logging.Handler] = []
+        if console:
+            stream = logging.StreamHandler()
+            stream.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+            handlers.append(stream)
+        if log_file is not None:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            rotating = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+            if compress:
+                rotating.namer = lambda default_name: f"{default_name}.gz"
+                rotating.rotator = _gzip_rotator
+            rotating.setFormatter(JsonFormatter())
+            handlers.append(rotating)
+
+        records: queue.Queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners[name] = listener
+
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        logger.setLevel(level)
+        logger.propagate = False
+    return logger
+
+def shutdown_logging(name: Optional[str] = None) -> None:
+    """
+    Flush and stop queue listeners.
+
+    Args:
+        name: Logger to shut down; None stops every listener
+    """
+    with _lock:
+        names = list(_listeners) if name is None else [name] if name in _listeners else []
+        for logger_name in names:
+            listener = _listeners.pop(logger_name)
+            listener.stop()  # drains the queue before returning
+            for handler in listener.handlers:
+                handler.close()
+            logger = logging.getLogger(logger_name)
+            for handler in list(logger.handlers):
+                if isinstance(handler, logging.handlers.QueueHandler):
+                    logger.removeHandler(handler)
+
+atexit.register(shutdown_logging)
+
+def log_request(
+    logger: logging.Logger,
+    url: str,
+    latency_ms: float,
+    bytes_received: int,
+    status: Optional[int] = None,
+    **fields
+) -> None:
+    """
+    Log one fetched request as a structured record.
+
+    Args:
+        logger: Logger set up with setup_logging
+        url: Requested URL or resource
+        latency_ms: Time to complete the request
+        bytes_received: Response size
+        status: Response status code
+        **fields: Additional fields to include
+    """
+    logger.info(
+        f"{status or '-'} {url} {latency_ms:.1f}ms {bytes_received}B",
+        extra={'event': 'request', 'url': url, 'latency_ms': latency_ms,
+               'bytes': bytes_received, 'status': status, **fields}
+    )
+
+def read_log(log_file: str) -> pd.DataFrame:
+    """
+    Read a JSON-lines log and its rotated (possibly gzipped) parts.
+
+    Args:
+        log_file: Current log file
+
+    Returns:
+        DataFrame of records ordered by time
+
+    Raises:
+        FileNotFoundError: If no log file exists
+    """
+    path = Path(log_file)
+    rotated = {}
+    for part in path.parent.glob(f"{path.name}.*"):
+        match = re.fullmatch(re.escape(path.name) + r'\.(\d+)(\.gz)?', part.name)
+        if match:
+            rotated[int(match.group(1))] = part
+    # Highest rotation number is the oldest
+    parts = [rotated[number] for number in sorted(rotated, reverse=True)]
+    parts += [path] if path.exists() else []
+    if not parts:
+        raise FileNotFoundError(f"Log file not found: {path}")
+
+    frames = []
+    for part in parts:
+        opener = gzip.open if part.suffix == '.gz' else open
+        with opener(part, 'rt', encoding='utf-8') as f:
+            frames.append(pd.read_json(f, lines=True, convert_dates=False))
+    records = pd.concat(frames, ignore_index=True)
+    if 'time' in records.columns:
+        records['time'] = pd.to_datetime(records['time'], format='ISO8601')
+        records = records.sort_values('time', kind='stable').reset_index(drop=True)
+    return records
+
+def throughput_stats(log_file: str, by: str = 'event', freq: Optional[str] = None) -> pd.DataFrame:
+    """
+    Aggregate request records into throughput statistics.
+
+    Args:
+        log_file: JSON-lines log written by setup_logging
+        by: Field to group by (event, logger, status...)
+        freq: Optional time bucket (e.g. '1min') to also group by
+
+    Returns:
+        DataFrame with requests, bytes, latency percentiles (p50, p95,
+        p99), requests_per_sec and bytes_per_sec per group; bytes are 0
+        when no record carries a size
+    """
+    records = read_log(log_file)
+    if 'latency_ms' not in records.columns:
+        return pd.DataFrame()
+    if 'bytes' not in records.columns:
+        records = records.assign(bytes=0)
+    records = records[records['latency_ms'].notna()]
+    keys = [by] if by in records.columns else []
+    if freq is not None:
+        records = records.assign(period=records['time'].dt.floor(freq))
+        keys = ['period', *keys]
+    grouped = records.groupby(keys, sort=True, dropna=False) if keys else records.groupby(lambda _: 'all')
+
+    stats = grouped.agg(
+        requests=('latency_ms', 'size'),
+        bytes=('bytes', 'sum'),
+        latency_p50=('latency_ms', 'median'),
+        latency_p95=('latency_ms', lambda values: values.quantile(0.95)),
+        latency_p99=('latency_ms', lambda values: values.quantile(0.99)),
+        first=('time', 'min'),
+        last=('time', 'max'),
+    )
+    elapsed = (stats.pop('last') - stats.pop('first')).dt.total_seconds()
+    if freq is not None:
+        elapsed = pd.Series(pd.Timedelta(freq).total_seconds(), index=stats.index)
+    elapsed = elapsed.where(elapsed > 0)
+    stats['requests_per_sec'] = stats['requests'] / elapsed
+    stats['bytes_per_sec'] = stats['bytes'] / elapsed
+    return stats
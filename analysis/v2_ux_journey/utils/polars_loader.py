@@ -0,0 +1,304 @@
+"""
+Polars Loading Module for Pepper Analysis
+
+Builds the load -> rename -> validate -> merge -> derive pipeline of
+load_pepper_data and JourneyMapper._prepare_data as Polars LazyFrames.
+Nothing is read until a plan is collected, so only the columns and rows
+a query needs are scanned, and joins and group-bys run multi-threaded.
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .data_loader import DATE_COLUMNS, OPTIONAL_ITEM_COLUMNS, attach_return_db
+
+# Polars (chrono) spelling of data_loader.DATE_FORMAT
+POLARS_DATE_FORMAT = '%Y-%m-%d %H:%M:%S%.f'
+
+REQUIRED_ORDER_COLS = ['id', 'customer_id', 'status', 'created_at', 'product_id']
+REQUIRED_PRODUCT_COLS = ['product_id', 'name', 'sku', 'retail_price']
+
+# Defaults matching JourneyMapper.PRODUCT_ATTRIBUTES and VARIANT_ATTRIBUTES
+PRODUCT_ATTRIBUTES = ('name', 'size', 'band_size', 'cup_size', 'category', 'style')
+VARIANT_ATTRIBUTES = ('size', 'band_size', 'cup_size')
+
+def _import_polars():
+    """Import polars with a helpful error when it is missing."""
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError("The polars backend requires the 'polars' package") from e
+    return pl
+
+def _latest(data_dir: str, pattern: str) -> Path:
+    """
+    Find the most recent file matching a pattern.
+
+    Raises:
+        FileNotFoundError: If no file matches
+    """
+    matches = sorted(Path(data_dir).glob(pattern))
+    if not matches:
+        raise FileNotFoundError(
+            f"No data files found in {data_dir}. "
+            "Expected files matching patterns: "
+            "'simulated_orders_*.csv', 'transformed_order_items_*.csv', "
+            "and 'transformed_bra_products_*.csv'"
+        )
+    return matches[-1]
+
+def _parse_dates(lf, columns: List[str]):
+    """Parse string date columns with the explicit format, then by inference."""
+    pl = _import_polars()
+    schema = lf.collect_schema()
+    exprs = []
+    for col in columns:
+        if col in schema and schema[col] == pl.String:
+            exprs.append(
+                pl.coalesce(
+                    pl.col(col).str.strptime(pl.Datetime('us'), POLARS_DATE_FORMAT, strict=False),
+                    pl.col(col).str.to_datetime(time_unit='us', strict=False),
+                ).alias(col)
+            )
+    return lf.with_columns(exprs) if exprs else lf
+
+def _validate(lf, required: List[str], context: str) -> None:
+    """
+    Validate required columns against a LazyFrame schema without reading data.
+
+    Raises:
+        ValueError: If required columns are missing
+    """
+    missing = set(required) - set(lf.collect_schema().names())
+    if missing:
+        raise ValueError(f"Missing required columns in {context} data: {missing}")
+
+def scan_pepper_data(data_dir: str, since: Optional[str] = None):
+    """
+    Build lazy plans for Pepper's order and product data.
+
+    Args:
+        data_dir: Directory containing the data files
+        since: Optional ISO date; orders created before it are filtered
+            inside the scan
+
+    Returns:
+        Tuple of (orders LazyFrame, products LazyFrame) with the same
+        columns load_pepper_data returns
+
+    Raises:
+        ValueError: If required columns are missing
+        FileNotFoundError: If data files are not found
+    """
+    pl = _import_polars()
+
+    orders = pl.scan_csv(_latest(data_dir, "simulated_orders_*.csv"))
+    items = pl.scan_csv(_latest(data_dir, "transformed_order_items_*.csv"))
+    products = pl.scan_csv(_latest(data_dir, "transformed_bra_products_*.csv"))
+
+    items = _parse_dates(items, DATE_COLUMNS).with_columns(
+        pl.col('returned_at').is_not_null().alias('is_return')
+    )
+    item_columns = ['order_id', 'product_id', 'is_return', 'returned_at']
+    item_names = items.collect_schema().names()
+    item_columns += [c for c in OPTIONAL_ITEM_COLUMNS if c in item_names]
+
+    orders = orders.join(
+        items.select(item_columns),
+        left_on='id',
+        right_on='order_id',
+        how='left',
+        coalesce=False,
+        maintain_order='left'
+    )
+
+    order_names = orders.collect_schema().names()
+    renames = {
+        old: new for old, new in {'user_id': 'customer_id', 'order_date': 'created_at'}.items()
+        if old in order_names and new not in order_names
+    }
+    orders = orders.rename(renames)
+    product_names = products.collect_schema().names()
+    if 'id' in product_names and 'product_id' not in product_names:
+        products = products.rename({'id': 'product_id'})
+
+    _validate(orders, REQUIRED_ORDER_COLS, "Orders")
+    _validate(products, REQUIRED_PRODUCT_COLS, "Products")
+
+    orders = _parse_dates(orders, ['created_at']).with_columns(
+        pl.col('status').str.to_lowercase()
+    )
+    if since is not None:
+        orders = orders.filter(pl.col('created_at') >= pl.lit(since).str.to_datetime(time_unit='us'))
+
+    return orders, products
+
+def prepare_products(products):
+    """
+    Lazily derive band/cup sizes from the SKU and style from the name.
+
+    Mirrors the product half of JourneyMapper._prepare_data.
+
+    Args:
+        products: Products LazyFrame from scan_pepper_data
+
+    Returns:
+        LazyFrame of products with band_size, cup_size and style added
+    """
+    pl = _import_polars()
+    return products.with_columns(
+        pl.when(pl.col('sku').str.len_chars() > 7)
+        .then(pl.col('sku').str.slice(5, 2)).alias('band_size'),
+        pl.when(pl.col('sku').str.len_chars() > 9)
+        .then(pl.col('sku').str.slice(7, 2)).alias('cup_size'),
+        pl.col('name').str.extract(r'(.*?)(?:\s*-\s*[A-Za-z]+)?$', 1).alias('style'),
+    )
+
+def prepare_journey_frame(
+    orders,
+    products,
+    attributes: Sequence[str] = PRODUCT_ATTRIBUTES,
+    variant_attributes: Sequence[str] = VARIANT_ATTRIBUTES
+):
+    """
+    Lazily derive sizes and styles and join them onto orders.
+
+    Mirrors JourneyMapper._prepare_data and _join_products: orders whose
+    inventory_item_id matches a variant take that variant's attributes,
+    the rest take a product-level dimension with one row per product_id
+    whose variant attributes are kept only when all variants agree.
+    Attributes the orders already carry get a _product suffix, and rows
+    keep their order.
+
+    Args:
+        orders: Orders LazyFrame from scan_pepper_data
+        products: Products LazyFrame from scan_pepper_data
+        attributes: Product attributes to join, when present
+        variant_attributes: Attributes that differ between variants
+
+    Returns:
+        LazyFrame of orders with the product attributes appended
+    """
+    pl = _import_polars()
+
+    sized = prepare_products(products)
+    product_names = sized.collect_schema().names()
+    order_names = orders.collect_schema().names()
+    attributes = [c for c in attributes if c in product_names]
+    variant_cols = [c for c in variant_attributes if c in attributes]
+    output = {c: f"{c}_product" if c in order_names else c for c in attributes}
+
+    product_dim = sized.group_by('product_id', maintain_order=True).agg([
+        pl.when(pl.col(c).drop_nulls().n_unique() <= 1).then(pl.col(c).first()).alias(output[c])
+        if c in variant_cols else pl.col(c).first().alias(output[c])
+        for c in attributes
+    ])
+    journey = orders.join(product_dim, on='product_id', how='left', maintain_order='left')
+
+    if 'inventory_item_id' in order_names and 'inventory_item_id' in product_names:
+        variant_dim = (
+            sized.drop_nulls('inventory_item_id')
+            .unique('inventory_item_id', keep='first', maintain_order=True)
+            .select(
+                # Cast like pandas, which matches 11.0 to 11 when one side has gaps
+                [pl.col('inventory_item_id').cast(orders.collect_schema()['inventory_item_id'], strict=False),
+                 pl.lit(True).alias('_variant')] +
+                [pl.col(c).alias(f"_variant_{c}") for c in attributes]
+            )
+        )
+        journey = journey.join(variant_dim, on='inventory_item_id', how='left', maintain_order='left')
+        journey = journey.with_columns([
+            pl.when(pl.col('_variant').fill_null(False))
+            .then(pl.col(f"_variant_{c}")).otherwise(pl.col(output[c])).alias(output[c])
+            for c in attributes
+        ]).drop(['_variant'] + [f"_variant_{c}" for c in attributes])
+    return journey
+
+def entry_point_shares(journey) -> Dict[str, float]:
+    """
+    Share of customers whose first kept order was each product name.
+
+    Args:
+        journey: LazyFrame from prepare_journey_frame
+
+    Returns:
+        Dict[name, frequency_ratio], as JourneyMapper.identify_entry_points
+    """
+    pl = _import_polars()
+    returned = 'returned' if 'returned' in journey.collect_schema().names() else 'is_return'
+    firsts = (
+        journey.filter(~pl.col(returned).fill_null(False))
+        .group_by('customer_id')
+        .agg(pl.col('name').sort_by('created_at').first())
+    )
+    shares = (
+        firsts.with_columns(pl.len().alias('customers'))
+        .drop_nulls('name')
+        .group_by('name')
+        .agg((pl.len() / pl.col('customers').first()).alias('share'))
+        .collect()
+    )
+    return dict(zip(shares['name'].to_list(), shares['share'].to_list()))
+
+def collect_pandas(lf) -> pd.DataFrame:
+    """
+    Collect a LazyFrame into a pandas DataFrame for existing callers.
+
+    Args:
+        lf: Polars LazyFrame
+
+    Returns:
+        pandas DataFrame with numpy-backed columns
+    """
+    return lf.collect().to_pandas()
+
+def _collect_orders(lf) -> pd.DataFrame:
+    """Collect an orders plan to pandas the way the pandas loader returns it."""
+    orders_df = collect_pandas(lf)
+    # pandas' left merge leaves NaN, not None, in unmatched boolean rows
+    if orders_df['is_return'].dtype == object:
+        orders_df['is_return'] = orders_df['is_return'].where(orders_df['is_return'].notna(), np.nan)
+    return orders_df
+
+def load_pepper_data_polars(data_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Polars-backed equivalent of load_pepper_data.
+
+    Args:
+        data_dir: Directory containing the data files
+
+    Returns:
+        Tuple of (orders_df, products_df) as pandas DataFrames
+    """
+    orders, products = scan_pepper_data(data_dir)
+    return _collect_orders(orders), collect_pandas(products)
+
+def load_journey_frames_polars(
+    data_dir: str,
+    returns_db: Optional[str] = None,
+    attributes: Sequence[str] = PRODUCT_ATTRIBUTES,
+    variant_attributes: Sequence[str] = VARIANT_ATTRIBUTES
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load orders and products already prepared for JourneyMapper.
+
+    Loading and preparation run as one lazy plan per frame, so pandas
+    only receives the finished result.
+
+    Args:
+        data_dir: Directory containing the data files
+        returns_db: Optional ReturnTracker database, as in load_pepper_data
+        attributes: See prepare_journey_frame
+        variant_attributes: See prepare_journey_frame
+
+    Returns:
+        Tuple of (orders_df, products_df) as JourneyMapper._prepare_data
+        leaves them
+    """
+    orders, products = scan_pepper_data(data_dir)
+    orders_df = _collect_orders(prepare_journey_frame(orders, products, attributes, variant_attributes))
+    if returns_db is not None:
+        orders_df = attach_return_db(orders_df, returns_db)
+    return orders_df, collect_pandas(prepare_products(products))
@@ -0,0 +1,222 @@
+"""
+Artifacts Module
+
+This module writes rendered figures as static PNG or self-contained HTML
+files and caches them per data snapshot. Artifacts live under a
+directory named after the snapshot's fingerprint, so a figure is only
+rendered once per snapshot and parameter set; a new snapshot renders
+into a fresh directory.
+"""
+
+import base64
+import hashlib
+import html
+import io
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+import logging
+
+import pandas as pd
+
+from ..core.result_cache import frame_fingerprint, make_key
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('png', 'html')
+
+def new_figure(width: float, height: float):
+    """
+    Create a Matplotlib figure bound to the Agg canvas.
+
+    The figure is not registered with pyplot, so rendering needs no
+    display, does not change the global backend and is safe off the
+    main thread.
+
+    Args:
+        width: Width in inches
+        height: Height in inches
+
+    Returns:
+        matplotlib.figure.Figure
+
+    Raises:
+        ImportError: If matplotlib is not installed
+    """
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    except ImportError as e:
+        raise ImportError("Rendering figures requires the 'matplotlib' package") from e
+    figure = Figure(figsize=(width, height))
+    FigureCanvasAgg(figure)
+    return figure
+
+def save_figure(figure, path: str, title: str = '', table: Optional[pd.DataFrame] = None, dpi: int = 100) -> None:
+    """
+    Write a figure as PNG, or as an HTML page embedding the PNG.
+
+    Args:
+        figure: Matplotlib figure
+        path: Output file; the suffix (.png or .html) selects the format
+        title: Page title for HTML output
+        table: Optional aggregate table appended to HTML output
+        dpi: Raster resolution
+
+    Raises:
+        ValueError: If the suffix is not a supported format
+    """
+    path = Path(path)
+    fmt = path.suffix.lstrip('.').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported artifact format: {path.suffix}")
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    if fmt == 'png':
+        content = buffer.getvalue()
+    else:
+        image = base64.b64encode(buffer.getvalue()).decode('ascii')
+        parts = [
+            '<!DOCTYPE html>',
+            f"<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head><body>",
+            f"<h1>{html.escape(title)}</h1>" if title else '',
+            f"<img alt=\"{html.escape(title)}\" src=\"data:image/png;base64,{image}\">",
+            table.to_html(float_format=lambda value: f"{value:.4g}") if table is not None else '',
+            '</body></html>',
+        ]
+        content = '\n'.join(part for part in parts if part).encode('utf-8')
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # One temporary file per writer, so concurrent renders of the same
+    # artifact never replace each other's partial output
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(content)
+    tmp.replace(path)
+
+def snapshot_id(path: str) -> str:
+    """
+    Fingerprint of a snapshot directory written by save_snapshot.
+
+    Covers the metadata file plus the name, size and modification time of
+    every file, so rewriting the snapshot changes the id without hashing
+    the column arrays.
+
+    Args:
+        path: Snapshot directory
+
+    Returns:
+        Hex digest
+
+    Raises:
+        FileNotFoundError: If the directory does not exist
+    """
+    root = Path(path)
+    if not root.is_dir():
+        raise FileNotFoundError(f"Snapshot directory not found: {root}")
+    digest = hashlib.blake2b(digest_size=8)
+    for file in sorted(root.iterdir()):
+        if file.is_file():
+            stat = file.stat()
+            digest.update(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+class ArtifactCache:
+    """Rendered artifacts keyed by snapshot, name and parameters."""
+
+    def __init__(self, root: str, snapshot: str):
+        """
+        Initialize the cache for one snapshot.
+
+        Args:
+            root: Directory holding one subdirectory per snapshot
+            snapshot: Snapshot id (see snapshot_id and for_mapper)
+        """
+        self.root = Path(root)
+        self.snapshot = snapshot
+        self.directory = self.root / snapshot
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_mapper(cls, root: str, mapper) -> 'ArtifactCache':
+        """
+        Cache keyed by the content of a mapper's orders and products.
+
+        Args:
+            root: Cache root directory
+            mapper: JourneyMapper
+
+        Returns:
+            ArtifactCache
+        """
+        snapshot = make_key(
+            'artifacts', [frame_fingerprint(mapper.orders), frame_fingerprint(mapper.products)], ()
+        )[:16]
+        return cls(root, snapshot)
+
+    @classmethod
+    def for_snapshot(cls, root: str, path: str) -> 'ArtifactCache':
+        """
+        Cache keyed by a snapshot directory.
+
+        Args:
+            root: Cache root directory
+            path: Snapshot directory
+
+        Returns:
+            ArtifactCache
+        """
+        return cls(root, snapshot_id(path))
+
+    def path(self, name: str, params: Any, fmt: str = 'png') -> Path:
+        """
+        Location of an artifact.
+
+        Args:
+            name: Artifact name, e.g. 'confidence_heatmap'
+            params: Repr-stable rendering parameters
+            fmt: 'png' or 'html'
+
+        Returns:
+            Path inside this snapshot's directory
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported artifact format: {fmt}")
+        key = make_key(name, [self.snapshot], params)[:16]
+        return self.directory / f"{name}-{key}.{fmt}"
+
+    def get_or_render(self, name: str, params: Any, fmt: str, render: Callable[[Path], None]) -> Path:
+        """
+        Return a cached artifact, rendering it on a miss.
+
+        Args:
+            name: Artifact name
+            params: Repr-stable rendering parameters
+            fmt: 'png' or 'html'
+            render: Called with the output path to write the artifact
+
+        Returns:
+            Path of the artifact
+        """
+        path = self.path(name, params, fmt)
+        if path.exists():
+            self.hits += 1
+            return path
+        self.misses += 1
+        render(path)
+        logger.debug(f"Rendered {path.name} for snapshot {self.snapshot}")
+        return path
+
+    def prune(self) -> None:
+        """Delete the artifacts of every other snapshot under root."""
+        if not self.root.exists():
+            return
+        for directory in self.root.iterdir():
+            if directory.is_dir() and directory.name != self.snapshot:
+                shutil.rmtree(directory, ignore_errors=True)
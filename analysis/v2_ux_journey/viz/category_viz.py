@@ -0,0 +1,175 @@
+"""
+Category Visualization Module
+
+This module renders style and category flows as Sankey diagrams from
+pre-aggregated data. Consecutive purchases are counted into a from x to
+transition matrix in one vectorized pass, the matrix is cut down to its
+top-N nodes (the rest merged into "Other"), and only the remaining links
+are drawn.
+"""
+
+from typing import Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .artifacts import ArtifactCache, new_figure, save_figure
+
+logger = logging.getLogger(__name__)
+
+OTHER = 'Other'
+
+def transition_counts(orders: pd.DataFrame, attribute: str = 'style') -> pd.DataFrame:
+    """
+    Count transitions between consecutive purchases of each customer.
+
+    Args:
+        orders: Orders with customer_id, created_at and the attribute
+        attribute: Order attribute forming the nodes (style, category...)
+
+    Returns:
+        Square DataFrame of counts, from values as rows and to values as
+        columns
+
+    Raises:
+        ValueError: If the attribute is not available
+    """
+    if attribute not in orders.columns:
+        raise ValueError(f"Unknown flow attribute: {attribute}")
+    data = orders.sort_values(['customer_id', 'created_at'], kind='stable')
+    customers = data['customer_id'].to_numpy()
+    codes, values = pd.factorize(data[attribute], sort=True)
+
+    same_customer = customers[1:] == customers[:-1]
+    source, target = codes[:-1][same_customer], codes[1:][same_customer]
+    known = (source >= 0) & (target >= 0)
+    n = len(values)
+    counts = np.bincount(source[known] * n + target[known], minlength=n * n).reshape(n, n)
+    return pd.DataFrame(counts, index=pd.Index(values, name='from'), columns=pd.Index(values, name='to'))
+
+def sankey_data(matrix: pd.DataFrame, top_n: int = 12, min_share: float = 0.0) -> pd.DataFrame:
+    """
+    Reduce a transition matrix to the links worth drawing.
+
+    Nodes outside the top_n by total flow are merged into "Other" on both
+    sides, then links below min_share of all flow are dropped.
+
+    Args:
+        matrix: Transition counts (see transition_counts)
+        top_n: Nodes kept on each side
+        min_share: Smallest share of total flow a link needs
+
+    Returns:
+        DataFrame of links with source, target, value and share, largest
+        first
+    """
+    flow = matrix.sum(axis=1).add(matrix.sum(axis=0), fill_value=0)
+    keep = set(flow.nlargest(top_n).index)
+    sources = matrix.index.map(lambda node: node if node in keep else OTHER)
+    targets = matrix.columns.map(lambda node: node if node in keep else OTHER)
+    reduced = matrix.groupby(sources).sum().T.groupby(targets).sum().T
+
+    links = reduced.stack().rename('value').reset_index()
+    links.columns = ['source', 'target', 'value']
+    total = links['value'].sum()
+    links['share'] = links['value'] / total if total else 0.0
+    links = links[(links['value'] > 0) & (links['share'] >= min_share)]
+    return links.sort_values('value', ascending=False, kind='stable').reset_index(drop=True)
+
+def _node_positions(totals: pd.Series, gap: float) -> Tuple[pd.DataFrame, float]:
+    """Bottom and top of each node bar stacked on [0, 1] with gaps, and the value scale."""
+    scale = (1.0 - gap * (len(totals) - 1)) / max(totals.sum(), 1)
+    heights = totals.to_numpy() * scale
+    bottoms = np.r_[0.0, np.cumsum(heights + gap)[:-1]]
+    return pd.DataFrame({'bottom': bottoms, 'top': bottoms + heights}, index=totals.index), scale
+
+def render_sankey(links: pd.DataFrame, path: str, title: str = 'Purchase flow', gap: float = 0.01) -> None:
+    """
+    Draw links as a two-column Sankey diagram.
+
+    Args:
+        links: Output of sankey_data
+        path: Output .png or .html file
+        title: Figure title
+        gap: Vertical gap between nodes, as a share of the height
+    """
+    sources = links.groupby('source', sort=False)['value'].sum().sort_values(ascending=False)
+    targets = links.groupby('target', sort=False)['value'].sum().sort_values(ascending=False)
+    left, left_scale = _node_positions(sources, gap)
+    right, right_scale = _node_positions(targets, gap)
+
+    figure = new_figure(9.0, max(4.0, 0.3 * max(len(sources), len(targets))))
+    axes = figure.add_subplot()
+    from matplotlib import colormaps
+    palette = colormaps['tab20']
+    colors = {node: palette(i % 20) for i, node in enumerate(sources.index)}
+
+    # Each link occupies a slice of its source bar and of its target bar
+    left_cursor = left['bottom'].copy()
+    right_cursor = right['bottom'].copy()
+    x = np.linspace(0.0, 1.0, 50)
+    blend = (1 - np.cos(np.pi * x)) / 2
+    ordered = links.assign(
+        source_rank=links['source'].map({node: i for i, node in enumerate(sources.index)}),
+        target_rank=links['target'].map({node: i for i, node in enumerate(targets.index)}),
+    ).sort_values(['source_rank', 'target_rank'])
+    for source, target, value in zip(ordered['source'], ordered['target'], ordered['value']):
+        y0, y1 = left_cursor[source], right_cursor[target]
+        h0, h1 = value * left_scale, value * right_scale
+        lower = y0 + (y1 - y0) * blend
+        upper = (y0 + h0) + ((y1 + h1) - (y0 + h0)) * blend
+        axes.fill_between(x, lower, upper, color=colors[source], alpha=0.45, linewidth=0)
+        left_cursor[source] += h0
+        right_cursor[target] += h1
+
+    for positions, xpos, align in [(left, -0.02, 'right'), (right, 1.02, 'left')]:
+        for node, (bottom, top) in positions.iterrows():
+            axes.fill_between([xpos - 0.01, xpos + 0.01], bottom, top, color='0.3', linewidth=0)
+            label_x = xpos - 0.02 if align == 'right' else xpos + 0.02
+            axes.text(label_x, (bottom + top) / 2, str(node), ha=align, va='center', fontsize=8)
+
+    axes.set_xlim(-0.4, 1.4)
+    axes.set_ylim(0.0, 1.0)
+    axes.invert_yaxis()
+    axes.axis('off')
+    axes.set_title(title)
+    save_figure(figure, path, title=title, table=links.set_index(['source', 'target']))
+
+def category_flow_sankey(
+    mapper,
+    attribute: str = 'style',
+    path: Optional[str] = None,
+    cache: Optional[ArtifactCache] = None,
+    fmt: str = 'png',
+    top_n: int = 12,
+    min_share: float = 0.0
+) -> str:
+    """
+    Render the purchase flow Sankey of a mapper's customers.
+
+    Args:
+        mapper: Prepared JourneyMapper
+        attribute: Order attribute forming the nodes
+        path: Output file; required without a cache
+        cache: Artifact cache; an existing artifact is reused
+        fmt: 'png' or 'html' when rendering through the cache
+        top_n: See sankey_data
+        min_share: See sankey_data
+
+    Returns:
+        Path of the rendered artifact
+
+    Raises:
+        ValueError: If neither path nor cache is given
+    """
+    def render(output):
+        links = sankey_data(transition_counts(mapper.orders, attribute), top_n, min_share)
+        render_sankey(links, str(output), title=f"{attribute.title()} flow")
+
+    if cache is not None:
+        return str(cache.get_or_render(f"{attribute}_sankey", (top_n, min_share), fmt, render))
+    if path is None:
+        raise ValueError("Either path or cache is required")
+    render(path)
+    return path
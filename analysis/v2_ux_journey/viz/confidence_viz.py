@@ -0,0 +1,130 @@
+"""
+Confidence Visualization Module
+
+This module renders confidence development for the whole customer base
+without drawing individual trajectories. Confidence after each order is
+binned into a 2D histogram of order index versus confidence, and only
+that small grid is plotted as a heatmap.
+"""
+
+from typing import Dict, List, Optional, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+from ..core.confidence_model import running_confidence
+from .artifacts import ArtifactCache, new_figure, save_figure
+
+logger = logging.getLogger(__name__)
+
+Trajectories = Union[pd.DataFrame, Dict[str, List[float]]]
+
+def _long_form(trajectories: Trajectories) -> pd.DataFrame:
+    """Trajectories as a frame of order_index and confidence."""
+    if isinstance(trajectories, pd.DataFrame):
+        return trajectories
+    lengths = np.fromiter((len(scores) for scores in trajectories.values()), dtype=np.int64, count=len(trajectories))
+    scores = [score for customer_scores in trajectories.values() for score in customer_scores]
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return pd.DataFrame({
+        'order_index': np.arange(lengths.sum()) - offsets + 1,
+        'confidence': np.asarray(scores, dtype=float),
+    })
+
+def confidence_histogram(
+    trajectories: Trajectories,
+    max_orders: int = 20,
+    confidence_bins: int = 20,
+    normalize: bool = True
+) -> pd.DataFrame:
+    """
+    Bin confidence trajectories by order index and confidence.
+
+    Args:
+        trajectories: Output of running_confidence, or the dict returned
+            by JourneyMapper.map_confidence_progression
+        max_orders: Order indexes above this are counted in the last column
+        confidence_bins: Number of equal-width confidence bins over [0, 1]
+        normalize: Divide each column by its total, giving the confidence
+            distribution of customers at that order
+
+    Returns:
+        DataFrame indexed by confidence bin lower edge (highest first) with
+        one column per order index 1..max_orders
+    """
+    data = _long_form(trajectories)
+    order_index = np.minimum(data['order_index'].to_numpy(), max_orders)
+    confidence = np.clip(data['confidence'].to_numpy(dtype=float), 0.0, 1.0)
+
+    counts, confidence_edges, _ = np.histogram2d(
+        confidence, order_index,
+        bins=[confidence_bins, max_orders],
+        range=[[0.0, 1.0], [0.5, max_orders + 0.5]]
+    )
+    if normalize:
+        counts = counts / np.maximum(counts.sum(axis=0, keepdims=True), 1)
+    histogram = pd.DataFrame(
+        counts,
+        index=pd.Index(np.round(confidence_edges[:-1], 4), name='confidence'),
+        columns=pd.RangeIndex(1, max_orders + 1, name='order_index')
+    )
+    return histogram.iloc[::-1]
+
+def render_confidence_heatmap(histogram: pd.DataFrame, path: str, title: str = 'Confidence by order') -> None:
+    """
+    Draw a confidence histogram as a heatmap.
+
+    Args:
+        histogram: Output of confidence_histogram
+        path: Output .png or .html file
+        title: Figure title
+    """
+    figure = new_figure(max(6.0, 0.35 * histogram.shape[1]), 5.0)
+    axes = figure.add_subplot()
+    image = axes.imshow(
+        histogram.to_numpy(), aspect='auto', cmap='viridis',
+        extent=[histogram.columns[0] - 0.5, histogram.columns[-1] + 0.5, 0.0, 1.0]
+    )
+    figure.colorbar(image, ax=axes, label='share of customers')
+    axes.set_xlabel('order')
+    axes.set_ylabel('confidence')
+    axes.set_title(title)
+    save_figure(figure, path, title=title, table=histogram.round(4))
+
+def confidence_heatmap(
+    mapper,
+    path: Optional[str] = None,
+    cache: Optional[ArtifactCache] = None,
+    fmt: str = 'png',
+    max_orders: int = 20,
+    confidence_bins: int = 20
+) -> str:
+    """
+    Render the confidence heatmap of a mapper's customers.
+
+    Args:
+        mapper: Prepared JourneyMapper
+        path: Output file; required without a cache
+        cache: Artifact cache; an existing artifact is reused
+        fmt: 'png' or 'html' when rendering through the cache
+        max_orders: See confidence_histogram
+        confidence_bins: See confidence_histogram
+
+    Returns:
+        Path of the rendered artifact
+
+    Raises:
+        ValueError: If neither path nor cache is given
+    """
+    def render(output):
+        trajectories = running_confidence(mapper.orders)
+        histogram = confidence_histogram(trajectories, max_orders, confidence_bins)
+        render_confidence_heatmap(histogram, str(output))
+
+    if cache is not None:
+        return str(cache.get_or_render('confidence_heatmap', (max_orders, confidence_bins), fmt, render))
+    if path is None:
+        raise ValueError("Either path or cache is required")
+    render(path)
+    return path